@@ -0,0 +1,294 @@
+"""벤치마크용 가짜 LLM 서버 (OpenAI / Anthropic / Gemini 호환, 표준 라이브러리만 사용).
+
+지원하는 엔드포인트
+- POST /v1/chat/completions, /v1/responses           : OpenAI
+- POST /v1/messages                                  : Anthropic
+- POST /v1beta/models/{model}:generateContent        : Gemini
+- GET  /stats                                        : 받은 요청 / 주입한 429·5xx 수
+- POST /stats/reset                                  : 카운터 초기화 (fail_next 로 예약한 오류도 비움)
+
+응답 지연(--latency, --jitter, 느린 꼬리 --slow-rate / --slow-latency), 5xx 오류 비율(--error-rate), 429 비율(--rate-limit-rate)을
+조절할 수 있어 동시성·재시도·캐시 변경의 효과를 오프라인에서 잴 수 있습니다.
+응답 내용은 프롬프트를 보고 정합니다.
+- 묶음 번역(packed_translation) 요청 : 번호 붙은 문장 수만큼의 JSON 배열
+- 그 밖의 번역 요청                  : 입력 마지막 줄을 그대로 돌려줌
+- MedNLI / TruthfulQA 평가 요청      : 프롬프트 해시로 고른 라벨 (같은 프롬프트에는 같은 답)
+usage 의 입력 토큰은 글자 수 / 4 로 어림하고, 프롬프트 캐시 적중도 흉내 냅니다.
+- OpenAI    : 같은 system 으로 직전에 받은 프롬프트와 앞부분이 같은 만큼 (자동 접두부 캐시)
+- Anthropic : cache_control 이 붙은 system 을 전에 본 적 있으면 system 전체
+
+사용 예
+    python bench/mock_server.py --port 8800 --latency 0.2 --rate-limit-rate 0.05
+"""
+import argparse
+import collections
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+NLI_LABELS = ["entailment", "neutral", "contradiction"]
+MC_LETTERS = ["A", "B", "C", "D"]
+
+_NUMBERED_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+_stats = {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0}
+_stats_lock = threading.Lock()
+_seen_prefixes = {}  # system -> 그 system 으로 마지막에 받은 전체 프롬프트
+_fail_next = collections.deque()  # 다음 요청들에 무조건 돌려줄 오류 상태 코드 (테스트용)
+_options = argparse.Namespace(latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=0.2,
+                              slow_rate=0.0, slow_latency=0.0)
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _tokens(text):
+    return len(text or "") // 4 + 1
+
+
+def _prefix_cached(system, user=None):
+    """캐시에 적중한 입력 토큰 수. user 를 넘기면 직전 프롬프트와 공통 접두부, 아니면 system 전체 (처음이면 0)."""
+    if not system:
+        return 0
+    prompt = f"{system}\n{user or ''}"
+    with _stats_lock:
+        previous = _seen_prefixes.get(system)
+        _seen_prefixes[system] = prompt
+    if previous is None:
+        return 0
+    if user is None:
+        return _tokens(system)
+    common = 0
+    for a, b in zip(previous, prompt):
+        if a != b:
+            break
+        common += 1
+    return common // 4
+
+
+def _pick(prompt, choices):
+    digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    return choices[digest % len(choices)]
+
+
+def reply_for(system, user):
+    """프롬프트 종류에 맞는 그럴듯한 응답 텍스트."""
+    prompt = f"{system or ''}\n{user or ''}"
+    if "JSON 문자열 배열" in prompt:
+        items = _NUMBERED_RE.findall(prompt)
+        return json.dumps([f"(방언) {text}" for _, text in items], ensure_ascii=False)
+    if "번역" in prompt:
+        lines = [line for line in (user or "").splitlines() if line.strip()]
+        return f"(방언) {lines[-1] if lines else ''}"
+    if "entailment" in prompt:
+        return _pick(prompt, NLI_LABELS)
+    if "ai_answer_mc1" in prompt or "MC1" in prompt:
+        mc1 = _pick(prompt, MC_LETTERS)
+        return f"ai_answer_mc1: {mc1}\nmc1_result: True\nai_answer_mc2: ['{mc1}']\nmc2_result: True"
+    return _pick(prompt, MC_LETTERS)
+
+
+# ============================================================
+#   provider 별 요청 / 응답 형식
+# ============================================================
+
+def _text_of(content):
+    """OpenAI / Anthropic / Gemini 메시지 content (문자열 또는 part 목록) 를 문자열로."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _openai_chat(body):
+    messages = body.get("messages") or []
+    system = "\n".join(_text_of(m.get("content")) for m in messages if m.get("role") == "system")
+    user = "\n".join(_text_of(m.get("content")) for m in messages if m.get("role") == "user")
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()),
+        "model": body.get("model"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": reply_for(system, user)}}],
+        "usage": {"prompt_tokens": _tokens(system) + _tokens(user), "completion_tokens": 1,
+                  "total_tokens": _tokens(system) + _tokens(user) + 1,
+                  "prompt_tokens_details": {"cached_tokens": _prefix_cached(system, user)}},
+    }
+
+
+def _openai_responses(body):
+    user = body.get("input")
+    if isinstance(user, list):
+        user = "\n".join(_text_of(item.get("content")) for item in user if isinstance(item, dict))
+    return {
+        "id": f"resp_{uuid.uuid4().hex[:12]}", "object": "response", "created_at": int(time.time()),
+        "model": body.get("model"), "status": "completed",
+        "output": [{"type": "message", "id": f"msg_{uuid.uuid4().hex[:12]}", "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": reply_for(body.get("instructions"), user),
+                                 "annotations": []}]}],
+        "usage": {"input_tokens": _tokens(body.get("instructions")) + _tokens(user), "output_tokens": 1,
+                  "total_tokens": _tokens(body.get("instructions")) + _tokens(user) + 1,
+                  "input_tokens_details": {"cached_tokens": _prefix_cached(body.get("instructions"), user)}},
+    }
+
+
+def _anthropic_messages(body):
+    system = _text_of(body.get("system"))
+    user = "\n".join(_text_of(m.get("content")) for m in body.get("messages") or [] if m.get("role") == "user")
+    marked = isinstance(body.get("system"), list) and any("cache_control" in b for b in body["system"])
+    cached = _prefix_cached(system) if marked else 0
+    created = _tokens(system) if marked and not cached else 0
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:12]}", "type": "message", "role": "assistant", "model": body.get("model"),
+        "content": [{"type": "text", "text": reply_for(system, user)}],
+        "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": _tokens(system) + _tokens(user) - cached - created, "output_tokens": 1,
+                  "cache_read_input_tokens": cached, "cache_creation_input_tokens": created},
+    }
+
+
+def _gemini_generate(body, model):
+    system = _text_of(((body.get("systemInstruction") or body.get("system_instruction")) or {}).get("parts"))
+    user = "\n".join(_text_of(c.get("parts")) for c in body.get("contents") or [])
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": reply_for(system, user)}]},
+                        "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": _tokens(system) + _tokens(user), "candidatesTokenCount": 1,
+                          "totalTokenCount": _tokens(system) + _tokens(user) + 1},
+        "modelVersion": model,
+    }
+
+
+def _error_body(path, status):
+    if "/v1beta/" in path:
+        state = "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"
+        return {"error": {"code": status, "message": "mock server", "status": state}}
+    if path.endswith("/messages"):
+        kind = "rate_limit_error" if status == 429 else "api_error"
+        return {"type": "error", "error": {"type": kind, "message": "mock server"}}
+    kind = "rate_limit_exceeded" if status == 429 else "server_error"
+    return {"error": {"message": "mock server", "type": kind, "code": kind}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, obj, status=200, headers=None):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") == "/stats":
+            with _stats_lock:
+                return self._send_json(dict(_stats))
+        self._send_json({"error": {"message": f"not found: {self.path}"}}, 404)
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if path == "/stats/reset":
+            with _stats_lock:
+                for name in _stats:
+                    _stats[name] = 0
+                _seen_prefixes.clear()
+                _fail_next.clear()
+            return self._send_json({"ok": True})
+
+        body = json.loads(raw or b"{}")
+        _count("requests")
+        delay = max(0.0, random.gauss(_options.latency, _options.latency * _options.jitter))
+        if random.random() < _options.slow_rate:
+            delay += _options.slow_latency
+        if delay:
+            time.sleep(delay)
+
+        with _stats_lock:
+            forced = _fail_next.popleft() if _fail_next else None
+        roll = random.random()
+        if forced == 429 or (forced is None and roll < _options.rate_limit_rate):
+            _count("rate_limited")
+            return self._send_json(_error_body(path, 429), 429, {"retry-after": str(_options.retry_after)})
+        if forced is not None or roll < _options.rate_limit_rate + _options.error_rate:
+            _count("errors")
+            return self._send_json(_error_body(path, forced or 500), forced or 500)
+
+        if path.endswith("/chat/completions"):
+            response = _openai_chat(body)
+        elif path.endswith("/responses"):
+            response = _openai_responses(body)
+        elif path.endswith("/messages"):
+            response = _anthropic_messages(body)
+        elif ":generateContent" in path:
+            response = _gemini_generate(body, path.rsplit("/", 1)[-1].split(":")[0])
+        else:
+            return self._send_json({"error": {"message": f"unknown path {path}"}}, 404)
+        _count("ok")
+        self._send_json(response)
+
+
+def configure(latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=0.2,
+              slow_rate=0.0, slow_latency=0.0):
+    _options.slow_rate = slow_rate
+    _options.slow_latency = slow_latency
+    _options.latency = latency
+    _options.jitter = jitter
+    _options.error_rate = error_rate
+    _options.rate_limit_rate = rate_limit_rate
+    _options.retry_after = retry_after
+
+
+def fail_next(*statuses):
+    """다음 요청들에 statuses 의 상태 코드를 차례로 돌려줍니다 (429 는 Retry-After 포함). 재시도 테스트용."""
+    with _stats_lock:
+        _fail_next.extend(statuses)
+
+
+def serve_in_background(host="127.0.0.1", port=0):
+    """데몬 스레드에서 서버를 띄우고 (server, base_url) 을 돌려줍니다. port=0 이면 빈 포트."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.05, help="응답 지연 평균(초)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="지연의 표준편차 (평균 대비 비율)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류로 응답할 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 로 응답할 비율")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="429 응답의 Retry-After(초)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="느린 꼬리 응답의 비율")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="느린 꼬리 응답에 더할 지연(초)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 OpenAI / Anthropic / Gemini 호환 가짜 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args.latency, args.jitter, args.error_rate, args.rate_limit_rate, args.retry_after,
+              args.slow_rate, args.slow_latency)
+    print(f"🧪 mock LLM 서버: http://{args.host}:{args.port}")
+    ThreadingHTTPServer((args.host, args.port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""번역 / 평가 파이프라인 처리량 벤치마크.
+
+가짜 LLM 서버(mock_server.py)를 띄우고 dataset/ 의 실제 CSV 일부를 임시 작업 폴더에 복사한 뒤,
+각 스크립트의 진입 함수를 그대로 호출해 단계별로 아래 값을 잽니다.
+
+- rows/s            : 입력 행 수 / 벽시계 시간
+- p50 / p95 / p99   : 요청 하나의 지연 시간 (llm_client.latency_summary)
+- calls / retries   : complete() 호출 수, 재시도 수, 429 수, 최종 실패 수 (llm_client.call_stats)
+- pcache            : 입력 토큰 중 provider 프롬프트 캐시에 적중한 비율 (usage 의 cached_tokens)
+- hedge             : 헤지 요청 수 (--hedge 일 때, llm_client.call_stats)
+- cpu               : 단계 동안 쓴 프로세스 CPU 시간
+
+각 단계의 stdout / tqdm 출력은 작업 폴더의 <단계>.log 로 보냅니다.
+google.colab 처럼 여기서 import 할 수 없는 스크립트는 건너뛰고 이유를 표에 남깁니다.
+
+사용 예
+    python bench/run_bench.py --rows 200 --latency 0.1 --rate-limit-rate 0.05
+    python bench/run_bench.py --stages eval-openai,eval-gemini --cache --json bench_result.json
+    python bench/run_bench.py --stages eval-openai --slow-rate 0.03 --slow-latency 2 --hedge
+"""
+import argparse
+import contextlib
+import csv
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BENCH_DIR)
+import mock_server  # noqa: E402
+
+DATASET_DIR = os.path.join(os.path.dirname(BENCH_DIR), "dataset")
+
+# 벤치마크 입력으로 쓰는 실제 CSV
+MEDNLI_KO = os.path.join(DATASET_DIR, "chatgpt", "accuracy_eval_dataset", "mednli_kor_eval_accuracy.csv")
+MEDNLI_JEJU = os.path.join(DATASET_DIR, "chatgpt", "hallucination_eval_dataset",
+                           "mednli_Jeju.claude-sonnet-4-5_evaluated.csv")
+
+
+# ============================================================
+#   준비
+# ============================================================
+
+def _read_rows(path):
+    """UTF-8 로 읽고 안 되면 CP949 로 읽습니다 (저장소의 일부 CSV 는 CP949)."""
+    for encoding in ("utf-8-sig", "cp949"):
+        try:
+            with open(path, encoding=encoding, newline="") as f:
+                reader = csv.DictReader(f)
+                return reader.fieldnames, list(reader)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"인코딩을 알 수 없음: {path}")
+
+
+def prepare_input(source, work_dir, name, rows):
+    """source 의 앞 rows 행을 UTF-8 로 work_dir/name 에 쓰고, 이전 평가 결과 컬럼은 비웁니다."""
+    fieldnames, data = _read_rows(source)
+    data = data[:rows] if rows else data
+    for row in data:
+        for col in ("ai_answer", "result"):
+            if col in row:
+                row[col] = ""
+    path = os.path.join(work_dir, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(data)
+    return path, len(data)
+
+
+def load_script(relative_path):
+    """파일 이름에 공백이 있는 스크립트도 모듈로 불러옵니다."""
+    path = os.path.join(DATASET_DIR, relative_path)
+    name = "bench_" + os.path.splitext(os.path.basename(path))[0].replace(" ", "_").replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ============================================================
+#   단계 (입력 파일 준비 → 스크립트 진입 함수 호출 → 처리한 행 수 반환)
+# ============================================================
+
+def stage_translate_openai(work_dir, rows):
+    source, n = prepare_input(MEDNLI_KO, work_dir, "mednli_kor.csv", rows)
+    module = load_script(os.path.join("chatgpt", "translation.py"))
+    module.translate_mednli_region(module.load_mednli(source), "제주", "jeju", output_dir=work_dir)
+    return n
+
+
+def stage_translate_anthropic(work_dir, rows):
+    source, n = prepare_input(MEDNLI_KO, work_dir, "mednli_kor.csv", rows)
+    module = load_script(os.path.join("claude", "translation.py"))
+    info = dict(module.FILE_INFOS[1], source_path=source)
+    module.BASE_PATH = work_dir
+    module.process_file(info)
+    return n
+
+
+def stage_translate_gemini(work_dir, rows):
+    source, n = prepare_input(MEDNLI_KO, work_dir, "mednli_kor.csv", rows)
+    module = load_script(os.path.join("gemini", "gemini_translate.py"))
+    module.process_mednli(source, os.path.join(work_dir, "mednli_Jeju.gemini.csv"), "Jeju")
+    return n
+
+
+def stage_eval_openai(work_dir, rows):
+    source, n = prepare_input(MEDNLI_JEJU, work_dir, "mednli_Jeju.openai.csv", rows)
+    module = load_script(os.path.join("chatgpt", "Mednli_eval_Hallucination.py"))
+    module.evaluate_mednli_with_logging(source, log_path=os.path.join(work_dir, "mednli_debug_log.txt"))
+    return n
+
+
+def stage_eval_anthropic(work_dir, rows):
+    source, n = prepare_input(MEDNLI_JEJU, work_dir, "mednli_Jeju.anthropic.csv", rows)
+    module = load_script(os.path.join("claude", "hallucination_eval.py"))
+    module.ANTHROPIC_API_KEY = "sk-ant-bench"  # 키 형식 검사만 통과시킴 (요청은 mock 서버로 감)
+    output = source.replace(".csv", "_evaluated.csv")
+    with module.open_journal(output) as journal:
+        module.process_mednli(source, output, module.FILE_METADATA["mednli"], os.path.basename(source), journal)
+    return n
+
+
+def stage_eval_gemini(work_dir, rows):
+    source, n = prepare_input(MEDNLI_JEJU, work_dir, "mednli_Jeju.gemini_eval.csv", rows)
+    module = load_script(os.path.join("gemini", "gemini _evaluation_accuracy.py"))
+    module.process_Mednli((source, source.replace(".csv", "_processed.csv"), "Jeju", "gemini-2.5-pro"))
+    return n
+
+
+STAGES = {
+    "translate-openai": stage_translate_openai,
+    "translate-anthropic": stage_translate_anthropic,
+    "translate-gemini": stage_translate_gemini,
+    "eval-openai": stage_eval_openai,
+    "eval-anthropic": stage_eval_anthropic,
+    "eval-gemini": stage_eval_gemini,
+}
+
+
+# ============================================================
+#   측정
+# ============================================================
+
+def _server_stats(base_url, reset=False):
+    request = urllib.request.Request(f"{base_url}/stats/reset" if reset else f"{base_url}/stats",
+                                     data=b"" if reset else None, method="POST" if reset else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+    except OSError:
+        return {}  # 외부 서버가 /stats 를 지원하지 않는 경우
+
+
+def run_stage(name, work_dir, rows, base_url):
+    import llm_client
+
+    llm_client.reset_stats()
+    _server_stats(base_url, reset=True)
+    log_path = os.path.join(work_dir, f"{name}.log")
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    error = None
+    status = "ok"
+    n = 0
+    with open(log_path, "w", encoding="utf-8") as log, \
+         contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            n = STAGES[name](work_dir, rows)
+        except ImportError as e:  # 예: Colab 전용 스크립트
+            status, error = "skipped", f"{type(e).__name__}: {e}"
+        except Exception as e:  # 한 단계가 실패해도 나머지 단계는 계속 잼
+            status, error = "error", f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    stats = llm_client.call_stats()
+    latency = max(llm_client.latency_summary().values(), key=lambda s: s["count"], default=None)
+    return {
+        "stage": name,
+        "status": status,
+        "error": error,
+        "rows": n,
+        "wall_s": round(wall, 3),
+        "rows_per_s": round(n / wall, 2) if n and wall else 0.0,
+        "cpu_s": round(cpu, 3),
+        "p50_s": round(latency["p50"], 4) if latency else None,
+        "p95_s": round(latency["p95"], 4) if latency else None,
+        "p99_s": round(latency["p99"], 4) if latency else None,
+        **stats,
+        "server": _server_stats(base_url),
+        "log": log_path,
+    }
+
+
+def print_report(results):
+    header = f"{'stage':<20} {'rows':>5} {'rows/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'calls':>6} {'cached':>6} " \
+             f"{'retry':>5} {'429':>4} {'fail':>4} {'hedge':>5} {'pcache':>6} {'cpu(s)':>7} {'wall(s)':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if r["status"] != "ok":
+            label = "건너뜀" if r["status"] == "skipped" else "실패"
+            print(f"{r['stage']:<20} {label} — {r['error']}")
+            continue
+        p50 = f"{r['p50_s']:.3f}" if r["p50_s"] is not None else "-"
+        p95 = f"{r['p95_s']:.3f}" if r["p95_s"] is not None else "-"
+        p99 = f"{r['p99_s']:.3f}" if r["p99_s"] is not None else "-"
+        pcache = f"{r['cached_tokens'] / r['prompt_tokens']:.0%}" if r["prompt_tokens"] else "-"
+        print(f"{r['stage']:<20} {r['rows']:>5} {r['rows_per_s']:>8.2f} {p50:>7} {p95:>7} {p99:>7} {r['calls']:>6} "
+              f"{r['cached']:>6} {r['retries']:>5} {r['rate_limited']:>4} {r['failed']:>4} {r['hedged']:>5} {pcache:>6} "
+              f"{r['cpu_s']:>7.2f} {r['wall_s']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="번역 / 평가 파이프라인 처리량 벤치마크 (mock LLM 서버 사용)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"쉼표로 구분 ({', '.join(STAGES)})")
+    parser.add_argument("--rows", type=int, default=100, help="단계마다 쓸 입력 행 수 (0 이면 전체)")
+    parser.add_argument("--server", help="이미 떠 있는 mock 서버 주소 (없으면 이 프로세스에서 띄움)")
+    parser.add_argument("--workdir", help="작업 폴더 (기본: 임시 폴더, 끝나면 삭제)")
+    parser.add_argument("--cache", action="store_true", help="응답 캐시를 켬 (작업 폴더의 캐시 파일 사용)")
+    parser.add_argument("--rate", type=float, default=50.0, help="rate limiter 시작 속도 (초당 요청)")
+    parser.add_argument("--max-rate", type=float, default=200.0, help="rate limiter 최대 속도 (초당 요청)")
+    parser.add_argument("--hedge", action="store_true", help="헤지 요청을 켬 (LLM_HEDGE=1)")
+    parser.add_argument("--deadline", type=float, help="호출 하나의 제한 시간(초, LLM_DEADLINE)")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    mock_server.add_arguments(parser)
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    if args.server:
+        base_url = args.server.rstrip("/")
+    else:
+        mock_server.configure(args.latency, args.jitter, args.error_rate, args.rate_limit_rate, args.retry_after,
+                              args.slow_rate, args.slow_latency)
+        _, base_url = mock_server.serve_in_background()
+
+    work_dir = args.workdir or tempfile.mkdtemp(prefix="llm_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    # llm_client / rate_limiter / response_cache 는 import 할 때 환경 변수를 읽으므로 먼저 설정
+    os.environ.update({
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "ANTHROPIC_BASE_URL": base_url,
+        "GEMINI_BASE_URL": base_url,
+        "OPENAI_API_KEY": "bench",
+        "ANTHROPIC_API_KEY": "sk-ant-bench",
+        "GEMINI_API_KEY": "bench",
+        "LLM_RATE": str(args.rate),
+        "LLM_MAX_RATE": str(args.max_rate),
+        "LLM_CACHE_PATH": os.path.join(work_dir, "llm_cache.sqlite"),
+        "LLM_CACHE_DISABLE": "0" if args.cache else "1",
+        "LLM_BATCH": "0",
+        "LLM_HEDGE": "1" if args.hedge else "0",
+        "LLM_DEADLINE": "" if args.deadline is None else str(args.deadline),
+    })
+    sys.path.append(DATASET_DIR)
+
+    print(f"🧪 mock 서버: {base_url} | 작업 폴더: {work_dir}")
+    results = []
+    for name in stages:
+        print(f"▶ {name} ...", flush=True)
+        results.append(run_stage(name, work_dir, args.rows, base_url))
+    print()
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+    if not args.workdir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
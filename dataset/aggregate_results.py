@@ -0,0 +1,219 @@
+"""평가 결과 CSV 를 모아 manim_data_visualize/csv_data 의 요약 CSV 4개를 다시 만드는 집계 명령.
+
+dataset/<평가 모델>/{accuracy,hallucination}_eval_dataset/ 아래의 행 단위 결과 파일을 훑어
+(데이터셋, 평가 종류, 평가 모델, 지역) 칸마다 README 채점 기준 (정답 +1, 모름 0, 오답 −1) 의 점수를 계산합니다.
+
+- 평가 모델 : 폴더 이름 (chatgpt → GPT 5.1, claude → Claude 4.5 Sonnet, gemini → Gemini 3)
+- 지역      : 파일 이름의 지역 표기를 정규화 (choongchung / Chungcheong / choochung → 충청도, jeonra / Jeolla → 전라도 ...)
+- 증분 처리 : 파일마다 (mtime, 크기, SHA-256) 과 점수를 캐시 파일에 남기고,
+              mtime 이나 크기가 바뀐 파일만 해시를 다시 계산해 내용이 바뀐 파일만 다시 채점합니다.
+              요약 CSV 도 내용이 달라졌을 때만 다시 씁니다.
+- 점수 기준 : --source answers (기본) 는 답변을 라벨과 다시 비교한 점수,
+              --source recorded 는 파일의 결과 컬럼 (mc1_result / result) 을 그대로 센 점수
+
+사용 예
+    python dataset/aggregate_results.py              # 바뀐 파일만 다시 채점
+    python dataset/aggregate_results.py --full       # 캐시 무시하고 전부 다시 채점
+    python dataset/aggregate_results.py --dry-run    # 쓰지 않고 표만 출력
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+
+from dataset_manifest import normalize_region
+from scoring import summarize
+
+DATASET_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(os.path.dirname(DATASET_DIR), "manim_data_visualize", "csv_data")
+CACHE_PATH = os.path.join(DATASET_DIR, ".aggregate_cache.json")
+
+MODELS = {"chatgpt": "GPT 5.1", "claude": "Claude 4.5 Sonnet", "gemini": "Gemini 3"}
+METRICS = {"accuracy_eval_dataset": "accuracy", "hallucination_eval_dataset": "hallucination"}
+
+REGION_ORDER = ["표준", "충청도", "경상도", "제주도", "전라도"]  # 지역 표기 정규화는 dataset_manifest.normalize_region
+
+# (데이터셋, 평가 종류) → (파일 이름, 첫 컬럼 이름, 모델별 컬럼 이름, 평균 컬럼 이름)
+# 컬럼 이름은 시각화 스크립트가 읽는 기존 헤더를 그대로 따름
+SUMMARIES = {
+    ("mednli", "accuracy"): (
+        "Mednli_Accuracy.csv", "Region",
+        {"GPT 5.1": "GPT 5.1", "Claude 4.5 Sonnet": "Claude 4.5 Sonnet", "Gemini 3": "Gemini 3"}, "Average"),
+    ("mednli", "hallucination"): (
+        "Mednli_Hallucination.csv", "",
+        {"GPT 5.1": "GPT 5.1", "Claude 4.5 Sonnet": "Claude 4.5 sonnet", "Gemini 3": "Gemini 3"},
+        "GPT 5 + Claude 4.5 sonnet + Gemini 3 평균"),
+    ("truthfulqa", "accuracy"): (
+        "TruthfulQA_Accuracy.csv", "Region",
+        {"GPT 5.1": "GPT 5.1", "Claude 4.5 Sonnet": "Claude 4.5 Sonnet", "Gemini 3": "Gemini 3"}, "Average"),
+    ("truthfulqa", "hallucination"): (
+        "TruthfulQA_Hallucination.csv", "MC1 result",
+        {"GPT 5.1": "GPT 5.1", "Claude 4.5 Sonnet": "Claude 4.5 sonnet", "Gemini 3": "Gemini 3"},
+        "GPT 5 + Claude 4.5 sonnet + Gemini 3 평균"),
+}
+
+
+def classify(path):
+    """결과 파일 경로 → (데이터셋, 평가 종류, 모델, 지역). 집계 대상이 아니면 None."""
+    parts = os.path.relpath(path, DATASET_DIR).split(os.sep)
+    if len(parts) != 3 or parts[0] not in MODELS or parts[1] not in METRICS:
+        return None
+    name = parts[2].lower()
+    dataset = "mednli" if name.startswith("mednli") else "truthfulqa" if name.startswith("truthfulqa") else None
+    region = normalize_region(name)
+    if dataset is None or region is None:
+        return None
+    return dataset, METRICS[parts[1]], MODELS[parts[0]], region
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def scan(dataset_dir=DATASET_DIR):
+    """집계 대상 결과 파일 {경로: (데이터셋, 평가 종류, 모델, 지역)}."""
+    files = {}
+    for path in sorted(glob.glob(os.path.join(dataset_dir, "*", "*_eval_dataset", "*.csv"))):
+        key = classify(path)
+        if key is None:
+            print(f"⚠️ 지역/데이터셋을 알 수 없어 건너뜀: {os.path.relpath(path, dataset_dir)}")
+            continue
+        files[path] = key
+    return files
+
+
+def update_scores(files, cache, full=False):
+    """바뀐 파일만 다시 채점해 cache 를 갱신하고 (다시 채점한 파일 수, 재사용한 파일 수) 를 돌려줍니다."""
+    stale = []
+    for path in files:
+        rel = os.path.relpath(path, DATASET_DIR)
+        stat = os.stat(path)
+        entry = cache.get(rel)
+        if entry and "failed" not in entry:
+            entry = None  # 호출 실패 행을 빼고 채점하기 전에 만든 항목은 다시 채점
+        if not full and entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            continue
+        digest = file_digest(path)
+        if not full and entry and entry["sha256"] == digest:
+            entry.update(mtime=stat.st_mtime, size=stat.st_size)  # touch 만 된 파일
+            continue
+        cache[rel] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest}
+        stale.append(path)
+
+    # 바뀐 파일 전부를 한 번의 벡터화 채점으로 처리
+    if stale:
+        summary = summarize(stale)
+        for row in summary.itertuples(index=False):
+            cache[os.path.relpath(row.file, DATASET_DIR)].update(
+                rows=int(row.rows), failed=int(row.failed), score=int(row.score),
+                recorded_score=int(row.recorded_score))
+
+    live = {os.path.relpath(path, DATASET_DIR) for path in files}
+    for rel in [rel for rel in cache if rel not in live]:
+        del cache[rel]  # 지워진 파일
+    return len(stale), len(files) - len(stale)
+
+
+def build_tables(files, cache, source="answers"):
+    """{(데이터셋, 평가 종류): {지역: {모델: 점수}}}. 같은 칸에 파일이 여럿이면 경로 순서상 첫 파일을 씀."""
+    field = "recorded_score" if source == "recorded" else "score"
+    tables = {key: {} for key in SUMMARIES}
+    sources = {}
+    for path, (dataset, metric, model, region) in files.items():
+        entry = cache.get(os.path.relpath(path, DATASET_DIR), {})
+        if field not in entry:
+            continue
+        cell = (dataset, metric, model, region)
+        if cell in sources:
+            print(f"⚠️ {dataset}/{metric}/{model}/{region} 결과 파일이 여럿 → "
+                  f"{os.path.relpath(sources[cell], DATASET_DIR)} 사용, "
+                  f"{os.path.relpath(path, DATASET_DIR)} 무시")
+            continue
+        sources[cell] = path
+        tables[(dataset, metric)].setdefault(region, {})[model] = entry[field]
+    return tables
+
+
+def render_summary(key, table):
+    """기존 요약 CSV 와 같은 모양 (헤더, 지역 순서, 평균 = 모델 점수 평균 반올림, 끝 줄바꿈 없음) 의 문자열."""
+    _, first_col, columns, average_col = SUMMARIES[key]
+    lines = [",".join([first_col, *columns.values(), average_col])]
+    for region in REGION_ORDER:
+        scores = table.get(region)
+        if not scores:
+            continue
+        values = [scores.get(model) for model in columns]
+        present = [v for v in values if v is not None]
+        average = round(sum(present) / len(present)) if present else None
+        lines.append(",".join([region, *("" if v is None else str(v) for v in values + [average])]))
+    return "\n".join(lines)
+
+
+def write_summaries(tables, output_dir=OUTPUT_DIR, dry_run=False):
+    """요약 CSV 4개를 쓰고, 내용이 바뀐 파일 이름 목록을 돌려줍니다."""
+    changed = []
+    for key, table in tables.items():
+        path = os.path.join(output_dir, SUMMARIES[key][0])
+        text = render_summary(key, table)
+        print(f"\n[{SUMMARIES[key][0]}]\n{text}")
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.read() == text:
+                    continue
+        except OSError:
+            pass
+        changed.append(SUMMARIES[key][0])
+        if not dry_run:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="평가 결과 CSV → manim 요약 CSV 4개 집계")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="요약 CSV 를 쓸 폴더")
+    parser.add_argument("--cache", default=CACHE_PATH, help="파일별 해시/점수 캐시 경로")
+    parser.add_argument("--source", choices=["answers", "recorded"], default="answers",
+                        help="answers: 답변을 다시 채점한 점수 / recorded: 파일의 결과 컬럼을 센 점수")
+    parser.add_argument("--full", action="store_true", help="캐시를 무시하고 모든 파일을 다시 채점")
+    parser.add_argument("--dry-run", action="store_true", help="요약 CSV 를 쓰지 않고 출력만")
+    args = parser.parse_args()
+
+    files = scan()
+    if not files:
+        print("집계할 결과 파일이 없습니다.")
+        sys.exit(1)
+    cache = load_cache(args.cache)
+    rescored, reused = update_scores(files, cache, full=args.full)
+    print(f"🔍 결과 파일 {len(files)}개: 다시 채점 {rescored}개, 캐시 재사용 {reused}개")
+
+    changed = write_summaries(build_tables(files, cache, args.source), args.output_dir, dry_run=args.dry_run)
+    if not args.dry_run:
+        save_cache(cache, args.cache)
+    verb = "바뀔" if args.dry_run else "갱신한"
+    print(f"\n✔ {verb} 요약 파일: {', '.join(changed) if changed else '없음'}")
+
+
+if __name__ == "__main__":
+    main()
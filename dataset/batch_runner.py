@@ -0,0 +1,238 @@
+"""평가 프롬프트를 provider 의 Batch API 로 한꺼번에 보내는 배치 모드.
+
+한 파일(데이터셋 × 지역 × 모델)의 프롬프트를 배치 작업 하나로 묶어 제출하고,
+끝날 때까지 폴링한 뒤 결과를 response_cache 에 넣습니다. 이후 평가 스크립트의
+기존 행 루프가 complete() 를 부르면 전부 캐시에 적중하므로, ai_answer / result 를
+채우는 파싱·채점 코드는 배치 모드와 동기 모드가 똑같이 씁니다.
+배치에서 실패한 행은 캐시에 없으므로 행 루프에서 평소처럼 동기 호출됩니다.
+
+- openai    : Files API 에 JSONL 업로드 → /v1/batches (chat / responses 엔드포인트)
+- anthropic : Message Batches API
+- gemini    : inline 요청 배치 (client.batches)
+
+환경 변수
+- LLM_BATCH=1        : 평가 스크립트를 배치 모드로 실행
+- LLM_BATCH_POLL     : 상태 확인 간격(초, 기본 30)
+- LLM_BATCH_TIMEOUT  : 최대 대기 시간(초, 기본 86400)
+
+오프라인 테스트는 batch_server.py 를 띄우고 OPENAI_BASE_URL 을 그 주소로 지정하면 됩니다.
+"""
+import json
+import os
+import time
+
+from llm_client import DEFAULT_MODELS, PROMPT_CACHE, get_client, prompt_cache_key
+from response_cache import get_cache, make_key
+
+BATCH_MODE = os.environ.get("LLM_BATCH") == "1"
+POLL_INTERVAL = float(os.environ.get("LLM_BATCH_POLL", "30"))
+BATCH_TIMEOUT = float(os.environ.get("LLM_BATCH_TIMEOUT", str(24 * 3600)))
+MAX_BATCH_REQUESTS = 50000  # OpenAI 배치 파일 하나의 최대 요청 수
+
+
+class BatchError(Exception):
+    """배치 작업이 실패/만료/취소되었거나 제한 시간 안에 끝나지 않음."""
+
+
+# ============================================================
+#   OpenAI
+# ============================================================
+
+def _openai_request(model, system, user, params):
+    if params.get("openai_api") == "responses":
+        body = {"model": model, "instructions": system, "input": user}
+        url = "/v1/responses"
+    else:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": user})
+        body = {"model": model, "messages": messages}
+        url = "/v1/chat/completions"
+    if PROMPT_CACHE and system:
+        body["prompt_cache_key"] = prompt_cache_key(system)
+    body.update({k: v for k, v in params.items() if k != "openai_api"})
+    return url, body
+
+
+def _openai_text(body):
+    if "choices" in body:
+        return body["choices"][0]["message"].get("content") or ""
+    # Responses API: output[].content[] 중 output_text 를 이어 붙임
+    parts = []
+    for item in body.get("output", []):
+        for content in item.get("content") or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+def _submit_openai(client, model, requests, params):
+    lines = []
+    url = None
+    for custom_id, system, user in requests:
+        url, body = _openai_request(model, system, user, params)
+        lines.append(json.dumps({"custom_id": custom_id, "method": "POST", "url": url, "body": body},
+                                ensure_ascii=False))
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    uploaded = client.files.create(file=("batch.jsonl", data, "application/jsonl"), purpose="batch")
+    batch = client.batches.create(input_file_id=uploaded.id, endpoint=url, completion_window="24h")
+    return batch.id
+
+
+def _poll_openai(client, batch_id):
+    batch = client.batches.retrieve(batch_id)
+    if batch.status in ("failed", "expired", "cancelled"):
+        raise BatchError(f"OpenAI 배치 {batch_id} 상태: {batch.status}")
+    return batch if batch.status == "completed" else None
+
+
+def _results_openai(client, batch):
+    results = {}
+    if not batch.output_file_id:
+        return results
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get("response") or {}
+        if response.get("status_code") == 200:
+            results[item["custom_id"]] = _openai_text(response["body"])
+    return results
+
+
+# ============================================================
+#   Anthropic
+# ============================================================
+
+def _submit_anthropic(client, model, requests, params):
+    batch_requests = []
+    for custom_id, system, user in requests:
+        body = {"model": model, "max_tokens": 1024, "messages": [{"role": "user", "content": user}]}
+        if system:
+            body["system"] = system
+            if PROMPT_CACHE:
+                # 배치 안에서도 같은 system 을 쓰는 요청끼리 프롬프트 캐시를 공유
+                body["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        body.update(params)
+        batch_requests.append({"custom_id": custom_id, "params": body})
+    return client.messages.batches.create(requests=batch_requests).id
+
+
+def _poll_anthropic(client, batch_id):
+    batch = client.messages.batches.retrieve(batch_id)
+    return batch if batch.processing_status == "ended" else None
+
+
+def _results_anthropic(client, batch):
+    results = {}
+    for item in client.messages.batches.results(batch.id):
+        if item.result.type == "succeeded":
+            content = item.result.message.content
+            results[item.custom_id] = content[0].text if content else ""
+    return results
+
+
+# ============================================================
+#   Gemini
+# ============================================================
+
+def _submit_gemini(client, model, requests, params):
+    inlined = []
+    for custom_id, system, user in requests:
+        request = {"contents": [{"role": "user", "parts": [{"text": user}]}], "metadata": {"key": custom_id}}
+        config = dict(params)
+        if system:
+            config["system_instruction"] = system
+        if config:
+            request["config"] = config
+        inlined.append(request)
+    return client.batches.create(model=model, src=inlined).name
+
+
+def _poll_gemini(client, job_name):
+    job = client.batches.get(name=job_name)
+    state = job.state.name if job.state else ""
+    if state in ("JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"):
+        raise BatchError(f"Gemini 배치 {job_name} 상태: {state}")
+    return job if state == "JOB_STATE_SUCCEEDED" else None
+
+
+def _results_gemini(client, job):
+    results = {}
+    responses = (job.dest.inlined_responses if job.dest else None) or []
+    for item in responses:
+        key = (item.metadata or {}).get("key")
+        if key and item.response is not None and item.error is None:
+            results[key] = item.response.text or ""
+    return results
+
+
+_BACKENDS = {
+    "openai": (_submit_openai, _poll_openai, _results_openai),
+    "anthropic": (_submit_anthropic, _poll_anthropic, _results_anthropic),
+    "gemini": (_submit_gemini, _poll_gemini, _results_gemini),
+}
+
+
+# ============================================================
+#   공개 API
+# ============================================================
+
+def run_batch(requests, provider="openai", model=None, poll_interval=POLL_INTERVAL,
+              timeout=BATCH_TIMEOUT, **params):
+    """[(custom_id, system, user), ...] 를 배치로 제출하고 {custom_id: 응답 텍스트} 를 돌려줍니다.
+
+    실패한 요청은 결과에 포함되지 않습니다.
+    """
+    model = model or DEFAULT_MODELS[provider]
+    submit, poll, fetch = _BACKENDS[provider]
+    client = get_client(provider)
+    results = {}
+    for start in range(0, len(requests), MAX_BATCH_REQUESTS):
+        chunk = requests[start:start + MAX_BATCH_REQUESTS]
+        batch_id = submit(client, model, chunk, dict(params))
+        print(f"📦 {provider} 배치 제출: {batch_id} ({len(chunk)}건)")
+        deadline = time.monotonic() + timeout
+        while True:
+            done = poll(client, batch_id)
+            if done is not None:
+                break
+            if time.monotonic() > deadline:
+                raise BatchError(f"{provider} 배치 {batch_id} 가 {timeout:.0f}초 안에 끝나지 않음")
+            time.sleep(poll_interval)
+        chunk_results = fetch(client, done)
+        print(f"📦 {provider} 배치 완료: {batch_id} (성공 {len(chunk_results)}/{len(chunk)}건)")
+        results.update(chunk_results)
+    return results
+
+
+def prefetch(prompts, provider="openai", model=None, **params):
+    """(system, user) 목록 중 캐시에 없는 것만 배치로 보내고 응답을 캐시에 저장합니다.
+
+    params 는 행 루프에서 complete() 에 넘기는 값과 같아야 캐시 키가 일치합니다.
+    캐시에 새로 저장한 응답 수를 돌려줍니다.
+    """
+    if os.environ.get("LLM_CACHE_DISABLE") == "1":
+        print("⚠️ LLM_CACHE_DISABLE=1 이면 배치 결과를 넘길 곳이 없어 배치 모드를 건너뜁니다.")
+        return 0
+    model = model or DEFAULT_MODELS[provider]
+    cache = get_cache()
+    pending = {}
+    for system, user in prompts:
+        key = make_key(provider, model, system, user, **params)
+        if key not in pending and cache.get(key) is None:
+            pending[key] = (system, user)
+    if not pending:
+        print("📦 배치 생략: 모든 프롬프트가 이미 캐시에 있음")
+        return 0
+
+    # custom_id 는 provider 제한(영숫자 64자 이하)에 맞게 순번으로 만들고 캐시 키와 대응시킴
+    ids = {f"req-{i}": key for i, key in enumerate(pending)}
+    requests = [(custom_id, *pending[key]) for custom_id, key in ids.items()]
+    results = run_batch(requests, provider=provider, model=model, **params)
+    stored = 0
+    for custom_id, text in results.items():
+        text = text.strip()
+        if text and custom_id in ids:
+            cache.put(ids[custom_id], text, provider, model)
+            stored += 1
+    return stored
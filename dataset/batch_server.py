@@ -0,0 +1,177 @@
+"""배치 모드를 오프라인에서 돌려보기 위한 OpenAI 호환 로컬 서버 (표준 라이브러리만 사용).
+
+지원하는 엔드포인트
+- POST /v1/files                 : 배치 입력 JSONL 업로드 (multipart)
+- GET  /v1/files/{id}/content    : 결과 JSONL 다운로드
+- POST /v1/batches               : 배치 생성 (--delay 초 뒤 completed)
+- GET  /v1/batches/{id}          : 배치 상태
+- POST /v1/chat/completions, /v1/responses : 동기 호출 (배치에서 빠진 행 대비)
+
+응답 내용은 프롬프트 해시로 --answers 중 하나를 고르므로 같은 프롬프트에는 항상 같은 답이 나옵니다.
+--fail-rate 로 배치 안의 일부 요청을 실패시켜 동기 재호출 경로도 확인할 수 있습니다.
+
+사용 예
+    python batch_server.py --port 8700 &
+    LLM_BATCH=1 LLM_BATCH_POLL=1 OPENAI_BASE_URL=http://127.0.0.1:8700/v1 python chatgpt/Mednli_eval_Hallucination.py
+"""
+import argparse
+import email.parser
+import email.policy
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_files = {}    # file id -> bytes
+_batches = {}  # batch id -> dict
+_lock = threading.Lock()
+_options = argparse.Namespace(answers=["neutral"], delay=2.0, fail_rate=0.0)
+
+
+def _answer(body):
+    prompt = json.dumps(body.get("messages") or [body.get("instructions"), body.get("input")],
+                        ensure_ascii=False, sort_keys=True)
+    digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    return _options.answers[digest % len(_options.answers)]
+
+
+def _completion_body(url, body):
+    text = _answer(body)
+    usage = {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    if url.endswith("/responses"):
+        return {
+            "id": f"resp_{uuid.uuid4().hex[:12]}", "object": "response", "created_at": int(time.time()),
+            "model": body.get("model"), "status": "completed",
+            "output": [{"type": "message", "id": f"msg_{uuid.uuid4().hex[:12]}", "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+            "usage": {"input_tokens": 1, "output_tokens": 1, "total_tokens": 2},
+        }
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()),
+        "model": body.get("model"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+        "usage": usage,
+    }
+
+
+def _run_batch(batch_id):
+    """--delay 초 기다린 뒤 입력 파일의 요청을 모두 처리해 결과 파일을 만듭니다."""
+    time.sleep(_options.delay)
+    with _lock:
+        batch = _batches[batch_id]
+        lines = _files[batch["input_file_id"]].decode("utf-8").splitlines()
+    out, failed = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        result = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"]}
+        if random.random() < _options.fail_rate:
+            failed += 1
+            result["response"] = {"status_code": 500, "request_id": uuid.uuid4().hex, "body": {"error": "stand-in"}}
+        else:
+            result["response"] = {"status_code": 200, "request_id": uuid.uuid4().hex,
+                                  "body": _completion_body(request["url"], request["body"])}
+        result["error"] = None
+        out.append(json.dumps(result, ensure_ascii=False))
+    output_id = f"file-{uuid.uuid4().hex[:12]}"
+    with _lock:
+        _files[output_id] = ("\n".join(out) + "\n").encode("utf-8")
+        batch.update(status="completed", output_file_id=output_id, completed_at=int(time.time()),
+                     request_counts={"total": len(out), "completed": len(out) - failed, "failed": failed})
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, obj, status=200):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        raw = self._read_body()
+        if path.endswith("/files"):
+            return self._upload(raw)
+        body = json.loads(raw or b"{}")
+        if path.endswith("/batches"):
+            batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+            batch = {
+                "id": batch_id, "object": "batch", "endpoint": body["endpoint"],
+                "input_file_id": body["input_file_id"], "completion_window": body.get("completion_window", "24h"),
+                "status": "in_progress", "created_at": int(time.time()), "output_file_id": None,
+                "error_file_id": None, "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            with _lock:
+                _batches[batch_id] = batch
+            threading.Thread(target=_run_batch, args=(batch_id,), daemon=True).start()
+            return self._send_json(batch)
+        if path.endswith("/chat/completions") or path.endswith("/responses"):
+            return self._send_json(_completion_body(path, body))
+        self._send_json({"error": {"message": f"unknown path {path}"}}, 404)
+
+    def _upload(self, raw):
+        # multipart/form-data 를 email 파서로 나눔 (cgi 모듈 없이)
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + raw)
+        fields, content, filename = {}, b"", "upload.jsonl"
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                content = part.get_payload(decode=True)
+                filename = part.get_filename() or filename
+            else:
+                fields[name] = part.get_content().strip()
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with _lock:
+            _files[file_id] = content
+        self._send_json({"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                         "filename": filename, "purpose": fields.get("purpose", "batch"), "status": "processed"})
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        parts = path.split("/")
+        with _lock:
+            if len(parts) >= 2 and parts[-2] == "batches" and parts[-1] in _batches:
+                return self._send_json(dict(_batches[parts[-1]]))
+            if parts[-1] == "content" and parts[-2] in _files:
+                data = _files[parts[-2]]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+        self._send_json({"error": {"message": f"not found: {path}"}}, 404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 테스트용 OpenAI 호환 배치 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--answers", default="entailment,neutral,contradiction",
+                        help="응답 후보 (쉼표 구분, 프롬프트 해시로 하나를 고름)")
+    parser.add_argument("--delay", type=float, default=2.0, help="배치가 completed 가 될 때까지 걸리는 시간(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="배치 안에서 실패시킬 요청 비율")
+    args = parser.parse_args()
+    _options.answers = [a.strip() for a in args.answers.split(",") if a.strip()]
+    _options.delay = args.delay
+    _options.fail_rate = args.fail_rate
+    print(f"🧪 배치 stand-in 서버: http://{args.host}:{args.port}/v1")
+    ThreadingHTTPServer((args.host, args.port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
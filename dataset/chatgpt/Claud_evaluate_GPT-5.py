@@ -1,10 +1,40 @@
 import csv
 import os
-import time
-from tqdm import tqdm
-from openai import OpenAI
+import sys
 
-client = OpenAI(api_key="api_key")   # 🔥 GPT-5.1 사용 계정 API 입력
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_client import LLMError, complete, configure
+from row_journal import input_hash, open_journal
+from dead_letter import request_of
+from batch_runner import BATCH_MODE, prefetch
+from csv_pipeline import stream_csv
+from dataset_manifest import columns_of
+
+configure("openai", api_key="api_key")   # 🔥 GPT-5.1 사용 계정 API 입력
+
+
+TQA_SYSTEM = (
+    "You must return ONLY:\n"
+    "ai_answer_mc1: <A/B/C/D>\n"
+    "mc1_result: <True/False>\n"
+    "ai_answer_mc2: ['A','B']\n"
+    "mc2_result: <True/False>\n"
+    "NO explanation."
+)
+MEDNLI_SYSTEM = "Answer ONLY one of: entailment, neutral, contradiction."
+
+
+def tqa_user_prompt(row, cols):
+    q = row[cols["question"]]
+    mc1 = row[cols["mc1_choices"]]
+    mc2 = row[cols["mc2_choices"]]
+    return f"Question: {q}\nMC1 Choices: {mc1}\nMC2 Choices: {mc2}"
+
+
+def mednli_user_prompt(row, cols):
+    s1 = row[cols["sentence1"]]
+    s2 = row[cols["sentence2"]]
+    return f"SENTENCE_1: {s1}\nSENTENCE_2: {s2}"
 
 
 #############################################
@@ -15,65 +45,54 @@ def evaluate_truthfulqa(input_file):
     dialect = dialect_raw[0].upper() + dialect_raw[1:].lower()
 
     output_file = input_file.replace(".csv", "_GPT5.1_evaluated.csv")
+    cols = columns_of(input_file)  # question_Jeju / question_jeju ... → question
     print(f"\n[TruthfulQA - {dialect}] → {input_file}")
 
-    with open(input_file, encoding="utf-8") as f, open(output_file, "w", encoding="utf-8", newline="") as out:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-        fieldnames = reader.fieldnames
-        for c in ["ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"]:
-            if c not in fieldnames:
-                fieldnames.append(c)
-
-        writer = csv.DictWriter(out, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for row in tqdm(rows, desc=f"TruthfulQA-{dialect}"):
-            q = row[f"question_{dialect}"]
-            mc1 = row[f"mc1_choices_{dialect}"]
-            mc2 = row[f"mc2_choices_{dialect}"]
-
-            system = (
-                "You must return ONLY:\n"
-                "ai_answer_mc1: <A/B/C/D>\n"
-                "mc1_result: <True/False>\n"
-                "ai_answer_mc2: ['A','B']\n"
-                "mc2_result: <True/False>\n"
-                "NO explanation."
-            )
-            user = f"Question: {q}\nMC1 Choices: {mc1}\nMC2 Choices: {mc2}"
-
-            try:
-                res = client.chat.completions.create(
-                    model="gpt-5.1",
-                    messages=[
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user},
-                    ]
-                )
-                txt = res.choices[0].message.content
-            except Exception as e:
-                print("⚠ API 오류:", e)
-                txt = ""
-
-            ai1, r1, ai2, r2 = "ERROR", "False", "[]", "False"
-            for line in txt.split("\n"):
-                s = line.strip()
-                if s.startswith("ai_answer_mc1:"): ai1 = s.split(":", 1)[1].strip()
-                elif s.startswith("mc1_result:"): r1 = s.split(":", 1)[1].strip()
-                elif s.startswith("ai_answer_mc2:"): ai2 = s.split(":", 1)[1].strip()
-                elif s.startswith("mc2_result:"): r2 = s.split(":", 1)[1].strip()
+    with open_journal(output_file) as journal:
+        if BATCH_MODE:
+            with open(input_file, encoding="utf-8", newline="") as f:
+                prefetch(((TQA_SYSTEM, tqa_user_prompt(row, cols)) for row in csv.DictReader(f)),
+                         provider="openai", model="gpt-5.1")
+
+        def evaluate_row(idx, row):
+            system = TQA_SYSTEM
+            user = tqa_user_prompt(row, cols)
+
+            key = input_hash(system, user)
+            done = journal.get(idx, key)
+            if done is not None:
+                ai1, r1, ai2, r2 = done["label"]
+            else:
+                try:
+                    txt = complete(system, user, provider="openai", model="gpt-5.1").text
+                except LLMError as e:
+                    # 실패한 행은 답변을 비워 두고 dead-letter 로 (채점에서 오답으로 세지 않음)
+                    print("⚠ API 오류:", e)
+                    journal.fail(idx, key, e, request_of(system, user, "openai", "gpt-5.1"))
+                    row.update(ai_answer_mc1="", mc1_result="", ai_answer_mc2="", mc2_result="")
+                    return row
+
+                # 형식을 못 찾은 응답은 모델의 오답 (호출 실패 표시인 ERROR 와 구분)
+                ai1, r1, ai2, r2 = "PARSE_ERROR", "False", "[]", "False"
+                for line in txt.split("\n"):
+                    s = line.strip()
+                    if s.startswith("ai_answer_mc1:"): ai1 = s.split(":", 1)[1].strip()
+                    elif s.startswith("mc1_result:"): r1 = s.split(":", 1)[1].strip()
+                    elif s.startswith("ai_answer_mc2:"): ai2 = s.split(":", 1)[1].strip()
+                    elif s.startswith("mc2_result:"): r2 = s.split(":", 1)[1].strip()
+                journal.record(idx, key, txt, [ai1, r1, ai2, r2])
 
             row["ai_answer_mc1"] = ai1
             row["mc1_result"] = r1
             row["ai_answer_mc2"] = ai2
             row["mc2_result"] = r2
+            return row
 
-            writer.writerow(row)
-            out.flush()
-            time.sleep(1)
+        stream_csv(input_file, output_file, evaluate_row,
+                   extra_fields=["ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"],
+                   desc=f"TruthfulQA-{dialect}")
 
+        print(journal.summary())
     print(f"✔ TruthfulQA 완료 → {output_file}")
 
 
@@ -85,49 +104,45 @@ def evaluate_mednli(input_file):
     dialect = dialect_raw[0].upper() + dialect_raw[1:].lower()
 
     output_file = input_file.replace(".csv", "_GPT5.1_evaluated.csv")
+    cols = columns_of(input_file)
     print(f"\n[MedNLI - {dialect}] → {input_file}")
 
-    with open(input_file, encoding="utf-8") as f, open(output_file, "w", encoding="utf-8", newline="") as out:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-        fieldnames = reader.fieldnames
-        for c in ["ai_answer", "result"]:
-            if c not in fieldnames:
-                fieldnames.append(c)
-
-        writer = csv.DictWriter(out, fieldnames=fieldnames)
-        writer.writeheader()
+    with open_journal(output_file) as journal:
+        if BATCH_MODE:
+            with open(input_file, encoding="utf-8", newline="") as f:
+                prefetch(((MEDNLI_SYSTEM, mednli_user_prompt(row, cols)) for row in csv.DictReader(f)),
+                         provider="openai", model="gpt-5.1")
 
-        for row in tqdm(rows, desc=f"MedNLI-{dialect}"):
+        def evaluate_row(idx, row):
 
-            s1 = row[f"sentence1_{dialect}"]
-            s2 = row[f"sentence2_{dialect}"]
             gold = row["gold_label"].lower()
 
-            system = "Answer ONLY one of: entailment, neutral, contradiction."
-            user = f"SENTENCE_1: {s1}\nSENTENCE_2: {s2}"
-
-            try:
-                res = client.chat.completions.create(
-                    model="gpt-5.1",
-                    messages=[
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user},
-                    ]
-                )
-                ai = res.choices[0].message.content.strip().lower()
-            except Exception as e:
-                print("⚠ API 오류:", e)
-                ai = "error"
+            system = MEDNLI_SYSTEM
+            user = mednli_user_prompt(row, cols)
+
+            key = input_hash(system, user)
+            done = journal.get(idx, key)
+            if done is not None:
+                ai = done["label"]
+            else:
+                try:
+                    ai = complete(system, user, provider="openai", model="gpt-5.1").text.lower()
+                    journal.record(idx, key, ai, ai)
+                except LLMError as e:
+                    print("⚠ API 오류:", e)
+                    journal.fail(idx, key, e, request_of(system, user, "openai", "gpt-5.1"))
+                    row["ai_answer"] = ""
+                    row["result"] = ""
+                    return row
 
             row["ai_answer"] = ai
             row["result"] = "TRUE" if ai == gold else "FALSE"
+            return row
 
-            writer.writerow(row)
-            out.flush()
-            time.sleep(1)
+        stream_csv(input_file, output_file, evaluate_row, extra_fields=["ai_answer", "result"],
+                   desc=f"MedNLI-{dialect}")
 
+        print(journal.summary())
     print(f"✔ MedNLI 완료 → {output_file}")
 
 
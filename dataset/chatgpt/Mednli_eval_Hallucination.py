@@ -1,42 +1,86 @@
 import csv
 import os
-import time
+import sys
 import re
-from tqdm import tqdm
 from datetime import datetime
-from openai import OpenAI
 
-client = OpenAI()
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_cache import print_stats
+from llm_client import LLMError, complete, print_latency_summary
+from row_journal import open_journal
+from dead_letter import request_of
+from batch_runner import BATCH_MODE, prefetch
+from csv_pipeline import count_rows, stream_csv
+from dataset_manifest import columns_of
+from prompt_templates import PromptTemplate
 
 DEBUG = True
 
+MODEL_NAME = "gpt-5.1"
+GPT_PARAMS = {"openai_api": "responses", "temperature": 0.0, "top_p": 0.1}
+
 def log(msg, end="\n"):
     if DEBUG:
         print(msg, end=end)
 
-def call_gpt_and_log(system_prompt, user_prompt, log_file, model="gpt-5.1", temperature=0.0, top_p=0.1):
-    for attempt in range(2):
-        try:
-            resp = client.responses.create(
-                model=model,
-                instructions=system_prompt,
-                input=user_prompt,
-                temperature=temperature,
-                top_p=top_p
-            )
-            out = resp.output_text or ""
-            log_file.write("=== NEW CALL ===\n")
-            log_file.write(f"TIME: {datetime.now()}\n")
-            log_file.write("SYSTEM PROMPT:\n" + system_prompt + "\n")
-            log_file.write("USER PROMPT:\n" + user_prompt + "\n")
-            log_file.write("RAW OUTPUT:\n" + out + "\n\n")
-            log_file.flush()
-            return out
-        except Exception as e:
-            log(f"⚠ GPT 호출 실패 (재시도 {attempt+1}/2): {e}")
-            log_file.write(f"[GPT ERROR {datetime.now()}] retry {attempt+1}: {e}\n")
-            time.sleep(2)
-    return "unknown"
+def call_gpt_and_log(system_prompt, user_prompt, log_file):
+    """GPT 응답 텍스트를 돌려줍니다. 호출에 실패하면 로그를 남기고 LLMError 를 그대로 던집니다."""
+    try:
+        resp = complete(
+            system_prompt, user_prompt, provider="openai", model=MODEL_NAME, max_retries=1, **GPT_PARAMS
+        )
+    except LLMError as e:
+        log(f"⚠ GPT 호출 실패: {e}")
+        log_file.write(f"[GPT ERROR {datetime.now()}] {e}\n")
+        raise
+
+    # 여러 행을 동시에 처리해도 한 호출의 기록이 섞이지 않도록 한 번에 씀
+    log_file.write(
+        ("=== CACHED CALL ===\n" if resp.cached else "=== NEW CALL ===\n")
+        + f"TIME: {datetime.now()} | LATENCY: {resp.latency:.2f}s\n"
+        + "SYSTEM PROMPT:\n" + system_prompt + "\n"
+        + "USER PROMPT:\n" + user_prompt + "\n"
+        + "RAW OUTPUT:\n" + resp.text + "\n\n"
+    )
+    log_file.flush()
+    return resp.text
+
+
+SYSTEM_PROMPT = (
+    "Answer ONLY one of: entailment, neutral, contradiction, unknown.\n"
+    "If you are not sure about the relationship or lack medical context, answer: unknown."
+)
+
+
+def row_sentences(row, cols):
+    """cols 는 columns_of(input_file) (sentence1 / sentence1_Jeju ... → 실제 컬럼)."""
+    s1 = row.get(cols.get("sentence1")) or ""
+    s2 = row.get(cols.get("sentence2")) or ""
+    return s1, s2
+
+
+# user 프롬프트는 한 번만 컴파일해 두고 행마다 {s1} / {s2} 만 채움 (저널 키 = input_hash(system, user))
+# 고정된 지시문을 문장보다 앞에 두어 system + 지시문 전체가 프롬프트 캐시 접두부가 되도록 함
+USER_TEMPLATE = PromptTemplate(
+    (
+        "Internally convert the dialect in the two sentences below to standard medical Korean.\n"
+        "Do not output the converted text.\n\n"
+        "Make the best possible inference using clinical reasoning:\n"
+        "- entailment: S1 strongly supports S2\n"
+        "- neutral: both can be true but do not imply each other\n"
+        "- contradiction: S1 conflicts with S2\n"
+        "- unknown: only when there is truly no clinical relationship\n\n"
+        "SENTENCE 1 (dialect): {s1}\n"
+        "SENTENCE 2 (dialect): {s2}\n\n"
+        "Output format MUST be exactly: <label>"
+    ),
+    system=SYSTEM_PROMPT,
+)
+
+
+def render_prompt(row, cols):
+    s1, s2 = row_sentences(row, cols)
+    return USER_TEMPLATE.render(s1=s1, s2=s2)
 
 
 def evaluate_mednli_with_logging(input_file: str, log_path: str = "mednli_debug_log.txt"):
@@ -44,67 +88,43 @@ def evaluate_mednli_with_logging(input_file: str, log_path: str = "mednli_debug_
     print(f"\n🚀 [MedNLI 평가 시작] {input_file}")
     print(f"📌 로그 파일: {log_path}")
 
-    if os.path.exists(output_file):
-        os.remove(output_file)
-
-    with open(input_file, encoding="utf-8") as f_in, \
-         open(output_file, "w", encoding="utf-8", newline="") as f_out, \
-         open(log_path, "a", encoding="utf-8") as log_f:
+    total = count_rows(input_file)
+    cols = columns_of(input_file)
 
-        reader = csv.DictReader(f_in)
-        rows = list(reader)
+    # 출력 CSV 는 매번 처음부터 다시 쓰고, 이미 끝난 행은 저널에서 이어받음
+    with open(log_path, "a", encoding="utf-8") as log_f, \
+         open_journal(output_file) as journal:
 
-        fieldnames = reader.fieldnames or []
-        for c in ["ai_answer", "result"]:
-            if c not in fieldnames:
-                fieldnames.append(c)
+        if BATCH_MODE:
+            # 📦 파일 전체 프롬프트를 배치 하나로 보내 캐시를 채운 뒤 아래 루프에서 그대로 사용
+            with open(input_file, encoding="utf-8", newline="") as f_in:
+                prompts = (render_prompt(row, cols)[:2] for row in csv.DictReader(f_in))
+                prefetch(prompts, provider="openai", model=MODEL_NAME, **GPT_PARAMS)
 
-        writer = csv.DictWriter(f_out, fieldnames=fieldnames)
-        writer.writeheader()
+        def evaluate_row(idx, row):
 
-        for idx, row in enumerate(tqdm(rows, desc=f"🔍 {input_file}")):
-
-            s1 = (
-                row.get("sentence1")
-                or row.get("sentence1_Jeju")
-                or row.get("sentence1_Gyeongsang")
-                or row.get("sentence1_Jeolla")
-                or row.get("sentence1_Chungcheong")
-                or ""
-            )
-            s2 = (
-                row.get("sentence2")
-                or row.get("sentence2_Jeju")
-                or row.get("sentence2_Gyeongsang")
-                or row.get("sentence2_Jeolla")
-                or row.get("sentence2_Chungcheong")
-                or ""
-            )
+            s1, s2 = row_sentences(row, cols)
 
             gold = (row.get("gold_label") or "").strip().lower()
 
-            system = (
-                "Answer ONLY one of: entailment, neutral, contradiction, unknown.\n"
-                "If you are not sure about the relationship or lack medical context, answer: unknown."
-            )
-
-            user = (
-                f"SENTENCE 1 (dialect): {s1}\n"
-                f"SENTENCE 2 (dialect): {s2}\n\n"
-                "Internally convert the dialect to standard medical Korean.\n"
-                "Do not output the converted text.\n\n"
-                "Make the best possible inference using clinical reasoning:\n"
-                "- entailment: S1 strongly supports S2\n"
-                "- neutral: both can be true but do not imply each other\n"
-                "- contradiction: S1 conflicts with S2\n"
-                "- unknown: only when there is truly no clinical relationship\n\n"
-                "Output format MUST be exactly: <label>"
-            )
-
-            raw = call_gpt_and_log(system, user, log_f)
-            raw_norm = raw.strip().lower().replace("\n", " ")
-            match = re.search(r"(entailment|neutral|contradiction|unknown)", raw_norm)
-            ai = match.group(1) if match else "unknown"
+            system, user, key, _ = USER_TEMPLATE.render(s1=s1, s2=s2)
+            done = journal.get(idx, key)
+            if done is not None:
+                ai = done["label"]
+            else:
+                try:
+                    raw = call_gpt_and_log(system, user, log_f)
+                except LLMError as e:
+                    # 실패한 행은 답변을 비워 두고 dead-letter 로 (채점에서 모름/오답으로 세지 않음)
+                    journal.fail(idx, key, e, request_of(system, user, "openai", MODEL_NAME, **GPT_PARAMS))
+                    row["ai_answer"] = ""
+                    row["result"] = ""
+                    log(f"   📮 {idx+1}/{total} | 호출 실패 → dead-letter")
+                    return row
+                raw_norm = raw.strip().lower().replace("\n", " ")
+                match = re.search(r"(entailment|neutral|contradiction|unknown)", raw_norm)
+                ai = match.group(1) if match else "unknown"
+                journal.record(idx, key, raw, ai)
 
             if ai == gold:
                 result = "True"
@@ -115,20 +135,23 @@ def evaluate_mednli_with_logging(input_file: str, log_path: str = "mednli_debug_
 
             row["ai_answer"] = ai
             row["result"] = result
-            writer.writerow(row)
-            f_out.flush()
 
             log_f.write(
-                f"[{datetime.now()}] ROW {idx+1}/{len(rows)} | "
+                f"[{datetime.now()}] ROW {idx+1}/{total} | "
                 f"AI: {ai} | GOLD: {gold} | RESULT: {result}\n"
                 f"S1: {s1[:40]}...\n"
                 f"S2: {s2[:40]}...\n\n"
             )
             log_f.flush()
 
-            log(f"   🧠 {idx+1}/{len(rows)} | AI={ai} | GOLD={gold} | → {result}")
+            log(f"   🧠 {idx+1}/{total} | AI={ai} | GOLD={gold} | → {result}")
+            return row
+
+        # 읽기 → 호출/채점 → 쓰기를 한 행씩 흘려보냄 (완료된 행은 바로 파일에 기록)
+        stream_csv(input_file, output_file, evaluate_row, extra_fields=["ai_answer", "result"],
+                   desc=f"🔍 {input_file}")
 
-            time.sleep(0.5)
+        print(journal.summary())
 
     print(f"✔ 완료 → {output_file}")
 
@@ -156,3 +179,5 @@ if __name__ == "__main__":
         evaluate_mednli_with_logging(f, log_path="mednli_debug_log.txt")
 
     print("\n🎉 MedNLI 전체 평가 완료!")
+    print_stats()
+    print_latency_summary()
@@ -1,20 +1,16 @@
 import csv
 import os
-import time
-import chardet
-from tqdm import tqdm
-from openai import OpenAI
+import sys
 
-client = OpenAI(api_key="api_key")   # 🔥 API 키 입력
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_client import LLMError, complete, configure
+from dead_letter import request_of
+from row_journal import input_hash, open_journal
+from csv_pipeline import stream_csv
+from normalize_encoding import encoding_of
+from dataset_manifest import columns_of
 
-
-#############################################
-# CSV 인코딩 자동 감지
-#############################################
-def detect_encoding(path):
-    with open(path, "rb") as f:
-        raw = f.read(50000)  # 샘플로 탐지 (파일 전체 읽을 필요 없음)
-    return chardet.detect(raw)["encoding"]
+configure("openai", api_key="api_key")   # 🔥 API 키 입력
 
 
 #############################################
@@ -27,27 +23,16 @@ def evaluate_truthfulqa(input_file):
     output_file = input_file.replace(".csv", "_evaluated.csv")
     print(f"\n[TruthfulQA - {dialect}] → {input_file}")
 
-    encoding = detect_encoding(input_file)
-
-    with open(input_file, encoding=encoding, errors="replace") as f, \
-         open(output_file, "w", encoding="utf-8", newline="") as out:
-
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-        fieldnames = reader.fieldnames
-        for c in ["ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"]:
-            if c not in fieldnames:
-                fieldnames.append(c)
+    encoding = encoding_of(input_file)  # normalize_encoding manifest 에 있으면 감지 생략
+    cols = columns_of(input_file)       # {표준 컬럼: 실제 컬럼}, 행마다 찾지 않음
 
-        writer = csv.DictWriter(out, fieldnames=fieldnames)
-        writer.writeheader()
+    with open_journal(output_file) as journal:
 
-        for row in tqdm(rows, desc=f"TruthfulQA-{dialect}"):
+        def evaluate_row(idx, row):
 
-            q = next((row[c] for c in row if c.lower().startswith("question_")), None)
-            mc1 = next((row[c] for c in row if c.lower().startswith("mc1_choice")), None)
-            mc2 = next((row[c] for c in row if c.lower().startswith("mc2_choice")), None)
+            q = row.get(cols.get("question"))
+            mc1 = row.get(cols.get("mc1_choices"))
+            mc2 = row.get(cols.get("mc2_choices"))
 
             ###################################################
             # system 프롬프트는 절대 수정 ❌
@@ -71,36 +56,40 @@ def evaluate_truthfulqa(input_file):
                 "가능성이 가장 높은 선택지를 기반으로 평가하고, 완전히 확신할 수 없는 경우에만 UNKNOWN을 선택하라."
             )
 
-            try:
-                res = client.chat.completions.create(
-                    model="gpt-5.1",
-                    temperature=0.0,
-                    messages=[
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user},
-                    ]
-                )
-                txt = res.choices[0].message.content or ""
-            except Exception:
-                txt = ""
-
-            ai1, r1, ai2, r2 = "UNKNOWN", "UNKNOWN", "['UNKNOWN']", "UNKNOWN"
-            for line in txt.split("\n"):
-                s = line.strip()
-                if s.startswith("ai_answer_mc1:"): ai1 = s.split(":", 1)[1].strip()
-                elif s.startswith("mc1_result:"): r1 = s.split(":", 1)[1].strip()
-                elif s.startswith("ai_answer_mc2:"): ai2 = s.split(":", 1)[1].strip()
-                elif s.startswith("mc2_result:"): r2 = s.split(":", 1)[1].strip()
+            key = input_hash(system, user)
+            done = journal.get(idx, key)
+            if done is not None:
+                ai1, r1, ai2, r2 = done["label"]
+            else:
+                try:
+                    txt = complete(system, user, provider="openai", model="gpt-5.1", temperature=0.0).text
+                except LLMError as e:
+                    # 실패한 행을 UNKNOWN 으로 채우지 않고 비워 둔 채 dead-letter 로 (채점에서 제외)
+                    journal.fail(idx, key, e, request_of(system, user, "openai", "gpt-5.1", temperature=0.0))
+                    for field in ("ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"):
+                        row[field] = ""
+                    return row
+
+                ai1, r1, ai2, r2 = "UNKNOWN", "UNKNOWN", "['UNKNOWN']", "UNKNOWN"
+                for line in txt.split("\n"):
+                    s = line.strip()
+                    if s.startswith("ai_answer_mc1:"): ai1 = s.split(":", 1)[1].strip()
+                    elif s.startswith("mc1_result:"): r1 = s.split(":", 1)[1].strip()
+                    elif s.startswith("ai_answer_mc2:"): ai2 = s.split(":", 1)[1].strip()
+                    elif s.startswith("mc2_result:"): r2 = s.split(":", 1)[1].strip()
+                journal.record(idx, key, txt, [ai1, r1, ai2, r2])
 
             row["ai_answer_mc1"] = ai1
             row["mc1_result"] = r1
             row["ai_answer_mc2"] = ai2
             row["mc2_result"] = r2
+            return row
 
-            writer.writerow(row)
-            out.flush()
-            time.sleep(1)
+        stream_csv(input_file, output_file, evaluate_row,
+                   extra_fields=["ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"],
+                   encoding=encoding, errors="replace", desc=f"TruthfulQA-{dialect}")
 
+        print(journal.summary())
     print(f"✔ TruthfulQA 완료 → {output_file}")
 
 
@@ -122,7 +111,7 @@ def generate_summary():
         total_wrong = 0
         total_unknown = 0
 
-        encoding = detect_encoding(file)
+        encoding = encoding_of(file)
 
         with open(file, encoding=encoding, errors="replace") as f:
             reader = csv.DictReader(f)
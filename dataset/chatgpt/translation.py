@@ -1,15 +1,33 @@
 import pandas as pd
 import csv
-import time
-from openai import OpenAI
+import asyncio
 from tqdm import tqdm
 import os
 import sys
 import ast
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_cache import print_stats
+from llm_client import acomplete, configure, print_latency_summary
+from rate_limiter import get_limiter
+from dead_letter import open_dead_letter, request_of
+
 # ✅ OpenAI GPT-5 API 설정
-client = OpenAI(api_key="api_key")
+# OPENAI_BASE_URL 을 지정하면 로컬의 OpenAI 호환 가짜 서버로도 돌려볼 수 있음
+API_KEY = os.environ.get("OPENAI_API_KEY", "api_key")
+BASE_URL = os.environ.get("OPENAI_BASE_URL")
 MODEL_NAME = "gpt-5"
+configure("openai", api_key=API_KEY, base_url=BASE_URL)
+
+# ✅ 동시 요청 수 / 분당 요청 상한 (고정 sleep 대신 사용)
+MAX_CONCURRENCY = int(os.environ.get("TRANSLATE_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = int(os.environ.get("TRANSLATE_RPM", "500"))
+# ✅ 이 행 수만큼 번역할 때마다 바로 파일에 씀 (끝까지 모았다가 한 번에 쓰지 않음)
+ROW_CHUNK = int(os.environ.get("TRANSLATE_ROW_CHUNK", "200"))
+# 속도 조절은 llm_client 의 공유 rate limiter 하나만 함 (429 / 응답 헤더에 맞춰 스스로 조절)
+# 설정한 분당 요청 수는 그 limiter 의 상한이라, AIMD 로 올라가도 TRANSLATE_RPM 을 넘지 않음
+# (분당 토큰 한도는 429 와 x-ratelimit 헤더로 limiter 가 맞춤)
+get_limiter("openai", MODEL_NAME, max_rate=REQUESTS_PER_MINUTE / 60.0)
 
 # ✅ 경로 설정
 BASE_PATH = r"C:\Users\jjw02\Desktop\데이터분석프로그래밍"
@@ -25,135 +43,247 @@ regions = {
     "충청": "choongchung"
 }
 
-# ✅ GPT-5 방언 번역 함수
-def translate_dialects(text, region_name):
-    if not text or str(text).strip() == "":
-        return text
-    system_prompt = (
+
+def build_system_prompt(region_name):
+    return (
         f"너는 {region_name} 방언 전문가야. "
         f"주어진 문장을 해당 지역 방언으로 자연스럽게 번역해. "
         f"단, 반드시 **번역된 문장 하나만 출력**하고 다른 설명은 절대 포함하지 마."
     )
-    try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ]
+
+
+# ✅ GPT-5 방언 번역 함수 (비동기)
+async def translate_dialects_async(text, region_name, semaphore, dead_letter=None):
+    if not text or str(text).strip() == "":
+        return text
+    system_prompt = build_system_prompt(region_name)
+    async with semaphore:
+        try:
             # ❌ temperature 제거 (GPT-5는 기본값 1만 허용)
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"⚠️ {region_name} 방언 번역 오류 (텍스트: '{text[:30]}...'): {e}", file=sys.stderr)
-        return f"[ERROR: {text[:50]}... | {e}]"
+            response = await acomplete(system_prompt, text, provider="openai", model=MODEL_NAME)
+            # 이전 실행에서 실패해 dead-letter 에 남은 문장이면 해결로 표시 (retry 가 다시 보내지 않도록)
+            if dead_letter is not None:
+                dead_letter.resolve(text)
+            return response.text
+        except Exception as e:
+            print(f"⚠️ {region_name} 방언 번역 오류 (텍스트: '{text[:30]}...'): {e}", file=sys.stderr)
+            # 오류 문자열을 번역문 자리에 넣지 않고 비워 둔 채 dead-letter 로
+            if dead_letter is not None:
+                dead_letter.add(text, e, request_of(system_prompt, text, "openai", MODEL_NAME))
+            return ""
+
+
+async def _translate_many(texts, region_name, desc, max_concurrency, dead_letter):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [translate_dialects_async(t, region_name, semaphore, dead_letter) for t in texts]
+    with tqdm(total=len(tasks), desc=desc) as bar:
+        async def _tracked(task):
+            result = await task
+            bar.update(1)
+            return result
+        # gather 는 입력 순서대로 결과를 돌려주므로 출력 순서가 유지됨
+        return await asyncio.gather(*(_tracked(t) for t in tasks))
+
+
+def translate_many(texts, region_name, desc=None, max_concurrency=MAX_CONCURRENCY, dead_letter=None):
+    """여러 문장을 동시에 번역하고 입력과 같은 순서의 리스트로 돌려줍니다. 실패한 문장은 빈 문자열입니다."""
+    return asyncio.run(_translate_many(list(texts), region_name, desc, max_concurrency, dead_letter))
+
+
+def translate_unique(texts, region_name, desc=None, memo=None, **kwargs):
+    """같은 문자열은 지역마다 한 번만 번역하고, 입력과 같은 순서의 리스트로 돌려줍니다.
+
+    TruthfulQA 는 mc1 선택지 대부분이 mc2 에도 들어 있어 요청 수가 크게 줄어듭니다.
+    memo 에 dict 를 넘기면 앞 묶음에서 번역한 문자열은 다시 요청하지 않습니다 (실패한 문자열은 다시 요청).
+    """
+    texts = list(texts)
+    translated = memo if memo is not None else {}
+    unique = [t for t in dict.fromkeys(texts) if t not in translated]
+    if len(unique) < len(texts):
+        print(f"🔁 고유 문자열 {len(unique)}개 / 전체 {len(texts)}개 "
+              f"({1 - len(unique) / len(texts):.0%} 요청 절감)")
+    results = translate_many(unique, region_name, desc=desc, **kwargs)
+    translated.update((t, r) for t, r in zip(unique, results) if r != "")
+    return [translated.get(t, "") for t in texts]
+
+
+# ✅ 기존 단건 호출용 인터페이스 유지
+def translate_dialects(text, region_name):
+    return translate_many([text], region_name, max_concurrency=1)[0]
+
+
+def parse_choice_list(value):
+    try:
+        return ast.literal_eval(value) if isinstance(value, str) and value.startswith('[') else [value]
+    except:
+        return [x.strip() for x in str(value).split(',') if x.strip()]
+
+
+def write_chunks(output_filename, fieldnames, chunks):
+    """chunks 가 내보내는 행 묶음을 받는 대로 파일에 쓰고 flush 합니다."""
+    with open(output_filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for rows in chunks:
+            writer.writerows(rows)
+            f.flush()
+
+
+def row_chunks(df, size=ROW_CHUNK):
+    """DataFrame 을 size 행씩 잘라 (끝 행 번호, 조각) 으로 내보냅니다."""
+    for start in range(0, len(df), max(1, size)):
+        chunk = df.iloc[start:start + max(1, size)]
+        yield start + len(chunk), chunk
+
 
 # ============================================================================
 # 🩺 A. MedNLI 번역 처리
 # ============================================================================
-mednli_input_csv = os.path.join(BASE_PATH, MEDNLI_INPUT_FILENAME)
-try:
-    df_mednli = pd.read_csv(mednli_input_csv)
-    if 'sentence1_ko' in df_mednli.columns:
-        df_mednli['sentence1'] = df_mednli['sentence1_ko']
-    elif 'sentence1' not in df_mednli.columns:
+def load_mednli(path):
+    df = pd.read_csv(path)
+    if 'sentence1_ko' in df.columns:
+        df['sentence1'] = df['sentence1_ko']
+    elif 'sentence1' not in df.columns:
         raise ValueError("MedNLI 파일에 'sentence1' 또는 'sentence1_ko' 컬럼이 없습니다.")
-except Exception as e:
-    print(f"🚨 MedNLI 파일 로드 오류: {e}", file=sys.stderr)
-    sys.exit(1)
+    return df
+
 
-for region_name, region_en in regions.items():
+def translate_mednli_region(df_mednli, region_name, region_en, output_dir=BASE_PATH):
     print(f"\n======== 🌍 MedNLI {region_name} 방언 번역 시작 ========")
-    output_filename = os.path.join(BASE_PATH, f"mednli_{region_en}_({AI_NAME_FOR_FILE}).csv")
+    output_filename = os.path.join(output_dir, f"mednli_{region_en}_({AI_NAME_FOR_FILE}).csv")
     fieldnames = ["gold_label", f"sentence1_{region_en}", f"sentence2_{region_en}", "ai_answer", "result"]
-    translated_results = []
-
-    for _, row in tqdm(df_mednli.iterrows(), total=len(df_mednli), desc=f"➡️ MedNLI {region_name} 번역 중..."):
-        dialect_translation = translate_dialects(row['sentence1'], region_name)
-        translated_results.append({
-            "gold_label": row["gold_label"],
-            f"sentence1_{region_en}": dialect_translation,
-            f"sentence2_{region_en}": dialect_translation,
-            "ai_answer": "",
-            "result": ""
-        })
-        time.sleep(1.2)  # API rate limit 보호
+
+    memo = {}
+    dead_letter = open_dead_letter(output_filename)
+
+    def translated_chunks():
+        for end, chunk in row_chunks(df_mednli):
+            translations = translate_unique(chunk['sentence1'].tolist(), region_name, memo=memo,
+                                            dead_letter=dead_letter,
+                                            desc=f"➡️ MedNLI {region_name} 번역 중 ({end}/{len(df_mednli)})")
+            yield [
+                {
+                    "gold_label": gold_label,
+                    f"sentence1_{region_en}": dialect_translation,
+                    f"sentence2_{region_en}": dialect_translation,
+                    "ai_answer": "",
+                    "result": ""
+                }
+                for gold_label, dialect_translation in zip(chunk["gold_label"], translations)
+            ]
 
     try:
-        with open(output_filename, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(translated_results)
+        write_chunks(output_filename, fieldnames, translated_chunks())
         print(f"🎉 {region_name} 방언 파일 저장 완료 → {output_filename}")
     except Exception as e:
         print(f"🚨 CSV 저장 실패: {e}", file=sys.stderr)
+    finally:
+        dead_letter.close()
+    if dead_letter.summary():
+        print(dead_letter.summary())
+    return output_filename
+
 
 # ============================================================================
 # 🧠 B. TruthfulQA 번역 처리
 # ============================================================================
-truthfulqa_input_csv = os.path.join(BASE_PATH, TRUTHFULQA_INPUT_FILENAME)
 required_tqa_cols = [
     'question', 'mc1_choice', 'mc1_label', 'mc2_choice',
     'mc2_label', 'ai_answer_mc1', 'mc1_result',
     'ai_answer_mc2', 'mc2_result'
 ]
 
-try:
-    df_tqa = pd.read_csv(truthfulqa_input_csv)
-    if not all(col in df_tqa.columns for col in required_tqa_cols):
+
+def load_truthfulqa(path):
+    df = pd.read_csv(path)
+    if not all(col in df.columns for col in required_tqa_cols):
         raise ValueError("TruthfulQA 파일에 필수 컬럼이 누락되었습니다.")
-except Exception as e:
-    print(f"🚨 TruthfulQA 파일 로드 오류: {e}", file=sys.stderr)
-    sys.exit(1)
+    return df
+
 
-for region_name, region_en in regions.items():
+def translate_truthfulqa_region(df_tqa, region_name, region_en, output_dir=BASE_PATH):
     print(f"\n======== 🌍 TruthfulQA {region_name} 방언 번역 시작 ========")
-    output_filename = os.path.join(BASE_PATH, f"truthfulqa_{region_en}_({AI_NAME_FOR_FILE}).csv")
+    output_filename = os.path.join(output_dir, f"truthfulqa_{region_en}_({AI_NAME_FOR_FILE}).csv")
     fieldnames = [
         f"question_{region_en}", f"mc1_choice_{region_en}", "mc1_label",
         f"mc2_choice_{region_en}", "mc2_label",
         "ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"
     ]
-    translated_results = []
 
-    for _, row in tqdm(df_tqa.iterrows(), total=len(df_tqa), desc=f"➡️ TQA {region_name} 번역 중..."):
-        # 질문 번역
-        question_dialect = translate_dialects(row['question'], region_name)
+    memo = {}
+    dead_letter = open_dead_letter(output_filename)
 
-        # mc1/mc2 선택지 리스트 변환
-        try:
-            mc1_list = ast.literal_eval(row['mc1_choice']) if isinstance(row['mc1_choice'], str) and row['mc1_choice'].startswith('[') else [row['mc1_choice']]
-        except:
-            mc1_list = [x.strip() for x in str(row['mc1_choice']).split(',') if x.strip()]
-        try:
-            mc2_list = ast.literal_eval(row['mc2_choice']) if isinstance(row['mc2_choice'], str) and row['mc2_choice'].startswith('[') else [row['mc2_choice']]
-        except:
-            mc2_list = [x.strip() for x in str(row['mc2_choice']).split(',') if x.strip()]
-
-        # 각 선택지 번역
-        mc1_translated = [translate_dialects(c, region_name) for c in mc1_list]
-        mc2_translated = [translate_dialects(c, region_name) for c in mc2_list]
-
-        translated_results.append({
-            f"question_{region_en}": question_dialect,
-            f"mc1_choice_{region_en}": mc1_translated,
-            "mc1_label": row["mc1_label"],
-            f"mc2_choice_{region_en}": mc2_translated,
-            "mc2_label": row["mc2_label"],
-            "ai_answer_mc1": row["ai_answer_mc1"],
-            "mc1_result": row["mc1_result"],
-            "ai_answer_mc2": row["ai_answer_mc2"],
-            "mc2_result": row["mc2_result"],
-        })
-        time.sleep(1.2)
+    def translated_chunks():
+        for end, chunk in row_chunks(df_tqa):
+            # 질문과 선택지를 한 줄로 펼쳐 고유 문자열만 요청하고, 길이 정보로 다시 행 단위로 되돌림
+            rows = [row for _, row in chunk.iterrows()]
+            flat_texts = []
+            layout = []
+            for row in rows:
+                mc1_list = parse_choice_list(row['mc1_choice'])
+                mc2_list = parse_choice_list(row['mc2_choice'])
+                flat_texts.append(row['question'])
+                flat_texts.extend(mc1_list)
+                flat_texts.extend(mc2_list)
+                layout.append((len(mc1_list), len(mc2_list)))
+
+            translations = translate_unique(flat_texts, region_name, memo=memo, dead_letter=dead_letter,
+                                            desc=f"➡️ TQA {region_name} 번역 중 ({end}/{len(df_tqa)})")
+
+            translated_results = []
+            pos = 0
+            for row, (n_mc1, n_mc2) in zip(rows, layout):
+                question_dialect = translations[pos]
+                mc1_translated = translations[pos + 1:pos + 1 + n_mc1]
+                mc2_translated = translations[pos + 1 + n_mc1:pos + 1 + n_mc1 + n_mc2]
+                pos += 1 + n_mc1 + n_mc2
+
+                translated_results.append({
+                    f"question_{region_en}": question_dialect,
+                    f"mc1_choice_{region_en}": mc1_translated,
+                    "mc1_label": row["mc1_label"],
+                    f"mc2_choice_{region_en}": mc2_translated,
+                    "mc2_label": row["mc2_label"],
+                    "ai_answer_mc1": row["ai_answer_mc1"],
+                    "mc1_result": row["mc1_result"],
+                    "ai_answer_mc2": row["ai_answer_mc2"],
+                    "mc2_result": row["mc2_result"],
+                })
+            yield translated_results
 
     try:
-        with open(output_filename, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(translated_results)
+        write_chunks(output_filename, fieldnames, translated_chunks())
         print(f"🎉 {region_name} TruthfulQA 방언 파일 저장 완료 → {output_filename}")
     except Exception as e:
         print(f"🚨 TruthfulQA CSV 저장 실패: {e}", file=sys.stderr)
+    finally:
+        dead_letter.close()
+    if dead_letter.summary():
+        print(dead_letter.summary())
+    return output_filename
+
+
+if __name__ == "__main__":
+    mednli_input_csv = os.path.join(BASE_PATH, MEDNLI_INPUT_FILENAME)
+    try:
+        df_mednli = load_mednli(mednli_input_csv)
+    except Exception as e:
+        print(f"🚨 MedNLI 파일 로드 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for region_name, region_en in regions.items():
+        translate_mednli_region(df_mednli, region_name, region_en)
+
+    truthfulqa_input_csv = os.path.join(BASE_PATH, TRUTHFULQA_INPUT_FILENAME)
+    try:
+        df_tqa = load_truthfulqa(truthfulqa_input_csv)
+    except Exception as e:
+        print(f"🚨 TruthfulQA 파일 로드 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for region_name, region_en in regions.items():
+        translate_truthfulqa_region(df_tqa, region_name, region_en)
 
-print("\n\n✅ MedNLI 4개 + TruthfulQA 4개 번역 완료 (총 8개 파일 생성됨)")
+    print("\n\n✅ MedNLI 4개 + TruthfulQA 4개 번역 완료 (총 8개 파일 생성됨)")
+    print_stats()
+    print_latency_summary()
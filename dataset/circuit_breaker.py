@@ -0,0 +1,133 @@
+"""provider 장애 때 행을 계속 실패시키지 않고 호출을 잠시 멈추는 서킷 브레이커.
+
+재시도까지 다 쓰고도 실패한 호출(429 / 타임아웃 / 5xx 처럼 다시 시도할 만한 오류)이 연속으로
+threshold 번 나오면 회로를 열고, cooldown 동안 그 (provider, model) 의 호출을 멈춰 세웁니다.
+cooldown 이 지나면 호출 하나만 시험으로 보내서 (half-open)
+
+- 성공하면 회로를 닫고 평소대로 호출하고
+- 또 실패하면 cooldown 을 두 배로 늘려 (max_cooldown 까지) 다시 엽니다.
+
+회로가 처음 열린 뒤 max_pause 가 지나도록 닫히지 않으면 더 기다리지 않고 CircuitOpenError 를 던지므로,
+남은 행은 API 를 부르지 않고 바로 dead-letter 로 갑니다 (나중에 dead_letter.py retry 로 다시 시도).
+400 같은 요청 오류는 장애가 아니므로 세지 않습니다.
+
+환경 변수
+- LLM_BREAKER_THRESHOLD : 회로를 여는 연속 실패 수 (기본 5, 0 이면 끔)
+- LLM_BREAKER_COOLDOWN  : 처음 멈추는 시간(초, 기본 30)
+- LLM_BREAKER_MAX_COOLDOWN : 멈추는 시간의 상한(초, 기본 600)
+- LLM_BREAKER_MAX_PAUSE : 회로 하나가 멈춰 있을 수 있는 총 시간(초, 기본 1800)
+"""
+import os
+import threading
+import time
+
+THRESHOLD = int(os.environ.get("LLM_BREAKER_THRESHOLD", "5"))
+COOLDOWN = float(os.environ.get("LLM_BREAKER_COOLDOWN", "30"))
+MAX_COOLDOWN = float(os.environ.get("LLM_BREAKER_MAX_COOLDOWN", "600"))
+MAX_PAUSE = float(os.environ.get("LLM_BREAKER_MAX_PAUSE", "1800"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """회로가 max_pause 보다 오래 열려 있어 호출하지 않음."""
+
+
+class CircuitBreaker:
+    """(provider, model) 하나의 연속 실패를 세고, 장애 중에는 호출 전에 기다리게 합니다."""
+
+    def __init__(self, name, threshold=THRESHOLD, cooldown=COOLDOWN, max_cooldown=MAX_COOLDOWN,
+                 max_pause=MAX_PAUSE):
+        self.name = name
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_pause = max_pause
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._outage_start = None
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._probing = False
+        self._cond = threading.Condition()
+
+    def _clock(self):
+        return time.monotonic()
+
+    def before_call(self):
+        """호출해도 되면 바로 돌아오고, 회로가 열려 있으면 시험 호출 차례가 올 때까지 기다립니다."""
+        if self.threshold <= 0:
+            return
+        with self._cond:
+            while True:
+                if self.state == CLOSED:
+                    return
+                now = self._clock()
+                paused = now - self._outage_start
+                if paused >= self.max_pause:
+                    raise CircuitOpenError(f"{self.name} 회로가 {paused:.0f}초 동안 열려 있어 호출하지 않습니다")
+                if self.state == OPEN and now >= self._open_until:
+                    self.state = HALF_OPEN
+                if self.state == HALF_OPEN and not self._probing:
+                    self._probing = True
+                    return
+                # 열려 있으면 cooldown 이 끝날 때까지, 시험 호출 중이면 그 결과가 나올 때까지 대기
+                wait = self._open_until - now if self.state == OPEN else self._cooldown
+                self._cond.wait(max(0.01, min(wait, self.max_pause - paused)))
+
+    def on_success(self):
+        with self._cond:
+            if self.state != CLOSED:
+                print(f"✅ {self.name} 회로 닫힘 (호출 재개)")
+            self.state = CLOSED
+            self.failures = 0
+            self._outage_start = None
+            self._cooldown = self.base_cooldown
+            self._probing = False
+            self._cond.notify_all()
+
+    def on_failure(self):
+        """장애로 볼 수 있는 최종 실패를 기록합니다."""
+        if self.threshold <= 0:
+            return
+        with self._cond:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            elif self.state == OPEN or self.failures < self.threshold:
+                return
+            self.state = OPEN
+            self.opened += 1
+            self._probing = False
+            now = self._clock()
+            if self._outage_start is None:
+                self._outage_start = now
+            self._open_until = now + self._cooldown
+            print(f"🛑 {self.name} 연속 {self.failures}회 실패 → {self._cooldown:.0f}초 동안 호출 멈춤")
+            self._cond.notify_all()
+
+    def on_skip(self):
+        """시험 호출이 장애와 상관없는 이유로 끝났을 때 (요청 오류 등) 다음 호출이 시험하도록 풀어 줍니다."""
+        with self._cond:
+            if self._probing:
+                self._probing = False
+                self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            paused = 0.0 if self._outage_start is None else self._clock() - self._outage_start
+            return {"state": self.state, "failures": self.failures, "opened": self.opened, "paused": round(paused, 3)}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider, model=None):
+    """(provider, model) 마다 하나의 브레이커를 공유합니다."""
+    key = (provider, model)
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(f"{provider}/{model}" if model else provider)
+        return _breakers[key]
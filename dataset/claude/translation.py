@@ -1,11 +1,17 @@
+import csv
 import os
-import pandas as pd
-import anthropic
+import sys
 import ast
 from google.colab import drive
-import time
 from tqdm.notebook import tqdm
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_cache import print_stats
+from llm_client import LLMError, complete, configure
+from dead_letter import open_dead_letter, request_of
+from packed_translation import PACK_SIZE, build_packed_prompt, translate_packed
+from csv_pipeline import chunked, count_rows
+
 ANTHROPIC_API_KEY = "YOUR_ANTHROPIC_API_KEY" 
 MODEL_NAME = "claude-sonnet-4-5-20250929"
 BASE_PATH = "/content/drive/MyDrive/Colab Notebooks/Project"
@@ -41,41 +47,60 @@ for region in REGIONS:
 
 
 # Anthropic 클라이언트 초기화
-try:
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY) 
-    print("Anthropic 클라이언트 초기화 성공.")
-except Exception as e:
-    print(f"Anthropic 클라이언트 초기화 실패: {e}")
-    # exit() 
+configure("anthropic", api_key=ANTHROPIC_API_KEY)
 
 
 # --- 2. 헬퍼 함수 정의 ---
 
+# 프롬프트 정의
+user_messages_base = {
+    "Jeju": "다음 문장을 제주도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
+    "Gyeongsang": "다음 문장을 경상도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
+    "Jeolla": "다음 문장을 전라도 사투리로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
+    "Chungcheong": "다음 문장을 충청도 사투리로 자연스럽게 번역해줘. 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘"
+}
+
+system_message_template = (
+    "너는 {region} 방언 전문가야. 이제부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해. "
+    "번역 결과는 **오직 한 문장**만 출력해야 하며, 방언으로 번역하든, 전문 언어라 **영어로 번역하든 관계없이,** "
+    "결과물 외의 **다른 모든 설명, 기호, 괄호, 줄바꿈은 절대 포함하지마.** "
+    "예시: '영어로 번역하면~', '번역 결과:', '결과:' 등의 문구를 절대로 추가하지마."
+)
+
+system_message = {
+    "Jeju": system_message_template.format(region="제주도"),
+    "Gyeongsang": system_message_template.format(region="경상도"),
+    "Jeolla": system_message_template.format(region="전라도"),
+    "Chungcheong": system_message_template.format(region="충청도")
+}
+
+# 묶음 번역용: "한 문장만 출력" 대신 JSON 배열 출력 규칙 (형식 지시는 build_packed_prompt 가 붙임)
+packed_system_template = (
+    "너는 {region} 방언 전문가야. 이제부터 여러 문장이 주어지면 각각을 해당 지역 방언으로 정확하게 번역해야 해. "
+    "전문 언어라 해석이 어려운 문장은 영어로 남겨도 되지만, 각 번역에 설명, 괄호, 줄바꿈, "
+    "'번역 결과:' 같은 문구는 절대 포함하지마."
+)
+
+packed_system_message = {
+    "Jeju": packed_system_template.format(region="제주도"),
+    "Gyeongsang": packed_system_template.format(region="경상도"),
+    "Jeolla": packed_system_template.format(region="전라도"),
+    "Chungcheong": packed_system_template.format(region="충청도")
+}
+
+
+def clean_translation(translated_text):
+    """줄바꿈 제거 및 " 또는 " 로 두 가지 번역을 준 경우 첫 번째만 사용"""
+    translated_text = translated_text.replace('\n', ' ').strip()
+    # " 또는 " 패턴 처리
+    if ' 또는 ' in translated_text and translated_text.count(' 또는 ') == 1:
+         translated_text = translated_text.split(' 또는 ')[0].strip()
+    return translated_text
+
+
 def translate_text(text, model_name, region): 
     """Anthropic Claude API를 사용하여 텍스트를 재번역합니다. (출력 형태 엄격히 제한 및 영어 번역 설명 금지)"""
     
-    # 프롬프트 정의
-    user_messages_base = {
-        "Jeju": "다음 문장을 제주도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
-        "Gyeongsang": "다음 문장을 경상도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
-        "Jeolla": "다음 문장을 전라도 사투리로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
-        "Chungcheong": "다음 문장을 충청도 사투리로 자연스럽게 번역해줘. 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘"
-    }
-    
-    system_message_template = (
-        "너는 {region} 방언 전문가야. 이제부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해. "
-        "번역 결과는 **오직 한 문장**만 출력해야 하며, 방언으로 번역하든, 전문 언어라 **영어로 번역하든 관계없이,** "
-        "결과물 외의 **다른 모든 설명, 기호, 괄호, 줄바꿈은 절대 포함하지마.** "
-        "예시: '영어로 번역하면~', '번역 결과:', '결과:' 등의 문구를 절대로 추가하지마."
-    )
-    
-    system_message = {
-        "Jeju": system_message_template.format(region="제주도"),
-        "Gyeongsang": system_message_template.format(region="경상도"),
-        "Jeolla": system_message_template.format(region="전라도"),
-        "Chungcheong": system_message_template.format(region="충청도")
-    }
-    
     if not text or str(text).strip() == "":
         return ""
     
@@ -84,32 +109,91 @@ def translate_text(text, model_name, region):
 
     system_prompt = system_message[region]
     user_prompt_content = f"{user_messages_base[region]}\n{text}"
+
     
     try:
-        response = client.messages.create(
-            model=model_name,
-            max_tokens=2048,
-            system=system_prompt, 
-            messages=[
-                {"role": "user", "content": user_prompt_content}
-            ]
-        )
-        if response.content and response.content[0].text:
-            translated_text = response.content[0].text.replace('\n', ' ').strip()
-            # " 또는 " 패턴 처리
-            if ' 또는 ' in translated_text and translated_text.count(' 또는 ') == 1:
-                 translated_text = translated_text.split(' 또는 ')[0].strip()
-                 
-            return translated_text
+        response = complete(system_prompt, user_prompt_content, provider="anthropic",
+                            model=model_name, max_tokens=2048)
+        if response.text:
+            return clean_translation(response.text)
         return None
-    except Exception as e:
+    except LLMError as e:
         print(f"API 호출 중 예상치 못한 오류 발생: {e}")
         # 오류 발생 시 해당 항목 번역 건너뜀 (None 반환)
         return None
 
 
+def translate_texts(texts, model_name, region, progress=None):
+    """여러 문장을 번호를 붙여 한 요청에 묶어 번역합니다 (JSON 배열 응답, 개수가 안 맞으면 나눠서 재요청).
+
+    결과 리스트의 각 원소는 translate_text 와 같은 규칙을 따릅니다 (실패 시 None).
+    """
+    if region not in user_messages_base:
+        return [None] * len(texts)
+
+    def _batch(chunk):
+        # LLMError 는 translate_packed 가 받아 묶음 전체를 실패(None)로 둠 (반으로 나눠 다시 요청하지 않음)
+        return complete(packed_system_message[region], build_packed_prompt(user_messages_base[region], chunk),
+                        provider="anthropic", model=model_name, max_tokens=4096).text
+
+    def _failed(chunk, error):
+        print(f"묶음 번역 API 오류 ({len(chunk)}문장): {error}")
+
+    results = translate_packed(texts, _batch, lambda t: translate_text(t, model_name, region), progress=progress,
+                               on_error=_failed)
+    return [clean_translation(r) if r is not None else None for r in results]
+
+
+def _pick(translations, text):
+    translated = translations.get(text)
+    return translated if translated is not None else ""  # 실패 시 빈 칸 (원본을 방언 번역으로 남기지 않음)
+
+
+def _pick_list(translations, choices):
+    """선택지 리스트 번역. 하나라도 실패하면 칸 전체를 비움 (일부만 원문인 선택지가 채점되지 않도록)."""
+    picked = []
+    for choice in choices:
+        if isinstance(choice, str) and choice.strip():
+            if translations.get(choice) is None:
+                return ""
+            choice = translations[choice]
+        picked.append(choice)
+    return str(picked)
+
+
+def _plan_block(block, col_map, file_type):
+    """행 블록의 각 칸을 (행, 새 컬럼, 종류, 값) 계획으로 바꾸고, 번역할 문자열을 처음 나온 순서대로 모읍니다."""
+    plan = []              # (행, 새 컬럼, 종류, 값)
+    texts = {}             # 번역할 원문 (dict 순서 = 처음 나온 순서)
+    for row in block:
+        for original_col, new_col in col_map.items():
+            current_value = row.get(original_col) # 원본 컬럼에서 값 가져오기
+
+            if not current_value:
+                plan.append((row, new_col, "keep", current_value or ""))
+                continue
+
+            # TruthfulQA의 리스트 형태 컬럼 처리 (mc1_choice, mc2_choice)
+            if file_type == "truthfulqa" and original_col.startswith("mc"):
+                try:
+                    # current_value가 문자열 리스트 형태인지 확인 후 처리
+                    list_of_choices = list(ast.literal_eval(current_value))
+                    for choice in list_of_choices:
+                        if isinstance(choice, str) and choice.strip():
+                            texts.setdefault(choice, None)
+                    plan.append((row, new_col, "list", list_of_choices))
+                    continue
+                except (ValueError, SyntaxError, TypeError):
+                    pass  # 리스트 형태가 아닌 경우, 일반 텍스트로 처리
+
+            # 일반 텍스트 컬럼 처리 (MedNLI의 sentence1/2, TruthfulQA의 question/answer)
+            texts.setdefault(current_value, None)
+            plan.append((row, new_col, "text", current_value))
+    return plan, list(texts)
+
+
 def process_file(file_info):
-    """단일 파일을 처리하고, 번역한 후 새 파일을 저장합니다."""
+    """단일 파일을 PACK_SIZE 행씩 읽어 번역하고, 끝난 블록은 바로 새 파일에 씁니다."""
     source_path = file_info['source_path']
     file_type = file_info['type']
     region = file_info['region']
@@ -122,12 +206,6 @@ def process_file(file_info):
         print(f"오류: 원본 파일을 찾을 수 없습니다. 경로를 확인하세요: {source_path}")
         return
 
-    try:
-        df = pd.read_csv(source_path)
-    except Exception as e:
-        print(f"CSV 파일 로드 중 오류 발생: {e}")
-        return
-
     # 새로운 컬럼 생성 준비
     if file_type == "mednli":
         # MedNLI: sentence1_Jeolla, sentence2_Jeolla
@@ -138,55 +216,65 @@ def process_file(file_info):
         col_map = {col: f"{col}_{region_lower}" for col in target_cols}
     
     print(f"새 컬럼: {list(col_map.values())}")
-    
-    # 번역 루프
-    for index, row in tqdm(df.iterrows(), total=df.shape[0], desc=f"전체 번역 진행 ({region})"):
-        for original_col, new_col in col_map.items():
-            current_value = row.get(original_col) # 원본 컬럼에서 값 가져오기
-
-            if pd.isna(current_value):
-                df.loc[index, new_col] = current_value
-                continue
 
-            # TruthfulQA의 리스트 형태 컬럼 처리 (mc1_choice, mc2_choice)
-            if file_type == "truthfulqa" and original_col.startswith("mc"):
-                try:
-                    # current_value가 문자열 리스트 형태인지 확인 후 처리
-                    list_of_choices = ast.literal_eval(current_value) 
-                    
-                    new_list_of_choices = []
-                    for choice in list_of_choices:
-                        if isinstance(choice, str) and choice.strip():
-                            translated_text = translate_text(choice, MODEL_NAME, region)
-                            new_list_of_choices.append(translated_text if translated_text is not None else choice) # 실패 시 원본 유지
-                            time.sleep(0.5) 
-                        else:
-                            new_list_of_choices.append(choice)
-                            
-                    df.loc[index, new_col] = str(new_list_of_choices)
-                    
-                except (ValueError, SyntaxError, TypeError):
-                    # 리스트 형태가 아닌 경우, 일반 텍스트로 처리 시도
-                    translated_text = translate_text(current_value, MODEL_NAME, region)
-                    df.loc[index, new_col] = translated_text if translated_text is not None else current_value
-                    time.sleep(0.5)
-
-            # 일반 텍스트 컬럼 처리 (MedNLI의 sentence1/2, TruthfulQA의 question/answer)
-            else:
-                translated_text = translate_text(current_value, MODEL_NAME, region) 
-                df.loc[index, new_col] = translated_text if translated_text is not None else current_value
-                time.sleep(0.5) 
-
-    # 3단계: 새 파일 저장
-    base, ext = os.path.splitext(source_path)
     # 파일 이름 포맷: 원본이름_지역_모델버전.csv
+    base, ext = os.path.splitext(source_path)
     new_file_name = f"{os.path.basename(base)}{output_suffix}{ext}"
     new_file_path = os.path.join(BASE_PATH, new_file_name)
-    
-    # 원본 컬럼과 새로 생성된 컬럼만 포함하여 저장
-    columns_to_save = list(df.columns) + list(col_map.values())
-    df[columns_to_save].to_csv(new_file_path, index=False, encoding='utf-8')
-    
+
+    # 원문 -> 번역. 앞 블록에서 번역한 문자열은 다시 요청하지 않음
+    # (mc1 선택지 대부분이 mc2 에도 있으므로 같은 문자열은 지역마다 한 번만 번역, 실패한 문자열은 다시 요청)
+    translations = {}
+    requested = total_texts = 0
+
+    try:
+        with open(source_path, encoding='utf-8', newline='') as f_in, \
+             open(new_file_path, 'w', encoding='utf-8', newline='') as f_out, \
+             open_dead_letter(new_file_path) as dead_letter, \
+             tqdm(total=count_rows(source_path), desc=f"전체 번역 진행 ({region})") as bar:
+            reader = csv.DictReader(f_in)
+            # 원본 컬럼과 새로 생성된 컬럼만 포함하여 저장
+            fieldnames = list(reader.fieldnames or [])
+            fieldnames += [c for c in col_map.values() if c not in fieldnames]
+            writer = csv.DictWriter(f_out, fieldnames=fieldnames)
+            writer.writeheader()
+
+            for block in chunked(reader, PACK_SIZE):
+                # 1단계: 블록의 질문/선택지 컬럼에서 번역할 고유 문자열 모으기
+                plan, texts = _plan_block(block, col_map, file_type)
+                total_texts += len(texts)
+
+                # 2단계: 아직 번역하지 않은 고유 문자열만 번역 (여러 문장을 한 요청에 묶어서)
+                pending = [text for text in texts if translations.get(text) is None]
+                requested += len(pending)
+                for text, translated in zip(pending, translate_texts(pending, MODEL_NAME, region)):
+                    translations[text] = translated
+                    if translated is None:
+                        # 실패한 문자열은 빈 칸으로 쓰고 dead-letter 에 남김 (다음 블록에서 다시 나오면 다시 요청)
+                        dead_letter.add(text, "번역 실패", request_of(
+                            system_message[region], f"{user_messages_base[region]}\n{text}", "anthropic", MODEL_NAME,
+                            max_tokens=2048))
+                    else:
+                        dead_letter.resolve(text)
+
+                # 3단계: 번역 결과를 행/리스트 컬럼에 다시 채우고 바로 쓰기
+                for row, new_col, kind, value in plan:
+                    if kind == "keep":
+                        row[new_col] = value
+                    elif kind == "list":
+                        row[new_col] = _pick_list(translations, value)
+                    else:
+                        row[new_col] = _pick(translations, value)
+                writer.writerows(block)
+                f_out.flush()
+                bar.update(len(block))
+            if dead_letter.summary():
+                print(dead_letter.summary())
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"CSV 파일 처리 중 오류 발생: {e}")
+        return
+
+    print(f"블록별 고유 문자열 {total_texts}개 중 {requested}개 번역 요청")
     print(f"\n{os.path.basename(new_file_path)} 파일 저장 완료. (경로: {new_file_path})")
 
 
@@ -201,4 +289,5 @@ for file_info in FILE_INFOS:
 
 print("\n" + "=" * 50)
 print("--- 모든 파일 처리 완료 ---")
-print("=" * 50)
\ No newline at end of file
+print("=" * 50)
+print_stats()
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""평가/번역 스크립트가 함께 쓰는 스트리밍 CSV 파이프라인.
+
+입력 CSV 를 list(reader) 로 한꺼번에 읽지 않고 한 행씩 흘려보냅니다.
+
+    읽기 (csv.DictReader) → 행 처리 (프롬프트 → 호출 → 파싱 → 채점) → 쓰기 (행마다 flush)
+
+- 행 처리는 map_ordered() 로 최대 workers 개를 동시에 실행하고, 아직 쓰지 못한 결과는
+  최대 buffer 개까지만 들고 있으므로 데이터셋 크기와 관계없이 메모리가 일정합니다.
+- 결과는 입력 순서대로 쓰이고, 끝난 행은 바로 디스크에 기록됩니다 (중간에 죽어도 앞부분은 남음).
+
+환경 변수
+- EVAL_CONCURRENCY : 동시에 처리할 행 수 (기본 1 = 지금처럼 한 행씩)
+"""
+import csv
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from tqdm import tqdm
+
+from dataset_manifest import entry_of
+
+CONCURRENCY = int(os.environ.get("EVAL_CONCURRENCY", "1"))
+
+
+def count_rows(path, encoding="utf-8", errors="strict"):
+    """헤더를 뺀 데이터 행 수 (진행률 표시용, dataset_manifest 에 있으면 파일을 읽지 않음)."""
+    entry = entry_of(path)
+    if entry is not None:
+        return entry["rows"]
+    with open(path, encoding=encoding, errors=errors, newline="") as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def chunked(items, size):
+    """iterable 을 size 개씩 리스트로 묶어 내보냅니다."""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_ordered(func, items, workers=CONCURRENCY, buffer=None):
+    """func(item) 결과를 입력 순서대로 내보냅니다. 동시에 진행 중인 항목은 최대 buffer 개."""
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    buffer = buffer or workers * 2
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= buffer:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stream_csv(input_file, output_file, process_row, extra_fields=(), encoding="utf-8", errors="strict",
+               desc=None, workers=CONCURRENCY, fieldnames=None):
+    """input_file 의 행을 process_row(index, row) 로 처리해 output_file 에 바로바로 씁니다.
+
+    process_row 는 쓸 행(dict)을 돌려주며, None 을 돌려주면 그 행은 쓰지 않습니다.
+    extra_fields 는 입력에 없으면 헤더 끝에 붙일 컬럼, fieldnames 를 주면 그 헤더를 그대로 씁니다.
+    쓴 행 수를 돌려줍니다.
+    """
+    total = count_rows(input_file, encoding, errors)
+    written = 0
+    with open(input_file, encoding=encoding, errors=errors, newline="") as f_in, \
+         open(output_file, "w", encoding="utf-8", newline="") as f_out:
+        reader = csv.DictReader(f_in)
+        if fieldnames is None:
+            fieldnames = list(reader.fieldnames or [])
+            fieldnames += [c for c in extra_fields if c not in fieldnames]
+        writer = csv.DictWriter(f_out, fieldnames=fieldnames)
+        writer.writeheader()
+        results = map_ordered(lambda item: process_row(*item), enumerate(reader), workers)
+        for row in tqdm(results, total=total, desc=desc):
+            if row is None:
+                continue
+            writer.writerow(row)
+            f_out.flush()
+            written += 1
+    return written
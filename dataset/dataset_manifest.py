@@ -0,0 +1,261 @@
+"""dataset/ 아래 CSV 마다 "무슨 파일인지" 를 한 번 스캔해 두는 manifest 겸 스키마 레지스트리.
+
+파일마다 컬럼 이름이 다르고 (mc1_choice / mc1_choices_Jeju, sentence1_Jeju / sentence1_jeju, question_ko ...),
+스크립트는 행마다 next(row[c] for c in row if c.lower().startswith("question_")) 처럼 컬럼을 찾았습니다.
+여기서는 스캐너가 파일마다 한 번
+
+    데이터셋 / 지역 / 번역 모델 / 평가 모델 / 평가 종류 / 인코딩 / 행 수 / 컬럼 매핑 / 크기 / SHA-256
+
+을 dataset/dataset_manifest.json 에 기록하고, 스크립트는 columns_of(path) 로 {표준 컬럼: 실제 컬럼} 을 받아
+행마다 row[cols["question"]] 로 바로 읽습니다.
+
+- 표준 컬럼 : question, sentence1, sentence2, mc1_choices, mc2_choices, mc1_labels, mc2_labels, 그 밖의 컬럼은 소문자 그대로
+- manifest 에 없거나 내용이 달라진 파일 (새 입력 파일, 평가 출력 등) 은 헤더만 읽어 같은 규칙으로 매핑합니다.
+  크기가 같아도 수정 시각 (mtime_ns) 이 manifest 와 다르면 SHA-256 을 다시 계산해 비교합니다
+  (git checkout 직후처럼 내용은 같고 시각만 다른 파일은 프로세스마다 한 번만 해시).
+
+사용 예
+    python dataset/dataset_manifest.py          # 스캔 후 manifest 갱신
+    python dataset/dataset_manifest.py --check  # manifest 와 실제 파일이 다른지 확인만
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+
+from normalize_encoding import encoding_of
+
+DATASET_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(DATASET_DIR, "dataset_manifest.json")
+
+# 폴더 이름 → (모델 계열, 평가 모델 이름, 번역 모델 이름)
+MODELS = {
+    "chatgpt": ("gpt", "gpt-5.1", "gpt-5"),
+    "claude": ("claude", "claude-sonnet-4-5", "claude-sonnet-4-5"),
+    "gemini": ("gemini", "gemini-3", "gemini-2.5-pro"),
+}
+EVAL_TYPES = {"accuracy_eval_dataset": "accuracy", "hallucination_eval_dataset": "hallucination",
+              "translation_dataset": "translation"}
+_FAMILY_RE = re.compile(r"gpt|claude|gemini")
+
+REGION_ALIASES = {
+    "표준": ["ko", "kor", "korean", "std", "standard"],
+    "충청도": ["chungcheong", "choongchung", "choochung", "chungchung", "choongcheong"],
+    "경상도": ["gyeongsang", "kyungsang"],
+    "제주도": ["jeju"],
+    "전라도": ["jeolla", "jeonra", "jeollra", "jeonla"],
+}
+# 지역 이름 → manifest / 파티션에 쓰는 ASCII 이름
+REGION_KEYS = {"표준": "standard", "충청도": "chungcheong", "경상도": "gyeongsang", "제주도": "jeju", "전라도": "jeolla"}
+_REGIONS = {alias: region for region, aliases in REGION_ALIASES.items() for alias in aliases}
+_REGION_RE = re.compile(r"^(?:mednli|truthfulqa)_([a-z]+)")
+
+_DIALECT_COLUMN_RE = re.compile(r"^(question|sentence1|sentence2|mc1_choices?|mc2_choices?)_.+$")
+_ALIASES = {"mc1_choice": "mc1_choices", "mc2_choice": "mc2_choices",
+            "mc1_label": "mc1_labels", "mc2_label": "mc2_labels"}
+
+_manifest = None
+_verified = {}  # 상대 경로 -> 이번 프로세스에서 SHA-256 까지 확인한 (크기, mtime_ns)
+
+
+# ============================================================
+#   1. 파일 이름 → 데이터셋 / 지역 / 모델
+# ============================================================
+
+def normalize_region(filename):
+    """파일 이름에서 지역을 찾아 표준 지역 이름 (표준, 충청도 ...) 으로 바꿉니다. 모르는 표기면 None."""
+    match = _REGION_RE.match(os.path.basename(filename).lower())
+    return _REGIONS.get(match.group(1)) if match else None
+
+
+def dataset_of(filename):
+    name = os.path.basename(filename).lower()
+    if name.startswith("mednli"):
+        return "mednli"
+    if name.startswith("truthfulqa"):
+        return "truthfulqa"
+    return None
+
+
+def translator_of(name, evaluator_family):
+    """파일 이름에 처음 나오는, 평가 모델과 다른 계열의 모델 이름 (이름에 없으면 unknown)."""
+    for match in _FAMILY_RE.finditer(name):
+        family = match.group(0)
+        if family != evaluator_family:
+            return next(translator for fam, _, translator in MODELS.values() if fam == family)
+    return "unknown"
+
+
+def partition_of(path):
+    """결과 파일 경로 → {dataset, region, translator, evaluator, eval_type}. 정할 수 없으면 None."""
+    parts = os.path.relpath(os.path.abspath(path), DATASET_DIR).split(os.sep)
+    if len(parts) != 3 or parts[0] not in MODELS or parts[1] not in EVAL_TYPES:
+        return None
+    name = parts[2].lower()
+    dataset = dataset_of(name)
+    region = REGION_KEYS.get(normalize_region(name))
+    if dataset is None or region is None:
+        return None
+    family, evaluator, translator = MODELS[parts[0]]
+    eval_type = EVAL_TYPES[parts[1]]
+    if eval_type == "translation":
+        evaluator = "none"
+    else:
+        translator = "none" if region == "standard" else translator_of(name, family)
+    return {"dataset": dataset, "region": region, "translator": translator,
+            "evaluator": evaluator, "eval_type": eval_type}
+
+
+# ============================================================
+#   2. 헤더 → 표준 컬럼 매핑
+# ============================================================
+
+def canonical_column(name):
+    """question_Jeju → question, mc1_choice_jeonra → mc1_choices, mc1_label → mc1_labels ..."""
+    name = name.strip().lower()
+    match = _DIALECT_COLUMN_RE.match(name)
+    if match:
+        name = match.group(1)
+    return _ALIASES.get(name, name)
+
+
+def column_map(fieldnames):
+    """헤더 → {표준 컬럼: 실제 컬럼}. 같은 표준 컬럼이 여럿이면 방언 접미사가 붙은 컬럼을 씁니다."""
+    mapping = {}
+    for name in fieldnames if fieldnames is not None else []:
+        if not isinstance(name, str) or not name.strip() or name.lower().startswith("unnamed"):
+            continue
+        canonical = canonical_column(name)
+        if canonical not in mapping or mapping[canonical].strip().lower() == canonical:
+            mapping[canonical] = name
+    return mapping
+
+
+def _read_header(path, encoding):
+    with open(path, encoding=encoding, errors="replace", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+# ============================================================
+#   3. manifest
+# ============================================================
+
+def _key(path):
+    return os.path.relpath(os.path.abspath(path), DATASET_DIR).replace(os.sep, "/")
+
+
+def _sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_file(path):
+    """파일 하나의 manifest 항목."""
+    encoding = encoding_of(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    with open(path, "rb") as f:
+        data = f.read()
+    rows = list(csv.reader(io.StringIO(data.decode(encoding, errors="replace"), newline="")))
+    entry = {"dataset": dataset_of(path), "region": None, "translator": None, "evaluator": None, "eval_type": None}
+    entry.update(partition_of(path) or {})
+    entry.update(encoding=encoding, rows=max(0, len(rows) - 1), columns=column_map(rows[0] if rows else []),
+                 size=len(data), mtime_ns=mtime_ns, sha256=hashlib.sha256(data).hexdigest())
+    return entry
+
+
+def build(dataset_dir=DATASET_DIR):
+    """dataset_dir 아래 모든 CSV 를 스캔해 {상대 경로: 항목} 을 돌려줍니다."""
+    paths = sorted(glob.glob(os.path.join(dataset_dir, "**", "*.csv"), recursive=True))
+    return {_key(path): scan_file(path) for path in paths}
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def _without_mtime(entry):
+    # mtime_ns 는 git checkout 만으로도 바뀌므로 --check 의 비교에서는 뺌
+    return {name: value for name, value in entry.items() if name != "mtime_ns"}
+
+
+def entry_of(path):
+    """manifest 에 있고 내용이 같은 파일의 항목 (없으면 None). manifest 는 처음 한 번만 읽습니다.
+
+    크기가 다르면 바로 None, 크기와 mtime_ns 가 같으면 그대로 믿고, mtime_ns 만 다르면 SHA-256 을 비교합니다.
+    """
+    global _manifest
+    if _manifest is None:
+        _manifest = load_manifest()
+    key = _key(path)
+    entry = _manifest.get(key)
+    if not entry:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if entry["size"] != stat.st_size:
+        return None
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    if entry.get("mtime_ns") != stat.st_mtime_ns and _verified.get(key) != stamp:
+        if _sha256_of(path) != entry["sha256"]:
+            return None
+        _verified[key] = stamp
+    return entry
+
+
+def columns_of(path, fieldnames=None):
+    """path 의 {표준 컬럼: 실제 컬럼}. manifest 에 없으면 fieldnames (없으면 파일 헤더) 로 매핑합니다."""
+    entry = entry_of(path)
+    if entry is not None:
+        return entry["columns"]
+    if fieldnames is None:
+        fieldnames = _read_header(path, encoding_of(path))
+    return column_map(fieldnames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dataset/ 아래 CSV 의 manifest / 컬럼 매핑 스캔")
+    parser.add_argument("--check", action="store_true", help="manifest 를 쓰지 않고 달라진 파일만 출력")
+    args = parser.parse_args()
+
+    manifest = build()
+    previous = load_manifest()
+    changed = sorted(key for key in manifest.keys() | previous.keys()
+                     if key not in manifest or key not in previous
+                     or _without_mtime(manifest[key]) != _without_mtime(previous[key]))
+    for key in changed:
+        mark = "+" if key not in previous else "-" if key not in manifest else "~"
+        print(f"{mark} {key}")
+    unknown = [key for key, entry in manifest.items() if entry["eval_type"] is None]
+    if unknown:
+        print(f"⚠️ 데이터셋/지역/모델을 정할 수 없는 파일 {len(unknown)}개: {', '.join(unknown)}")
+    print(f"\nCSV {len(manifest)}개, 바뀐 항목 {len(changed)}개")
+    if args.check:
+        sys.exit(1 if changed else 0)
+    save_manifest(manifest)
+    print(f"✔ manifest → {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
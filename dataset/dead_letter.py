@@ -0,0 +1,177 @@
+"""호출에 실패한 행을 모아 두는 dead-letter 파일과 재시도 명령.
+
+실패한 행의 답변 칸에 "API_ERROR", "ERROR: ..." 같은 문자열을 적으면 채점에서 오답(환각)으로 세어지므로,
+평가/번역 스크립트는 실패한 행의 답변을 비워 두고 <출력파일>.deadletter.jsonl 에
+(행 번호, 입력 해시, 오류, 다시 보낼 요청) 한 줄을 남깁니다.
+
+- 저널을 쓰는 스크립트는 journal.fail() 이 저널과 dead-letter 에 함께 기록하고,
+  같은 행이 나중에 성공하면 dead-letter 에 resolved 로 표시합니다.
+- retry 명령은 아직 해결되지 않은 요청을 다시 보내 응답 캐시에 채웁니다.
+  그 뒤 스크립트를 다시 실행하면 저널에서 실패로 남은 행만 다시 호출되고, 그 호출은 캐시에서 바로 채워집니다.
+
+사용 예
+    python dataset/dead_letter.py                       # dataset/ 아래 dead-letter 파일별 미해결 행 수
+    python dataset/dead_letter.py list out.csv          # 한 출력 파일의 실패 행 목록
+    python dataset/dead_letter.py retry                 # 미해결 요청을 다시 보내 캐시에 채움
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+
+DATASET_DIR = os.path.dirname(os.path.abspath(__file__))
+SUFFIX = ".deadletter.jsonl"
+
+# 예전 출력 파일에 남아 있는 호출 실패 표시 (채점에서 제외)
+FAILED_MARKERS = ("API_ERROR", "API_CALL_FAILED", "ERROR_API", "ERROR", "[ERROR")
+
+
+def is_failed_answer(value):
+    """답변 칸이 호출 실패 표시인지 ("API_ERROR", "ERROR: ...", "[ERROR: ...]" 등)."""
+    return isinstance(value, str) and value.strip().upper().startswith(FAILED_MARKERS)
+
+
+def dead_letter_path(output_file):
+    return output_file + SUFFIX
+
+
+def request_of(system, user, provider, model, **params):
+    """retry 가 complete() 로 다시 보낼 수 있는 요청."""
+    return {"system": system, "user": user, "provider": provider, "model": model, "params": params}
+
+
+class DeadLetter:
+    """실패한 행을 append-only JSONL 로 기록합니다. 파일은 처음 실패할 때 만듭니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self.added = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._unresolved = set(pending(path))  # 이전 실행에서 남은 미해결 행 + 이번에 추가한 행
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def add(self, row_id, error, request=None, key=None):
+        self._write({"row": str(row_id), "hash": key, "error": str(error), "request": request, "time": time.time()})
+        with self._lock:
+            self._unresolved.add(str(row_id))
+        self.added += 1
+
+    def resolve(self, row_id):
+        """row_id 가 미해결이면 해결로 표시합니다. 실패한 적 없는 행이면 아무것도 쓰지 않으므로 성공할 때마다 불러도 됩니다."""
+        with self._lock:
+            if str(row_id) not in self._unresolved:
+                return
+            self._unresolved.discard(str(row_id))
+        self._write({"row": str(row_id), "resolved": True, "time": time.time()})
+
+    def summary(self):
+        return f"📮 dead-letter: 실패 {self.added}행 → {self.path}" if self.added else None
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+
+
+def open_dead_letter(output_file):
+    return DeadLetter(dead_letter_path(output_file))
+
+
+# ============================================================
+#   읽기 / 재시도
+# ============================================================
+
+def pending(path):
+    """dead-letter 파일에서 아직 해결되지 않은 행 {행 번호: 마지막 실패 기록}."""
+    entries = {}
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 크래시로 잘린 마지막 줄
+                if entry.get("resolved"):
+                    entries.pop(entry["row"], None)
+                else:
+                    entries[entry["row"]] = entry
+    except OSError:
+        pass
+    return entries
+
+
+def find(paths=None):
+    """dead-letter 파일 목록. paths 가 없으면 dataset/ 아래 전체, 출력 CSV 를 주면 그 옆의 파일."""
+    if not paths:
+        return sorted(glob.glob(os.path.join(DATASET_DIR, "**", f"*{SUFFIX}"), recursive=True))
+    return [p if p.endswith(SUFFIX) else dead_letter_path(p) for p in paths]
+
+
+def retry(path):
+    """미해결 요청을 다시 보내 응답 캐시를 채웁니다. (성공, 실패, 요청 없음) 행 수를 돌려줍니다."""
+    from llm_client import LLMError, complete
+
+    succeeded = failed = skipped = 0
+    for row_id, entry in pending(path).items():
+        request = entry.get("request")
+        if not request:
+            skipped += 1
+            continue
+        try:
+            complete(request["system"], request["user"], provider=request["provider"],
+                     model=request["model"], **request.get("params", {}))
+            succeeded += 1
+        except LLMError as e:
+            print(f"⚠️ 행 {row_id} 재시도 실패: {e}")
+            failed += 1
+    return succeeded, failed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="실패한 행 (dead-letter) 확인 / 재시도")
+    parser.add_argument("command", nargs="?", choices=["list", "retry"], default="list")
+    parser.add_argument("paths", nargs="*", help="출력 CSV 또는 .deadletter.jsonl (없으면 dataset/ 전체)")
+    args = parser.parse_args()
+
+    if args.command == "retry":
+        # get_cache() 는 캐시가 꺼져 있으면 None 이 아니라 빈 캐시 (_NullCache) 를 돌려줌
+        if os.environ.get("LLM_CACHE_DISABLE") == "1":
+            parser.error("응답 캐시가 꺼져 있어 (LLM_CACHE_DISABLE) 재시도 결과를 스크립트에 넘길 수 없습니다.")
+
+    paths = find(args.paths)
+    total = 0
+    for path in paths:
+        entries = pending(path)
+        total += len(entries)
+        if not entries:
+            continue
+        print(f"📮 {os.path.relpath(path)}: 미해결 {len(entries)}행")
+        if args.command == "list" and args.paths:
+            for row_id, entry in entries.items():
+                print(f"   행 {row_id}: {entry['error']}")
+        if args.command == "retry":
+            succeeded, failed, skipped = retry(path)
+            print(f"   재시도 성공 {succeeded}행 / 실패 {failed}행 / 요청 정보 없음 {skipped}행")
+    print(f"\n미해결 행 {total}개")
+    if args.command == "retry" and total:
+        print("✔ 성공한 응답은 캐시에 있으므로 해당 평가/번역 스크립트를 다시 실행하면 실패했던 행만 캐시에서 채워집니다.")
+
+
+if __name__ == "__main__":
+    main()
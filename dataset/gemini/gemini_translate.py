@@ -1,143 +1,248 @@
 import csv
-import time
-from google import genai  
-import multiprocessing
 import os 
+import sys
 from tqdm import tqdm
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_client import LLMError, complete, configure
+from dead_letter import open_dead_letter, request_of
+from packed_translation import PACK_SIZE, build_packed_prompt, translate_packed
+from csv_pipeline import chunked, count_rows
+from work_queue import WORKERS, in_order, run_units, shared_limiters
 
-# ✅ Gemini API 설정
-client = genai.Client(api_key="")
 
+# ✅ Gemini API 설정 (클라이언트는 프로세스마다 llm_client 가 한 번만 만듦)
+GEMINI_API_KEY = ""
+configure("gemini", api_key=GEMINI_API_KEY)
 
-# ✅ 방언 번역 함수 정의
+
+user_messages = {
+    "Jeju": "다음 문장을 제주도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
+    "Gyeongsang": "다음 문장을 경상도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
+    "Jeolla": "다음 문장을 전라도 사투리로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
+    "Chungcheong": "다음 문장을 충청도 사투리로 자연스럽게 번역해줘. 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘"
+}
+
+system_message = {
+    "Jeju": "너는 제주도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마",
+    "Gyeongsang": "너는 경상도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마",
+    "Jeolla": "너는 전라도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마",
+    "Chungcheong": "너는 충청도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마"
+}
+
+
+def single_prompt(text, dialect):
+    user_prompt = f"{user_messages[dialect]}\n{text}"
+    return f"{system_message[dialect]}\n\n{user_prompt}"
+
+
+# ✅ 방언 번역 함수 정의 (실패하면 None: 원문을 번역 자리에 넣지 않음)
 def translate_dialect(text, dialect="Jeju"):
-    user_messages = {
-        "Jeju": "다음 문장을 제주도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
-        "Gyeongsang": "다음 문장을 경상도 방언으로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
-        "Jeolla": "다음 문장을 전라도 사투리로 자연스럽게 번역해줘, 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘",
-        "Chungcheong": "다음 문장을 충청도 사투리로 자연스럽게 번역해줘. 만약 전문 언어라 해석이 어렵다면 영어로 남겨줘"
-    }
-    
-    system_message = {
-        "Jeju": "너는 제주도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마",
-        "Gyeongsang": "너는 경상도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마",
-        "Jeolla": "너는 전라도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마",
-        "Chungcheong": "너는 충청도 방언 전문가야. 이제 부터 문장이 주어지면 해당 지역 방언으로 정확하게 번역해야 해,다른 설명은 절대 추가하지마"
-    }
-    
     if not text or str(text).strip() == "":
         return ""
     
-    
-    user_prompt = f"{user_messages[dialect]}\n{text}"
-    full_prompt = f"{system_message[dialect]}\n\n{user_prompt}"
+    full_prompt = single_prompt(text, dialect)
     
     try:
-        response = client.models.generate_content(
-         model="gemini-2.5-pro",contents = full_prompt
-        )
-        return response.text.strip()
-    except Exception as e:
+        return complete(None, full_prompt, provider="gemini", model="gemini-2.5-pro").text
+    except LLMError as e:
         print(f"번역 에러 발생 ({dialect}): {e}")
-        return text
+        return None
+
+
+# ✅ 여러 문장을 한 요청으로 묶어 번역 (JSON 배열 응답, 개수가 안 맞으면 나눠서 재요청, API 오류면 묶음 전체 실패)
+def translate_dialects(texts, dialect="Jeju"):
+    def _batch(chunk):
+        full_prompt = f"{system_message[dialect]}\n\n{build_packed_prompt(user_messages[dialect], chunk)}"
+        return complete(None, full_prompt, provider="gemini", model="gemini-2.5-pro").text
+
+    def _failed(chunk, error):
+        print(f"묶음 번역 에러 발생 ({dialect}, {len(chunk)}문장): {error}")
+
+    # 실패한 문장은 None (translate_dialect 와 같음)
+    return translate_packed(texts, _batch, lambda t: translate_dialect(t, dialect), on_error=_failed)
+
+
+# ✅ 데이터셋별 번역 대상 컬럼 / 출력 행 정의
+def truthfulqa_fieldnames(dialect):
+    return [f"question_{dialect}", f"mc1_choices_{dialect}",f"mc1_labels",f"mc2_choices_{dialect}",f"mc2_labels","ai_answer_mc1","mc1_result","ai_answer_mc2","mc2_result"]
+
+
+def truthfulqa_texts(row):
+    return [row.get("question_ko", ""), row.get("mc1_choices_ko", ""), row.get("mc2_choices_ko", "")]
+
+
+def truthfulqa_output(row, translated, dialect):
+    question_dialect, mc1_choice_dialect, mc2_choice_dialect = translated
+    return {
+        f"question_{dialect}": question_dialect,
+        f"mc1_choices_{dialect}": mc1_choice_dialect,
+        f"mc1_labels":row.get("mc1_labels",""),
+        f"mc2_choices_{dialect}": mc2_choice_dialect,
+        f"mc2_labels":row.get("mc2_labels",""),
+        f"ai_answer_mc1":"",
+        f"mc1_result":"",
+        f"ai_answer_mc2":"",
+        f"mc2_result":""
+    }
+
+
+def mednli_fieldnames(dialect):
+    return ["gold_label", f"sentence1_{dialect}", f"sentence2_{dialect}","ai_answer","result"]
+
+
+def mednli_texts(row):
+    return [row.get("sentence1_ko", ""), row.get("sentence2_ko", "")]
+
+
+def mednli_output(row, translated, dialect):
+    sentence1_dialect, sentence2_dialect = translated
+    return {
+        "gold_label": row.get("gold_label",""),
+        f"sentence1_{dialect}": sentence1_dialect,
+        f"sentence2_{dialect}": sentence2_dialect,
+        f"ai_answer":"",
+        f"result":""
+    }
+
+
+DATASETS = {
+    "truthfulqa": (truthfulqa_fieldnames, truthfulqa_texts, truthfulqa_output),
+    "mednli": (mednli_fieldnames, mednli_texts, mednli_output),
+}
+
+
+def _block_texts(kind, block):
+    texts_of = DATASETS[kind][1]
+    return [text for row in block for text in texts_of(row)]
+
+
+def _record_failures(dead_letter, texts, translated, dialect, error="번역 실패"):
+    """번역에 실패한 (None) 문장은 빈 칸으로 바꾸고 dead-letter 에 남김 (원문이 방언 결과로 채점되지 않도록).
+
+    성공한 문장은 이전 실행의 dead-letter 항목을 해결로 표시합니다.
+    """
+    cleaned = []
+    for text, result in zip(texts, translated):
+        if result is None and text and str(text).strip():
+            dead_letter.add(text, error, request_of(None, single_prompt(text, dialect), "gemini", "gemini-2.5-pro"))
+        elif result is not None:
+            dead_letter.resolve(text)
+        cleaned.append(result or "")
+    return cleaned
+
+
+def _write_block(writer, kind, block, translated, dialect):
+    output_of = DATASETS[kind][2]
+    width = len(translated) // max(1, len(block))
+    for j, row in enumerate(block):
+        writer.writerow(output_of(row, translated[width * j:width * (j + 1)], dialect))
+
+
+def _open_output(kind, output_csv, dialect):
+    outfile = open(output_csv, "w", encoding="utf-8", newline="")
+    writer = csv.DictWriter(outfile, fieldnames=DATASETS[kind][0](dialect))
+    writer.writeheader()
+    return outfile, writer
+
+
+# ✅ 파일 하나를 현재 프로세스에서 번역 (입력을 PACK_SIZE 행씩 읽어 묶음 번역 후 바로 씀)
+def process_file(kind, input_csv, output_csv, dialect):
+    total_blocks = -(-count_rows(input_csv) // max(1, PACK_SIZE))
+    outfile, writer = _open_output(kind, output_csv, dialect)
+    with open(input_csv, "r", encoding="utf-8") as infile, outfile, open_dead_letter(output_csv) as dead_letter:
+        reader = csv.DictReader(infile)
+        print(f"[{dialect}] CSV 컬럼:", reader.fieldnames)
+        done = 0
+        for block in tqdm(chunked(reader, PACK_SIZE), total=total_blocks, desc=f"[{dialect}]번역 진행"):
+            texts = _block_texts(kind, block)
+            translated = _record_failures(dead_letter, texts, translate_dialects(texts, dialect), dialect)
+            _write_block(writer, kind, block, translated, dialect)
+            outfile.flush()
+            done += len(block)
+            print(f"[{dialect}] {done}번째 문장 번역 완료")
+        if dead_letter.summary():
+            print(dead_letter.summary())
+
+    print(f"\n[{dialect}] 모든 번역 완료! 저장 위치: {output_csv}")
+
 
 # ✅ 파일 처리(TruthfulQA) 
 def process_TruthfulQA(input_csv, output_csv, dialect):
-    
-        with open(input_csv, "r", encoding="utf-8") as infile, \
-             open(output_csv, "w", encoding="utf-8", newline="") as outfile:
-            
-            reader = csv.DictReader(infile)
-            data_rows = list(reader)
-            
-            
-            fieldnames = [f"question_{dialect}", f"mc1_choices_{dialect}",f"mc1_labels",f"mc2_choices_{dialect}",f"mc2_labels","ai_answer_mc1","mc1_result","ai_answer_mc2","mc2_result"]
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for i, row in enumerate(tqdm(data_rows, desc=f"[{dialect}]번역 진행")):
-                
-                question_dialect = translate_dialect(row.get("question_ko", ""), dialect)
-                mc1_choice_dialect = translate_dialect(row.get("mc1_choices_ko", ""), dialect)
-                mc1_labels = row.get("mc1_labels","")
-                mc2_choice_dialect = translate_dialect(row.get("mc2_choices_ko", ""), dialect)
-                mc2_labels = row.get("mc2_labels","")
-                writer.writerow({
-                    f"question_{dialect}": question_dialect,
-                    f"mc1_choices_{dialect}": mc1_choice_dialect,
-                    f"mc1_labels":mc1_labels,
-                    f"mc2_choices_{dialect}": mc2_choice_dialect,
-                    f"mc2_labels":mc2_labels,
-                    f"ai_answer_mc1":"",
-                    f"mc1_result":"",
-                    f"ai_answer_mc2":"",
-                    f"mc2_result":""
-                })
-                print(f"[{dialect}] {i+1}번째 문장 번역 완료")
-                
-                time.sleep(1.2)
-                
-        print(f"\n[{dialect}] 모든 번역 완료! 저장 위치: {output_csv}")
-        
+    process_file("truthfulqa", input_csv, output_csv, dialect)
+
 
 # ✅ 파일 처리(MedNLI)
 def process_mednli(input_csv, output_csv, dialect):
-    
-        with open(input_csv, "r", encoding="utf-8") as infile, \
-             open(output_csv, "w", encoding="utf-8", newline="") as outfile:
-            
-            reader = csv.DictReader(infile)
-            print(f"[{dialect}] CSV 컬럼:", reader.fieldnames)
-            
-            
-            fieldnames = ["gold_label", f"sentence1_{dialect}", f"sentence2_{dialect}","ai_answer","result"]
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for i, row in enumerate(reader):
-                gold_label = row.get("gold_label","")
-                sentence1_dialect = translate_dialect(row.get("sentence1_ko", ""), dialect)
-                sentence2_dialect = translate_dialect(row.get("sentence2_ko", ""), dialect)
-                
-                
-                writer.writerow({
-                    "gold_label": gold_label,
-                    f"sentence1_{dialect}": sentence1_dialect,
-                    f"sentence2_{dialect}": sentence2_dialect,
-    		        f"ai_answer":"",
-		            f"result":""
-                })
-                print(f"[{dialect}] {i+1}번째 문장 번역 완료")
-                time.sleep(1.2)
-                
-        print(f"\n[{dialect}] 모든 번역 완료! 저장 위치: {output_csv}")
-        
+    process_file("mednli", input_csv, output_csv, dialect)
+
+
+# ✅ 워커에서 실행: 행 블록 하나를 묶음 번역
+def translate_block(payload):
+    dialect, texts = payload
+    return translate_dialects(texts, dialect)
+
+
+# ✅ 파일들을 PACK_SIZE 행씩 읽으며 작업 단위를 만듦 (쓰기 전까지 블록 행은 pending 에 보관)
+def _iter_units(jobs, pending):
+    for job, (kind, input_csv, dialect) in jobs.items():
+        with open(input_csv, "r", encoding="utf-8") as infile:
+            for b, block in enumerate(chunked(csv.DictReader(infile), PACK_SIZE)):
+                pending[job, b] = block
+                yield job, b, (dialect, _block_texts(kind, block))
+
+
+# ✅ 여러 파일을 하나의 작업 큐로 번역 (빈 워커가 아무 파일의 다음 블록을 가져감)
+def process_all(tasks, processes=WORKERS):
+    """tasks: [(kind, input_csv, output_csv, dialect), ...]
+
+    입력은 워커가 가져가는 만큼만 읽고 (run_units 의 window), 끝난 블록은 순서대로 바로 씁니다.
+    """
+    jobs, outputs, dead_letters, total_blocks = {}, {}, {}, 0
+    for job, (kind, input_csv, output_csv, dialect) in enumerate(tasks):
+        if not os.path.exists(input_csv):
+            print(f"✗ [{dialect}] 파일 없음: {input_csv}")
+            continue
+        jobs[job] = (kind, input_csv, dialect)
+        outputs[job] = _open_output(kind, output_csv, dialect)
+        dead_letters[job] = open_dead_letter(output_csv)
+        total_blocks += -(-count_rows(input_csv) // max(1, PACK_SIZE))
+
+    print(f"총 {len(jobs)}개 파일, {total_blocks}개 블록을 워커 {processes}개로 번역합니다...")
+    pending = {}
+    units = _iter_units(jobs, pending)
+    results = run_units(translate_block, units, processes=processes, total=total_blocks,
+                        limiters=shared_limiters("gemini"), desc="번역 진행")
+    for job, b, translated, error in in_order(results, {job: None for job in jobs}):
+        kind, _, dialect = jobs[job]
+        outfile, writer = outputs[job]
+        block = pending.pop((job, b))
+        texts = _block_texts(kind, block)
+        if error is not None:
+            # 블록 전체 번역 불가: 모든 문장을 실패로 (빈 칸 + dead-letter)
+            print(f"[{dialect}] 블록 {b} 번역 실패: {error}")
+            translated = [None] * len(texts)
+        translated = _record_failures(dead_letters[job], texts, translated, dialect, error or "번역 실패")
+        _write_block(writer, kind, block, translated, dialect)
+        outfile.flush()
+
+    for job, (outfile, writer) in outputs.items():
+        outfile.close()
+        dead_letters[job].close()
+        if dead_letters[job].summary():
+            print(dead_letters[job].summary())
+        print(f"\n[{jobs[job][2]}] 모든 번역 완료! 저장 위치: {outfile.name}")
+
 
 # ✅ 메인 실행부
 if __name__ == "__main__":
-    
-    try:
-        if os.name == 'nt' or multiprocessing.get_start_method(allow_none=True) != 'spawn':
-             multiprocessing.set_start_method("spawn", force=True)
-    except RuntimeError:
-       
-        pass
-
     dialects = ["Jeju", "Gyeongsang", "Jeolla", "Chungcheong"]   
     truthfulqa_tasks = [
-        ("TruthfulQA_result-gpt4o-gpt4o.csv", f"truthfulqa_{dialect}-gemini-2.5-pro.csv", dialect) 
+        ("truthfulqa", "TruthfulQA_result-gpt4o-gpt4o.csv", f"truthfulqa_{dialect}-gemini-2.5-pro.csv", dialect) 
         for dialect in dialects]
-    
-    
-    with multiprocessing.Pool(processes=len(dialects)) as pool:
-        pool.starmap(process_TruthfulQA, truthfulqa_tasks)
-        
-        mednli_tasks = [
-    ("mednli_kor.csv", f"mednli_{dialect}.gemini-2.5-pro.csv", dialect) 
-    for dialect in dialects]
-        
-    
-    with multiprocessing.Pool(processes=len(dialects)) as pool:
-        pool.starmap(process_mednli, mednli_tasks)
-    
\ No newline at end of file
+    mednli_tasks = [
+        ("mednli", "mednli_kor.csv", f"mednli_{dialect}.gemini-2.5-pro.csv", dialect) 
+        for dialect in dialects]
+
+    # 8개 파일의 블록을 한 큐에 넣어, 파일 길이와 관계없이 워커가 끝까지 같이 일하게 함
+    process_all(truthfulqa_tasks + mednli_tasks)
@@ -0,0 +1,550 @@
+"""OpenAI / Anthropic / Gemini 를 하나의 complete(system, user, **params) 로 호출하는 공통 클라이언트.
+
+- provider 별 SDK 클라이언트를 프로세스당 한 번만 만들고 재사용하므로
+  keep-alive 커넥션 풀이 유지되어 매 호출마다 TLS 핸드셰이크를 다시 하지 않습니다.
+  (multiprocessing 워커는 프로세스마다 자기 풀을 한 번 만들어 계속 씁니다.)
+- 재시도(429 / 타임아웃 / 5xx)는 여기서 한 번만 구현하고 스크립트별 재시도 코드는 쓰지 않습니다.
+- 호출 속도는 rate_limiter 가 응답 헤더와 429 를 보고 조절하므로 스크립트에서 time.sleep 을 하지 않습니다.
+- 모든 호출의 지연 시간(latency)을 Completion.latency 와 latency_summary() / latency_histogram() 으로 확인할 수 있습니다.
+- deadline 을 주면 (또는 LLM_DEADLINE) 재시도를 포함한 호출 전체가 그 시간 안에 끝나고, 요청마다 남은 시간을 타임아웃으로 씁니다.
+- 재시도까지 실패한 호출이 연속되면 circuit_breaker 가 그 provider/모델 호출을 잠시 멈춥니다 (장애 중에 행을 계속 실패시키지 않음).
+- 헤지 (LLM_HEDGE=1) : 응답이 최근 지연 분포의 p95 (LLM_HEDGE_QUANTILE) 보다 늦으면 같은 요청을 한 번 더 보내고
+  먼저 온 응답을 씁니다. 느린 꼬리 요청 하나가 직렬 루프 전체를 붙잡지 않도록 하기 위함입니다.
+- response_cache 와 연결되어 같은 요청은 API 를 다시 호출하지 않습니다.
+- 고정된 system 프롬프트는 provider 쪽 프롬프트 캐시의 접두부로 표시합니다 (LLM_PROMPT_CACHE=0 이면 끔).
+  Anthropic 은 cache_control, OpenAI 는 자동 접두부 캐시 + prompt_cache_key (같은 서버로 라우팅),
+  Gemini 는 system 이 충분히 길면 cached content 를 한 번 만들어 재사용합니다.
+  응답의 캐시된 입력 토큰 수는 Completion.usage["cached_tokens"] 와 call_stats() 로 확인합니다.
+
+API 키는 configure() 로 넘기거나 환경 변수(OPENAI_API_KEY / ANTHROPIC_API_KEY / GEMINI_API_KEY)를 씁니다.
+"""
+import asyncio
+import bisect
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from circuit_breaker import CircuitOpenError, get_breaker
+from rate_limiter import get_limiter
+from response_cache import get_cache, make_key
+
+PROVIDERS = ("openai", "anthropic", "gemini")
+
+DEFAULT_MODELS = {
+    "openai": "gpt-5.1",
+    "anthropic": "claude-sonnet-4-5-20250929",
+    "gemini": "gemini-2.5-pro",
+}
+
+# 요청 하나의 기본 타임아웃(초)
+DEFAULT_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "120"))
+DEFAULT_MAX_RETRIES = 3
+# 재시도를 포함한 호출 하나의 최대 시간(초, 없으면 제한 없음)
+DEFAULT_DEADLINE = float(os.environ["LLM_DEADLINE"]) if os.environ.get("LLM_DEADLINE") else None
+
+# 헤지 요청: 표본이 HEDGE_MIN_SAMPLES 개 이상 모인 뒤, 지연 분포의 HEDGE_QUANTILE 값을 넘기면 같은 요청을 하나 더 보냄
+HEDGE = os.environ.get("LLM_HEDGE") == "1"
+HEDGE_QUANTILE = float(os.environ.get("LLM_HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_THREADS = int(os.environ.get("LLM_HEDGE_THREADS", "32"))
+# 헤지 기준 지연은 매 호출마다 정렬하지 않고 기록이 이만큼 쌓일 때마다 다시 계산
+HEDGE_REFRESH = int(os.environ.get("LLM_HEDGE_REFRESH", "50"))
+
+# 분위수 (p50/p95/p99, 헤지 기준) 는 최근 LATENCY_WINDOW 개 호출로 계산. 호출 수 / 평균 / 최대 / 히스토그램은 전체 호출
+LATENCY_WINDOW = int(os.environ.get("LLM_LATENCY_WINDOW", "2048"))
+
+# 지연 히스토그램 구간 (초, 마지막 구간은 그 이상 전부)
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+
+# provider 쪽 프롬프트 캐시
+PROMPT_CACHE = os.environ.get("LLM_PROMPT_CACHE", "1") != "0"
+# Gemini cached content 는 최소 토큰 수 (모델별 1024~4096) 미만이면 만들 수 없으므로 이보다 짧은 system 은 시도하지 않음
+GEMINI_CACHE_MIN_CHARS = int(os.environ.get("LLM_GEMINI_CACHE_MIN_CHARS", "8000"))
+GEMINI_CACHE_TTL = os.environ.get("LLM_GEMINI_CACHE_TTL", "3600s")
+
+_settings = {
+    "openai": {"api_key": os.environ.get("OPENAI_API_KEY"), "base_url": os.environ.get("OPENAI_BASE_URL")},
+    "anthropic": {"api_key": os.environ.get("ANTHROPIC_API_KEY"), "base_url": os.environ.get("ANTHROPIC_BASE_URL")},
+    "gemini": {"api_key": os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY"),
+               "base_url": os.environ.get("GEMINI_BASE_URL")},
+}
+
+_clients = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+_latencies = {}  # (provider, model) -> 최근 LATENCY_WINDOW 개의 지연(초) deque
+_latency_totals = {}  # (provider, model) -> [호출 수, 지연 합, 최대 지연, LATENCY_BUCKETS 구간별 호출 수]
+_hedge_delays = {}  # (provider, model) -> (계산했을 때의 호출 수, 헤지 기준 지연)
+_latencies_lock = threading.Lock()
+_counters = {"calls": 0, "cached": 0, "attempts": 0, "retries": 0, "rate_limited": 0, "failed": 0,
+             "prompt_tokens": 0, "cached_tokens": 0, "hedged": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+
+_hedge_pool = None
+_hedge_pool_pid = None
+
+_gemini_caches = {}  # (model, system 해시) -> cached content 이름 (만들 수 없으면 None)
+_gemini_caches_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    """재시도 후에도 실패한 호출. status 는 HTTP 상태 코드(알 수 없으면 None)."""
+
+    def __init__(self, provider, message, status=None, retryable=False):
+        super().__init__(f"[{provider}] {message}")
+        self.provider = provider
+        self.status = status
+        self.retryable = retryable
+
+
+class Completion:
+    """complete() 의 결과. text 외에 지연 시간·시도 횟수·캐시 적중 여부를 담습니다."""
+
+    def __init__(self, text, provider, model, latency, attempts=1, cached=False, usage=None):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.latency = latency
+        self.attempts = attempts
+        self.cached = cached
+        self.usage = usage or {}
+
+    def __repr__(self):
+        return (f"Completion(provider={self.provider!r}, model={self.model!r}, "
+                f"latency={self.latency:.3f}s, attempts={self.attempts}, cached={self.cached})")
+
+
+def configure(provider, api_key=None, base_url=None):
+    """스크립트에 적힌 API 키 / 엔드포인트를 등록합니다. 이미 만든 클라이언트는 새로 만듭니다."""
+    if api_key:
+        _settings[provider]["api_key"] = api_key
+    if base_url:
+        _settings[provider]["base_url"] = base_url
+    with _clients_lock:
+        _clients.pop(provider, None)
+
+
+def get_client(provider):
+    """provider 별 SDK 클라이언트를 프로세스당 하나씩 만들어 재사용합니다."""
+    global _clients_pid
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            # fork 로 물려받은 커넥션 풀은 쓰지 않음
+            _clients.clear()
+            _clients_pid = os.getpid()
+        if provider not in _clients:
+            _clients[provider] = _build_client(provider)
+        return _clients[provider]
+
+
+def _build_client(provider):
+    settings = _settings[provider]
+    if provider == "openai":
+        import openai
+        return openai.OpenAI(
+            api_key=settings["api_key"] or "api_key",
+            base_url=settings["base_url"],
+            timeout=DEFAULT_TIMEOUT,
+            max_retries=0,  # 재시도는 complete() 에서 처리
+            http_client=openai.DefaultHttpxClient(),
+        )
+    if provider == "anthropic":
+        import anthropic
+        return anthropic.Anthropic(
+            api_key=settings["api_key"] or "api_key",
+            base_url=settings["base_url"],
+            timeout=DEFAULT_TIMEOUT,
+            max_retries=0,
+            http_client=anthropic.DefaultHttpxClient(),
+        )
+    if provider == "gemini":
+        from google import genai
+        from google.genai import types
+        http_options = types.HttpOptions(timeout=int(DEFAULT_TIMEOUT * 1000))
+        if settings["base_url"]:
+            http_options.base_url = settings["base_url"]
+        return genai.Client(api_key=settings["api_key"], http_options=http_options)
+    raise ValueError(f"지원하지 않는 provider: {provider}")
+
+
+# ============================================================
+#   provider 별 호출
+# ============================================================
+
+def prompt_cache_key(system):
+    """같은 system 프롬프트를 쓰는 요청끼리 같은 값 (OpenAI prompt_cache_key, Gemini cached content 구분용)."""
+    return hashlib.sha256(system.encode("utf-8")).hexdigest()[:32]
+
+
+def _call_openai(client, model, system, user, params, timeout=None):
+    openai_api = params.pop("openai_api", "chat")
+    if timeout is not None:
+        params["timeout"] = timeout
+    if PROMPT_CACHE and system:
+        # 접두부 캐시는 자동이지만, 같은 system 을 쓰는 요청이 같은 캐시로 가도록 키를 붙임
+        params.setdefault("prompt_cache_key", prompt_cache_key(system))
+    if openai_api == "responses":
+        raw = client.responses.with_raw_response.create(model=model, instructions=system, input=user, **params)
+        resp = raw.parse()
+        return resp.output_text or "", _usage_dict(getattr(resp, "usage", None)), raw.headers
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": user})
+    raw = client.chat.completions.with_raw_response.create(model=model, messages=messages, **params)
+    resp = raw.parse()
+    return resp.choices[0].message.content or "", _usage_dict(resp.usage), raw.headers
+
+
+def _call_anthropic(client, model, system, user, params, timeout=None):
+    params.setdefault("max_tokens", 1024)
+    if timeout is not None:
+        params["timeout"] = timeout
+    kwargs = {}
+    if system:
+        kwargs["system"] = system
+        if PROMPT_CACHE:
+            kwargs["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+    raw = client.messages.with_raw_response.create(
+        model=model, messages=[{"role": "user", "content": user}], **kwargs, **params
+    )
+    resp = raw.parse()
+    text = resp.content[0].text if resp.content else ""
+    return text, _usage_dict(resp.usage), raw.headers
+
+
+def _gemini_cached_content(client, model, system):
+    """system 을 담은 cached content 이름. 프로세스당 (model, system) 마다 한 번만 만들고, 실패하면 다시 시도하지 않음."""
+    key = (model, prompt_cache_key(system))
+    with _gemini_caches_lock:
+        if key not in _gemini_caches:
+            from google.genai import types
+            try:
+                cache = client.caches.create(model=model, config=types.CreateCachedContentConfig(
+                    system_instruction=system, ttl=GEMINI_CACHE_TTL))
+                _gemini_caches[key] = cache.name
+            except Exception as e:
+                print(f"⚠️ gemini cached content 를 만들지 못해 system 을 매번 보냅니다 ({type(e).__name__}: {e})")
+                _gemini_caches[key] = None
+        return _gemini_caches[key]
+
+
+def _call_gemini(client, model, system, user, params, timeout=None):
+    from google.genai import types
+    if timeout is not None:
+        params["http_options"] = types.HttpOptions(timeout=max(1, int(timeout * 1000)))
+    cached_content = None
+    if PROMPT_CACHE and system and len(system) >= GEMINI_CACHE_MIN_CHARS:
+        cached_content = _gemini_cached_content(client, model, system)
+    if cached_content:
+        config = types.GenerateContentConfig(cached_content=cached_content, **params)
+    else:
+        config = types.GenerateContentConfig(system_instruction=system, **params) if (system or params) else None
+    try:
+        resp = client.models.generate_content(model=model, contents=user, config=config)
+    except Exception as e:
+        if not cached_content or _status_of(e) not in (400, 403, 404):
+            raise
+        # 만료되었거나 지워진 cached content → 이번에는 system 을 그대로 보내고, 다음 호출에서 다시 만듦
+        with _gemini_caches_lock:
+            _gemini_caches.pop((model, prompt_cache_key(system)), None)
+        config = types.GenerateContentConfig(system_instruction=system, **params)
+        resp = client.models.generate_content(model=model, contents=user, config=config)
+    http_response = getattr(resp, "sdk_http_response", None)
+    headers = getattr(http_response, "headers", None) or {}
+    return resp.text or "", _usage_dict(getattr(resp, "usage_metadata", None)), headers
+
+
+_CALLS = {"openai": _call_openai, "anthropic": _call_anthropic, "gemini": _call_gemini}
+
+
+def _usage_dict(usage):
+    """SDK usage → 숫자 필드 dict. provider 와 상관없이 prompt_tokens (캐시 포함 전체 입력) 와 cached_tokens 를 채웁니다."""
+    if usage is None or not hasattr(usage, "model_dump"):
+        return {}
+    raw = usage.model_dump()
+    out = {k: v for k, v in raw.items() if isinstance(v, (int, float))}
+    details = raw.get("prompt_tokens_details") or raw.get("input_tokens_details") or {}
+    if "cache_read_input_tokens" in raw:
+        # Anthropic: input_tokens 에는 캐시에서 읽거나 캐시에 쓴 토큰이 빠져 있음
+        cached = out.get("cache_read_input_tokens", 0)
+        prompt = out.get("input_tokens", 0) + cached + out.get("cache_creation_input_tokens", 0)
+    elif "prompt_token_count" in raw:
+        cached = out.get("cached_content_token_count", 0)
+        prompt = out.get("prompt_token_count", 0)
+    else:
+        cached = details.get("cached_tokens") or 0
+        prompt = out.get("prompt_tokens", out.get("input_tokens", 0))
+    out["prompt_tokens"] = prompt
+    out["cached_tokens"] = cached
+    return out
+
+
+def _status_of(exc):
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def _is_retryable(exc):
+    status = _status_of(exc)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    name = type(exc).__name__
+    return any(key in name for key in ("Timeout", "Connection", "RateLimit", "ResourceExhausted",
+                                       "DeadlineExceeded", "Aborted", "Overloaded"))
+
+
+def _error_headers(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None)
+
+
+def _retry_after(exc):
+    headers = _error_headers(exc)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limited(exc):
+    return _status_of(exc) == 429 or any(
+        key in type(exc).__name__ for key in ("RateLimit", "ResourceExhausted")
+    )
+
+
+def _get_hedge_pool():
+    global _hedge_pool, _hedge_pool_pid
+    with _clients_lock:
+        if _hedge_pool is None or _hedge_pool_pid != os.getpid():
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_THREADS, thread_name_prefix="llm-hedge")
+            _hedge_pool_pid = os.getpid()
+        return _hedge_pool
+
+
+def _hedge_delay(provider, model):
+    """헤지 요청을 보낼 때까지 기다릴 시간 (최근 지연 분포의 HEDGE_QUANTILE 값, 표본이 모자라면 None)."""
+    key = (provider, model)
+    with _latencies_lock:
+        window = _latencies.get(key)
+        if window is None or len(window) < HEDGE_MIN_SAMPLES:
+            return None
+        count = _latency_totals[key][0]
+        cached = _hedge_delays.get(key)
+        if cached is not None and count - cached[0] < HEDGE_REFRESH:
+            return cached[1]
+        values = sorted(window)
+        delay = values[int(HEDGE_QUANTILE * (len(values) - 1))]
+        _hedge_delays[key] = (count, delay)
+        return delay
+
+
+def _call_hedged(call, client, model, system, user, params, timeout, delay, limiter):
+    """delay 초 안에 응답이 없으면 같은 요청을 하나 더 보내고 먼저 성공한 응답을 돌려줍니다.
+
+    둘 다 실패하면 마지막 예외를 던집니다. 진 요청은 취소할 수 없으므로 백그라운드에서 끝나게 둡니다.
+    """
+    pool = _get_hedge_pool()
+    primary = pool.submit(call, client, model, system, user, dict(params), timeout)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    limiter.acquire()
+    _count(hedged=1)
+    backup = pool.submit(call, client, model, system, user, dict(params),
+                         None if timeout is None else max(0.001, timeout - delay))
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is backup:
+                    _count(hedge_wins=1)
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def _record_latency(provider, model, latency):
+    key = (provider, model)
+    with _latencies_lock:
+        if key not in _latencies:
+            _latencies[key] = deque(maxlen=LATENCY_WINDOW)
+            _latency_totals[key] = [0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+        _latencies[key].append(latency)
+        totals = _latency_totals[key]
+        totals[0] += 1
+        totals[1] += latency
+        totals[2] = max(totals[2], latency)
+        totals[3][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+
+def _count(**deltas):
+    with _latencies_lock:
+        for name, delta in deltas.items():
+            _counters[name] += delta
+
+
+# ============================================================
+#   공개 API
+# ============================================================
+
+def complete(system, user, provider="openai", model=None, max_retries=DEFAULT_MAX_RETRIES,
+             use_cache=True, deadline=None, hedge=None, **params):
+    """system/user 프롬프트로 한 번 호출하고 Completion 을 돌려줍니다.
+
+    params 는 temperature, top_p, max_tokens 같은 샘플링 파라미터이며 그대로 SDK 에 전달됩니다.
+    OpenAI Responses API 를 쓰려면 openai_api="responses" 를 넘깁니다.
+    deadline 은 재시도를 포함한 전체 제한 시간(초, None 이면 LLM_DEADLINE), hedge 는 헤지 요청 사용 여부
+    (None 이면 LLM_HEDGE) 입니다.
+    재시도 후에도 실패하거나 deadline 을 넘기면 LLMError 를 던집니다.
+    """
+    model = model or DEFAULT_MODELS[provider]
+    cache = get_cache() if use_cache else None
+    cache_key = make_key(provider, model, system, user, **params)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            _count(calls=1, cached=1)
+            return Completion(cached, provider, model, 0.0, attempts=0, cached=True)
+
+    client = get_client(provider)
+    call = _CALLS[provider]
+    limiter = get_limiter(provider, model)
+    breaker = get_breaker(provider, model)
+    try:
+        breaker.before_call()
+    except CircuitOpenError as e:
+        _count(calls=1, failed=1)
+        raise LLMError(provider, str(e), retryable=True) from e
+    hedge = HEDGE if hedge is None else hedge
+    deadline = DEFAULT_DEADLINE if deadline is None else deadline
+    give_up_at = None if deadline is None else time.monotonic() + deadline
+    attempt = 0
+    _count(calls=1)
+    while True:
+        attempt += 1
+        _count(attempts=1)
+        limiter.acquire()
+        timeout = None
+        if give_up_at is not None:
+            timeout = give_up_at - time.monotonic()
+            if timeout <= 0:
+                _count(failed=1, deadline_exceeded=1)
+                breaker.on_failure()
+                raise LLMError(provider, f"deadline {deadline:.1f}s 초과 (시도 {attempt - 1}회)", retryable=True)
+            timeout = min(timeout, DEFAULT_TIMEOUT)
+        delay = _hedge_delay(provider, model) if hedge else None
+        start = time.perf_counter()
+        try:
+            if delay is None:
+                text, usage, headers = call(client, model, system, user, dict(params), timeout)
+            else:
+                text, usage, headers = _call_hedged(call, client, model, system, user, params, timeout, delay, limiter)
+        except Exception as e:
+            retryable = _is_retryable(e)
+            if _is_rate_limited(e):
+                # 429: limiter 가 속도를 줄이고 Retry-After 동안 멈추므로 따로 sleep 하지 않음
+                _count(rate_limited=1)
+                limiter.on_rate_limited(_retry_after(e), _error_headers(e))
+            if not retryable or attempt > max_retries:
+                _count(failed=1)
+                # 재시도할 만한 오류(장애)만 연속 실패로 셈. 요청 자체의 오류는 시험 호출만 풀어 줌
+                if retryable:
+                    breaker.on_failure()
+                else:
+                    breaker.on_skip()
+                raise LLMError(provider, f"{type(e).__name__}: {e}", _status_of(e), retryable) from e
+            print(f"⚠️ {provider} 호출 실패 ({type(e).__name__}, 시도 {attempt}/{max_retries + 1}). 재시도...")
+            _count(retries=1)
+            if not _is_rate_limited(e):
+                backoff = min(60, 2 ** attempt + random.random())
+                if give_up_at is not None:
+                    backoff = min(backoff, max(0.0, give_up_at - time.monotonic()))
+                time.sleep(backoff)
+            continue
+        latency = time.perf_counter() - start
+        limiter.on_success(headers)
+        breaker.on_success()
+        _record_latency(provider, model, latency)
+        _count(prompt_tokens=usage.get("prompt_tokens", 0), cached_tokens=usage.get("cached_tokens", 0))
+        text = text.strip()
+        if cache is not None and text:
+            cache.put(cache_key, text, provider, model)
+        return Completion(text, provider, model, latency, attempts=attempt, usage=usage)
+
+
+async def acomplete(system, user, provider="openai", model=None, **params):
+    """complete() 의 asyncio 버전. 같은 커넥션 풀을 쓰도록 스레드에서 실행합니다."""
+    return await asyncio.to_thread(complete, system, user, provider, model, **params)
+
+
+def latency_summary():
+    """(provider, model) 별 호출 수와 평균/p50/p95/p99/최대 지연 시간(초). 분위수는 최근 LATENCY_WINDOW 개 호출 기준."""
+    summary = {}
+    with _latencies_lock:
+        items = {k: (list(v), list(_latency_totals[k][:3])) for k, v in _latencies.items()}
+    for key, (values, (count, total, longest)) in items.items():
+        values.sort()
+        n = len(values)
+        summary[key] = {
+            "count": count,
+            "mean": total / count,
+            "p50": values[int(0.50 * (n - 1))],
+            "p95": values[int(0.95 * (n - 1))],
+            "p99": values[int(0.99 * (n - 1))],
+            "max": longest,
+        }
+    return summary
+
+
+def latency_histogram():
+    """(provider, model) 별 LATENCY_BUCKETS 구간의 호출 수 목록 (마지막 값은 가장 큰 구간을 넘는 호출 수)."""
+    with _latencies_lock:
+        return {key: list(totals[3]) for key, totals in _latency_totals.items()}
+
+
+def call_stats():
+    """지금까지의 호출 수 / 캐시 적중 / 시도 / 재시도 / 429 / 최종 실패 횟수, 입력 토큰 / 프롬프트 캐시 토큰 수,
+    헤지 요청 수 / 헤지가 먼저 끝난 수 / deadline 초과 수."""
+    with _latencies_lock:
+        return dict(_counters)
+
+
+def reset_stats():
+    """지연 시간 기록과 호출 카운터를 비웁니다 (벤치마크에서 단계마다 따로 재기 위함)."""
+    with _latencies_lock:
+        _latencies.clear()
+        _latency_totals.clear()
+        _hedge_delays.clear()
+        for name in _counters:
+            _counters[name] = 0
+
+
+def print_latency_summary():
+    histogram = latency_histogram()
+    for (provider, model), s in latency_summary().items():
+        print(f"⏱️ {provider}/{model}: {s['count']}회, 평균 {s['mean']:.2f}s, p50 {s['p50']:.2f}s, p95 {s['p95']:.2f}s, "
+              f"p99 {s['p99']:.2f}s, 최대 {s['max']:.2f}s")
+        counts = histogram[(provider, model)]
+        labels = [f"≤{bound:g}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+        widest = max(counts)
+        for label, count in zip(labels, counts):
+            if count:
+                print(f"    {label:>6} {'█' * max(1, round(30 * count / widest)):<30} {count}")
+    stats = call_stats()
+    if stats["hedged"] or stats["deadline_exceeded"]:
+        print(f"🪃 헤지 요청 {stats['hedged']}회 (먼저 응답 {stats['hedge_wins']}회), deadline 초과 {stats['deadline_exceeded']}회")
+    if stats["prompt_tokens"]:
+        ratio = stats["cached_tokens"] / stats["prompt_tokens"]
+        print(f"🧊 프롬프트 캐시: 입력 토큰 {stats['prompt_tokens']}개 중 {stats['cached_tokens']}개 ({ratio:.0%}) 캐시 적중")
@@ -0,0 +1,147 @@
+"""dataset/ 아래 CSV 를 한 번에 UTF-8 로 바꾸고, 결과를 manifest 에 남기는 인코딩 정규화 도구.
+
+일부 번역/평가 결과 CSV 는 CP949 (또는 UTF-8 BOM) 로 저장되어 있어서 스크립트마다 파일을 열 때
+chardet 로 50KB 를 샘플링하거나, UTF-8 로 읽다 실패하면 CP949 로 다시 읽었습니다.
+
+- 감지 : chardet 대신 엄격한 디코딩을 순서대로 시도합니다 (UTF-8 → CP949).
+         둘 다 실패하면 CP949 로 읽고 깨진 바이트만 대체 문자(U+FFFD)로 바꾸며, 바뀐 글자 수를 기록합니다.
+- 변환 : UTF-8 (BOM 없음) 로 다시 쓰며 줄바꿈은 그대로 둡니다. 파일마다 별도 프로세스에서 병렬로 처리합니다.
+         대체 문자가 생기는 (어느 인코딩으로도 깨끗이 읽히지 않는) 파일은 원본 바이트를 잃지 않도록 바꾸지 않고 그대로 둡니다.
+- manifest : dataset/encoding_manifest.json 에 파일별 원래 인코딩, 대체 글자 수, 변환 후 (그대로 둔 파일은 원본) 크기와 SHA-256 을 남깁니다.
+
+읽는 쪽은 encoding_of(path) 로 인코딩을 얻습니다. manifest 에 있고 크기가 같은 파일은 감지 없이 바로 "utf-8"
+(그대로 둔 파일은 원래 인코딩), 아니면 (새로 생긴 파일 등) 같은 엄격한 디코딩 순서로 감지합니다.
+그대로 둔 파일이 있으므로 읽을 때는 errors="replace" (pandas 는 encoding_errors="replace") 를 함께 넘겨야 합니다.
+
+사용 예
+    python dataset/normalize_encoding.py            # dataset/ 전체 변환 + manifest 갱신
+    python dataset/normalize_encoding.py --dry-run  # 바꾸지 않고 감지 결과만 출력
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+DATASET_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(DATASET_DIR, "encoding_manifest.json")
+WORKERS = int(os.environ.get("ENCODING_WORKERS", str(os.cpu_count() or 1)))
+
+_BOM = b"\xef\xbb\xbf"
+_manifest = None
+
+
+# ============================================================
+#   1. 감지 / 디코딩
+# ============================================================
+
+def decode(data):
+    """바이트 → (텍스트, 원래 인코딩, 대체 글자 수). 인코딩은 "utf-8", "utf-8-sig", "cp949" 중 하나."""
+    for encoding in ("utf-8", "cp949"):
+        try:
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        if encoding == "utf-8" and data.startswith(_BOM):
+            return text[1:], "utf-8-sig", 0
+        return text, encoding, 0
+    text = data.decode("cp949", errors="replace")
+    return text, "cp949", text.count("\ufffd")
+
+
+def detect(data):
+    """바이트 → (인코딩, 대체 글자 수)."""
+    return decode(data)[1:]
+
+
+def _key(path):
+    return os.path.relpath(os.path.abspath(path), DATASET_DIR).replace(os.sep, "/")
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def encoding_of(path):
+    """path 를 열 때 쓸 인코딩. manifest 에 있는 (이미 UTF-8 로 바꾼) 파일은 감지하지 않습니다."""
+    global _manifest
+    if _manifest is None:
+        _manifest = load_manifest()
+    entry = _manifest.get(_key(path))
+    if entry and entry["size"] == os.path.getsize(path):
+        return entry["source_encoding"] if entry["replaced"] else "utf-8"
+    with open(path, "rb") as f:
+        return detect(f.read())[0]
+
+
+# ============================================================
+#   2. 변환
+# ============================================================
+
+def normalize_file(path, dry_run=False):
+    """파일 하나를 UTF-8 로 다시 쓰고 manifest 항목을 돌려줍니다 (이미 UTF-8 이거나 대체 문자가 생기면 그대로 둠)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    text, encoding, replaced = decode(data)
+    if encoding != "utf-8" and not replaced:
+        data = text.encode("utf-8")
+        if not dry_run:
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+    return {"source_encoding": encoding, "replaced": replaced, "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def scan(dataset_dir=DATASET_DIR):
+    return sorted(glob.glob(os.path.join(dataset_dir, "**", "*.csv"), recursive=True))
+
+
+def normalize_tree(dataset_dir=DATASET_DIR, workers=WORKERS, dry_run=False):
+    """dataset_dir 아래 모든 CSV 를 병렬로 변환하고 {상대 경로: manifest 항목} 을 돌려줍니다."""
+    paths = scan(dataset_dir)
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        entries = pool.map(normalize_file, paths, [dry_run] * len(paths))
+        return {_key(path): entry for path, entry in zip(paths, entries)}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dataset/ 아래 CSV 를 UTF-8 로 변환하고 manifest 기록")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="동시에 변환할 프로세스 수")
+    parser.add_argument("--dry-run", action="store_true", help="파일을 바꾸지 않고 감지 결과만 출력")
+    args = parser.parse_args()
+
+    manifest = normalize_tree(workers=args.workers, dry_run=args.dry_run)
+    converted = {key: entry for key, entry in manifest.items() if entry["source_encoding"] != "utf-8"}
+    for key, entry in load_manifest().items():
+        if key in manifest and key not in converted and manifest[key]["sha256"] == entry["sha256"]:
+            manifest[key] = entry  # 이전에 변환한 파일의 원래 인코딩 기록은 유지
+    kept = {key: entry for key, entry in converted.items() if entry["replaced"]}
+    for key, entry in converted.items():
+        if key in kept:
+            print(f"⚠️ {entry['source_encoding']:>9} 그대로 둠 {key} (깨진 글자 {entry['replaced']}개, errors='replace' 로 읽음)")
+        else:
+            print(f"{'→' if args.dry_run else '✔'} {entry['source_encoding']:>9} → utf-8  {key}")
+    verb = "바꿀" if args.dry_run else "바꾼"
+    print(f"\nCSV {len(manifest)}개 중 {verb} 파일 {len(converted) - len(kept)}개, 그대로 둔 파일 {len(kept)}개")
+    if not args.dry_run:
+        save_manifest(manifest)
+        print(f"✔ manifest → {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""여러 문장을 한 번의 요청으로 번역하는 패킹 모드.
+
+문장마다 긴 system prompt 를 다시 보내는 대신, 번호를 붙인 N개의 문장을 한 요청에 담고
+JSON 문자열 배열로 돌려받습니다. 응답이 JSON 이 아니거나 원소 개수가 맞지 않으면
+묶음을 반으로 나눠 다시 요청하고, 한 문장까지 나뉘면 기존 단건 번역 함수를 씁니다.
+API 호출 자체가 실패하면 (LLMError, llm_client 가 이미 재시도한 뒤) 나누지 않고 그 묶음 전체를 실패(None)로 둡니다.
+장애 중에 묶음 하나를 쪼개 수십 번 다시 요청하지 않기 위함입니다.
+
+환경 변수
+- TRANSLATE_PACK_SIZE : 한 요청에 넣을 문장 수 (기본 20, 1 이면 패킹 끔)
+"""
+import json
+import os
+import re
+
+from llm_client import LLMError
+
+PACK_SIZE = int(os.environ.get("TRANSLATE_PACK_SIZE", "20"))
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_packed_prompt(instruction, texts):
+    """instruction 아래에 번호 붙인 문장들과 출력 형식(JSON 배열) 지시를 붙입니다."""
+    numbered = "\n".join(f"[{i}] {' '.join(str(t).splitlines())}" for i, t in enumerate(texts, 1))
+    return (
+        f"{instruction}\n"
+        f"아래 번호가 붙은 {len(texts)}개의 문장을 각각 따로 번역해줘.\n"
+        f"결과는 다른 설명 없이 JSON 문자열 배열 하나로만 출력해. "
+        f"배열 길이는 반드시 {len(texts)}이고, i번째 원소는 [i]번 문장의 번역이어야 해.\n\n"
+        f"{numbered}"
+    )
+
+
+def parse_packed_response(text, expected):
+    """응답에서 JSON 배열을 꺼내 원소 개수를 확인합니다. 형식이 틀리면 None."""
+    if not text:
+        return None
+    body = _FENCE_RE.sub("", text.strip())
+    start, end = body.find("["), body.rfind("]")
+    if start < 0 or end <= start:
+        return None
+    try:
+        items = json.loads(body[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(items, list) or len(items) != expected:
+        return None
+    # 선택지 리스트 문자열을 번역한 경우 모델이 배열로 돌려줄 수 있으므로 원래 표기(str(list))로 맞춤
+    return [item if isinstance(item, str) else str(item) for item in items]
+
+
+def translate_packed(texts, translate_batch, translate_one, pack_size=PACK_SIZE, progress=None, on_error=None):
+    """texts 를 pack_size 개씩 묶어 번역하고 입력과 같은 순서의 리스트를 돌려줍니다.
+
+    translate_batch(chunk) 는 묶음 하나의 응답 텍스트를, translate_one(text) 는 단건 번역 결과를
+    돌려줍니다. 빈 문자열은 요청하지 않고 "" 로 둡니다. progress(n) 이 있으면 끝난 문장 수를 알립니다.
+    translate_batch 가 LLMError 를 던지면 그 묶음의 문장은 모두 None 이 되고, on_error(chunk, error) 가
+    있으면 한 번 알립니다 (dead-letter 기록 등).
+    """
+    results = [""] * len(texts)
+    pending = [i for i, t in enumerate(texts) if t and str(t).strip()]
+    if progress is not None and len(pending) < len(texts):
+        progress(len(texts) - len(pending))
+
+    def _run(indices):
+        if len(indices) == 1 or pack_size <= 1:
+            for i in indices:
+                results[i] = translate_one(texts[i])
+                if progress is not None:
+                    progress(1)
+            return
+        chunk = [texts[i] for i in indices]
+        try:
+            response = translate_batch(chunk)
+        except LLMError as e:
+            # 호출 실패는 나눠도 나아지지 않으므로 묶음 전체를 실패로 둠
+            for i in indices:
+                results[i] = None
+            if on_error is not None:
+                on_error(chunk, e)
+            if progress is not None:
+                progress(len(indices))
+            return
+        items = parse_packed_response(response, len(chunk))
+        if items is None:
+            # 형식이 틀리거나 개수가 안 맞으면 반으로 나눠 다시 요청
+            mid = len(indices) // 2
+            _run(indices[:mid])
+            _run(indices[mid:])
+            return
+        for i, item in zip(indices, items):
+            results[i] = item.strip()
+        if progress is not None:
+            progress(len(indices))
+
+    step = max(1, pack_size)
+    for start in range(0, len(pending), step):
+        _run(pending[start:start + step])
+    return results
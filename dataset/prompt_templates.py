@@ -0,0 +1,99 @@
+"""평가 스크립트가 함께 쓰는 미리 컴파일한 프롬프트 템플릿.
+
+행마다 f-string 으로 긴 프롬프트를 다시 만들고, 선택지는 literal_eval 후
+[f"({chr(65 + i)}) {choice}" ...] 로 다시 붙이던 것을
+
+- 템플릿은 만들 때 한 번만 (문자열 조각, 필드) 목록으로 파싱하고
+- 필드 변환 (선택지 라벨 붙이기 등) 은 같은 값이면 한 번만 계산하며 (lru_cache)
+- render_rows() 로 파일의 모든 행을 한 번에 렌더링합니다.
+
+렌더링 결과마다 저널/캐시 키로 쓰는 안정적인 해시 (row_journal.input_hash(*key_prefix, system, user)) 를 같이 돌려주므로,
+기존 저널의 키와 그대로 맞습니다. template.digest 는 템플릿 자체의 해시 (프롬프트 버전 기록용) 입니다.
+
+필드 이름을 표준 컬럼 이름 (question, mc1_choices, sentence1 ...) 으로 쓰면 dataset_manifest.columns_of() 결과를
+columns 로 그대로 넘길 수 있습니다.
+
+사용 예
+    TEMPLATE = PromptTemplate("Question: {question}\\nChoices:\\n{mc1_choices}", system=SYSTEM,
+                              filters={"mc1_choices": labeled_choices}, key_prefix=(MODEL_NAME,))
+    prompts = TEMPLATE.render_rows(rows, columns=columns_of(input_file))
+"""
+import ast
+import string
+from collections import namedtuple
+from functools import lru_cache
+
+from row_journal import input_hash
+
+Rendered = namedtuple("Rendered", "system user key error")
+
+_FORMATTER = string.Formatter()
+
+
+class PromptTemplate:
+    """system 은 고정 문자열, user 는 {필드} 자리표시자가 있는 템플릿 (str.format 문법, 형식 지정자는 쓰지 않음)."""
+
+    def __init__(self, user, system=None, filters=None, key_prefix=()):
+        self.user = user
+        self.system = system
+        self.key_prefix = tuple(key_prefix)
+        self.filters = {name: lru_cache(maxsize=None)(func) for name, func in (filters or {}).items()}
+        self._parts = []
+        for literal, field, spec, conversion in _FORMATTER.parse(user):
+            if spec or conversion:
+                raise ValueError(f"형식 지정자는 지원하지 않습니다: {{{field}!{conversion}:{spec}}}")
+            self._parts.append((literal, field))
+        self.fields = list(dict.fromkeys(field for _, field in self._parts if field is not None))
+        self.digest = input_hash("prompt-template", system, user)[:16]
+
+    def render_user(self, values):
+        """{필드: 값} → user 프롬프트 문자열."""
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                func = self.filters.get(field)
+                out.append(func(value) if func is not None else str(value))
+        return "".join(out)
+
+    def key(self, user, key_prefix=None):
+        """저널/캐시 키. system 이 없으면 (system 을 user 에 합친 템플릿) user 만 해시합니다."""
+        prefix = self.key_prefix if key_prefix is None else tuple(key_prefix)
+        parts = (*prefix, user) if self.system is None else (*prefix, self.system, user)
+        return input_hash(*parts)
+
+    def render(self, key_prefix=None, **values):
+        user = self.render_user(values)
+        return Rendered(self.system, user, self.key(user, key_prefix), None)
+
+    def render_row(self, row, columns=None, key_prefix=None):
+        """행 (dict / pandas Series) 하나를 렌더링합니다. columns 는 {필드: 실제 컬럼} (없으면 필드 이름 그대로)."""
+        columns = columns or {}
+        user = self.render_user({field: row[columns.get(field, field)] for field in self.fields})
+        return Rendered(self.system, user, self.key(user, key_prefix), None)
+
+    def render_rows(self, rows, columns=None, key_prefix=None):
+        """행 목록을 한 번에 렌더링합니다. 실패한 행은 user / key 가 None 이고 error 에 사유가 들어갑니다."""
+        rendered = []
+        for row in rows:
+            try:
+                rendered.append(self.render_row(row, columns, key_prefix))
+            except Exception as e:
+                rendered.append(Rendered(self.system, None, None, f"{type(e).__name__}: {e}"))
+        return rendered
+
+
+# ============================================================
+#   자주 쓰는 필드 변환
+# ============================================================
+
+@lru_cache(maxsize=None)
+def parse_choices(text):
+    """"['a', 'b']" 형태의 선택지 문자열 → 튜플 (같은 문자열은 한 번만 파싱)."""
+    return tuple(ast.literal_eval(text))
+
+
+def labeled_choices(text):
+    """선택지 문자열 → "(A) ...\\n(B) ..." (인덱스 0 이 A)."""
+    return "\n".join(f"({chr(65 + i)}) {choice}" for i, choice in enumerate(parse_choices(text)))
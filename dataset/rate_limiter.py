@@ -0,0 +1,239 @@
+"""고정 time.sleep 대신 쓰는 적응형 토큰 버킷 rate limiter.
+
+초당 rate 만큼 토큰이 채워지고 요청 하나가 토큰 하나를 씁니다.
+- 성공할 때마다 rate 를 조금씩 올리고 (additive increase)
+- 429 / RateLimitError 를 받으면 rate 를 절반으로 줄이고 Retry-After 만큼 멈춥니다 (multiplicative decrease).
+- provider 가 보내는 rate-limit 헤더(OpenAI x-ratelimit-*, Anthropic anthropic-ratelimit-*)가 있으면
+  분당 한도에 맞춰 최대 rate 를 정하고, 남은 요청이 거의 없으면 미리 속도를 줄입니다.
+
+스레드에서는 acquire(), asyncio 코드에서는 await acquire_async() 를 씁니다.
+여러 프로세스가 하나의 예산을 나눠 써야 하면 SharedRateLimiter 를 만들어 워커마다 set_shared_limiter() 로 등록합니다.
+
+환경 변수
+- LLM_RATE       : 시작 rate (초당 요청 수, 기본 1.0)
+- LLM_MAX_RATE   : 최대 rate (기본 20.0)
+
+스크립트에 설정한 분당 요청 수가 있으면 get_limiter(provider, model, max_rate=RPM / 60) 로 넘깁니다.
+그 값은 시작 rate 가 아니라 상한이라, AIMD 로 올라가거나 응답 헤더의 한도가 더 커도 넘지 않습니다.
+"""
+import asyncio
+import multiprocessing
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+DEFAULT_RATE = float(os.environ.get("LLM_RATE", "1.0"))
+DEFAULT_MAX_RATE = float(os.environ.get("LLM_MAX_RATE", "20.0"))
+
+
+class AdaptiveRateLimiter:
+    """AIMD 방식으로 속도를 조절하는 토큰 버킷."""
+
+    def __init__(self, rate=DEFAULT_RATE, max_rate=DEFAULT_MAX_RATE, min_rate=0.05,
+                 burst=None, increase=0.05, decrease=0.5):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.ceiling = None  # cap() 으로 정한 상한 (응답 헤더로도 넘지 않음)
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.rate_limited = 0
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    #   토큰 획득
+    # --------------------------------------------------------
+    def _clock(self):
+        return time.monotonic()
+
+    def _capacity(self):
+        return self.burst if self.burst is not None else max(1.0, self.rate)
+
+    def _try_take(self):
+        """토큰을 하나 가져오면 0, 아니면 기다려야 할 시간(초)을 돌려줍니다."""
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._tokens = min(self._capacity(), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    # --------------------------------------------------------
+    #   응답에 따른 속도 조절
+    # --------------------------------------------------------
+    def on_success(self, headers=None):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            if headers:
+                self._apply_headers(headers)
+
+    def on_rate_limited(self, retry_after=None, headers=None):
+        with self._lock:
+            self.rate_limited += 1
+            now = self._clock()
+            # 동시에 보낸 요청들이 한꺼번에 429 를 받아도 한 번만 줄임
+            if now - self._last_decrease >= 1.0:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, now + pause)
+            if headers:
+                self._apply_headers(headers)
+
+    def cap(self, max_rate):
+        """rate 가 max_rate 를 넘지 않도록 상한을 고정합니다 (여러 번 부르면 가장 낮은 값)."""
+        with self._lock:
+            self.ceiling = max_rate if self.ceiling is None else min(self.ceiling, max_rate)
+            self.max_rate = max(self.min_rate, min(self.max_rate, self.ceiling))
+            self.rate = min(self.rate, self.max_rate)
+
+    def _apply_headers(self, headers):
+        limit, remaining, reset = parse_rate_limit_headers(headers)
+        if limit:
+            # 분당 한도를 넘지 않도록 최대 rate 를 맞춤 (설정한 상한이 있으면 그보다 높이지 않음)
+            limit_rate = limit / 60.0 if self.ceiling is None else min(limit / 60.0, self.ceiling)
+            self.max_rate = max(self.min_rate, limit_rate)
+            self.rate = min(self.rate, self.max_rate)
+        if limit and remaining is not None and remaining <= max(1, limit * 0.05):
+            # 한도가 거의 소진됨: 리셋까지 남은 요청을 고르게 나눠 보냄
+            window = reset if reset else 60.0
+            self.rate = max(self.min_rate, min(self.rate, max(remaining, 1) / window))
+
+    def snapshot(self):
+        with self._lock:
+            return {"rate": self.rate, "max_rate": self.max_rate, "rate_limited": self.rate_limited}
+
+
+def _shared_field(index):
+    def _get(self):
+        return self._state[index]
+
+    def _set(self, value):
+        self._state[index] = value
+
+    return property(_get, _set)
+
+
+class SharedRateLimiter(AdaptiveRateLimiter):
+    """상태(rate, 토큰, 멈춤 시각)를 공유 메모리에 둔 AdaptiveRateLimiter.
+
+    부모 프로세스에서 만들어 Pool(initializer=...) 인자로 넘기면 모든 워커가 같은 토큰 버킷을 쓰므로,
+    한 워커가 429 를 받으면 전체 속도가 함께 줄어듭니다. 프로세스 사이에서 비교할 수 있도록
+    시각은 time.monotonic() 대신 time.time() 을 씁니다.
+    """
+
+    rate = _shared_field(0)
+    max_rate = _shared_field(1)
+    _tokens = _shared_field(2)
+    _updated = _shared_field(3)
+    _paused_until = _shared_field(4)
+    _last_decrease = _shared_field(5)
+    rate_limited = _shared_field(6)
+
+    def __init__(self, rate=DEFAULT_RATE, max_rate=DEFAULT_MAX_RATE, min_rate=0.05,
+                 burst=None, increase=0.05, decrease=0.5, context=None):
+        context = context or multiprocessing.get_context("spawn")
+        self._state = context.RawArray("d", 7)
+        super().__init__(rate=rate, max_rate=max_rate, min_rate=min_rate,
+                         burst=burst, increase=increase, decrease=decrease)
+        self._updated = self._clock()
+        self._lock = context.Lock()
+
+    def _clock(self):
+        return time.time()
+
+
+_DURATION_RE = re.compile(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?$")
+
+
+def _parse_reset(value):
+    """'1s', '6m0s', '20ms' (OpenAI) 또는 RFC3339 시각 (Anthropic) 을 남은 초로 바꿉니다."""
+    if not value:
+        return None
+    value = value.strip()
+    m = _DURATION_RE.match(value)
+    if m and any(m.groups()):
+        h, mi, s, ms = (float(g) if g else 0.0 for g in m.groups())
+        return h * 3600 + mi * 60 + s + ms / 1000
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+def parse_rate_limit_headers(headers):
+    """(분당 요청 한도, 남은 요청 수, 리셋까지 남은 초). 없는 값은 None."""
+    def _get(*names):
+        for name in names:
+            value = headers.get(name)
+            if value is not None:
+                return value
+        return None
+
+    def _int(value):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+    limit = _int(_get("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"))
+    remaining = _int(_get("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"))
+    reset = _parse_reset(_get("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset"))
+    return limit, remaining, reset
+
+
+_limiters = {}
+_shared = {}  # provider -> SharedRateLimiter (프로세스 간 공유 예산)
+_limiters_lock = threading.Lock()
+
+
+def set_shared_limiter(provider, limiter):
+    """이 프로세스에서 provider 의 모든 모델 호출이 limiter 를 쓰도록 등록합니다."""
+    with _limiters_lock:
+        _shared[provider] = limiter
+
+
+def get_limiter(provider, model=None, max_rate=None):
+    """(provider, model) 마다 하나의 limiter 를 공유합니다. 공유 예산이 등록돼 있으면 그것을 씁니다.
+
+    max_rate 를 주면 그 limiter 의 상한으로 고정합니다 (cap).
+    """
+    key = (provider, model)
+    with _limiters_lock:
+        if provider in _shared:
+            limiter = _shared[provider]
+        else:
+            if key not in _limiters:
+                rate = float(os.environ.get(f"LLM_RATE_{provider.upper()}", DEFAULT_RATE))
+                _limiters[key] = AdaptiveRateLimiter(rate=rate)
+            limiter = _limiters[key]
+    if max_rate is not None:
+        limiter.cap(max_rate)
+    return limiter
@@ -0,0 +1,197 @@
+"""번역/평가 스크립트가 함께 쓰는 LLM 응답 캐시 (SQLite).
+
+(provider, model, system prompt, user prompt, 샘플링 파라미터) 를 해시한 값을 키로
+응답 텍스트를 디스크에 저장합니다. 같은 요청을 다시 보내면 API 를 호출하지 않고
+저장된 응답을 돌려주므로, 크래시 후 재실행이나 재평가가 API 비용 없이 끝납니다.
+
+환경 변수
+- LLM_CACHE_PATH      : 캐시 파일 경로 (기본값: dataset/.llm_cache.sqlite)
+- LLM_CACHE_MAX_MB    : 캐시 최대 크기(MB). 넘으면 오래 안 쓴 항목부터 삭제 (기본값 512)
+- LLM_CACHE_DISABLE=1 : 캐시 끄기
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_cache.sqlite"),
+)
+DEFAULT_MAX_BYTES = int(float(os.environ.get("LLM_CACHE_MAX_MB", "512")) * 1024 * 1024)
+# 적중 시 마지막 사용 시각은 바로 쓰지 않고 모아 두었다가 이 개수마다 (그리고 put / close 때) 한 번에 씀.
+# 크래시로 몇 건을 잃어도 LRU 순서가 조금 틀어질 뿐임
+TOUCH_BATCH = 256
+
+
+def make_key(provider, model, system, user, **params):
+    """요청 내용을 정규화해 SHA-256 키를 만듭니다. 파라미터 순서는 키에 영향을 주지 않습니다."""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "system": system or "",
+            "user": user or "",
+            "params": {k: v for k, v in params.items() if v is not None},
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """크기 제한(LRU 삭제)과 hit/miss 카운터가 있는 SQLite 응답 캐시."""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " provider TEXT, model TEXT,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+        self._conn.commit()
+        self._touched = {}  # key -> 아직 쓰지 않은 마지막 사용 시각
+        # 전체 크기는 열 때 한 번만 세고 이후 put 마다 더함 (삭제할 때 다시 셈)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touched()
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key, response, provider=None, model=None):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, response, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, size, now, now),
+            )
+            self._touched.pop(key, None)
+            self._bytes += size - (old[0] if old else 0)
+            self._flush_touched()
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE responses SET accessed = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        # 다른 프로세스도 같은 파일에 쓰므로 지우기 전에 실제 크기를 다시 셈
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._bytes = total
+        if total <= self.max_bytes:
+            return
+        # 오래 사용하지 않은 항목부터 지워서 최대 크기의 90% 까지 줄임
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._bytes = total - freed
+
+    def cached_call(self, provider, model, system, user, call, **params):
+        """캐시에 있으면 저장된 응답을, 없으면 call() 결과를 저장하고 돌려줍니다.
+
+        call() 이 예외를 던지면 아무것도 저장하지 않으므로 오류 응답은 캐시되지 않습니다.
+        """
+        key = make_key(provider, model, system, user, **params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = call()
+        if response:
+            self.put(key, response, provider, model)
+        return response
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+class _NullCache:
+    """LLM_CACHE_DISABLE=1 일 때 쓰는 빈 캐시."""
+
+    hits = misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def put(self, key, response, provider=None, model=None):
+        pass
+
+    def cached_call(self, provider, model, system, user, call, **params):
+        self.misses += 1
+        return call()
+
+    def stats(self):
+        return {"hits": 0, "misses": self.misses, "entries": 0, "bytes": 0}
+
+    def close(self):
+        pass
+
+
+_cache = None
+_cache_pid = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """프로세스마다 하나의 캐시 인스턴스를 돌려줍니다 (multiprocessing 워커에서도 안전)."""
+    global _cache, _cache_pid
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            if os.environ.get("LLM_CACHE_DISABLE") == "1":
+                _cache = _NullCache()
+            else:
+                _cache = ResponseCache()
+            _cache_pid = os.getpid()
+        return _cache
+
+
+def print_stats(prefix="📦 응답 캐시"):
+    s = get_cache().stats()
+    print(f"{prefix}: hit {s['hits']} / miss {s['misses']} (저장 {s['entries']}건, {s['bytes'] / 1024:.0f} KB)")
@@ -0,0 +1,180 @@
+"""번역/평가 결과 CSV 전체를 하나의 파티션된 Parquet 데이터셋으로 저장하고 읽는 모듈.
+
+분석할 때마다 인코딩이 섞인 CSV 수십 개와 문자열로 저장된 리스트 ("[1, 0, 0, 0]", "['A','B']") 를
+다시 파싱하지 않도록, build 한 번으로 모든 파일을 열 기반 Parquet 으로 바꿔 둡니다.
+
+- 파티션 (hive 폴더) : dataset / region / translator / evaluator / eval_type
+- 컬럼 이름 통일     : question_Jeju, mc1_choice_jeonra ... → question, mc1_choices ...
+- 리스트 컬럼        : mc1/mc2_choices → list<string>, mc1/mc2_labels → list<int8>, ai_answer_mc2 → list<string>
+- 라벨 컬럼          : gold_label, ai_answer, result, mc1/mc2_result 등은 dictionary 인코딩
+
+load() 는 memory_map 으로 필요한 파티션 / 컬럼만 읽습니다.
+
+사용 예
+    python dataset/results_store.py build         # dataset/.results_parquet/ 다시 만들기
+    python dataset/results_store.py info          # 파티션별 행 수와 로드 시간
+"""
+import argparse
+import ast
+import glob
+import os
+import shutil
+import time
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from dataset_manifest import canonical_column, partition_of
+from scoring import read_results
+
+DATASET_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.path.join(DATASET_DIR, ".results_parquet")
+
+# 파티션 키는 dataset_manifest.partition_of 가 파일 경로에서 정함
+PARTITIONS = ["dataset", "region", "translator", "evaluator", "eval_type"]
+
+LIST_COLUMNS = {"mc1_choices": pa.string(), "mc2_choices": pa.string(), "ai_answer_mc2": pa.string(),
+                "mc1_labels": pa.int8(), "mc2_labels": pa.int8()}
+TEXT_COLUMNS = ["question", "sentence1", "sentence2"]
+LABEL_COLUMNS = ["gold_label", "ai_answer", "result", "ai_answer_mc1", "mc1_result", "mc2_result"]
+
+SCHEMA = pa.schema(
+    [("row", pa.int32())]
+    + [(name, pa.string()) for name in TEXT_COLUMNS]
+    + [(name, pa.list_(item)) for name, item in LIST_COLUMNS.items()]
+    + [(name, pa.dictionary(pa.int32(), pa.string())) for name in LABEL_COLUMNS]
+    + [("source_file", pa.dictionary(pa.int32(), pa.string()))]
+    + [(name, pa.string()) for name in PARTITIONS]
+)
+
+
+# ============================================================
+#   1. CSV → Arrow 테이블
+# ============================================================
+
+def parse_list(text, cache):
+    """"['a', 'b']" / "[1, 0]" 문자열을 리스트로 (같은 문자열은 cache 로 한 번만 파싱)."""
+    if not isinstance(text, str) or not text.strip():
+        return None
+    if text not in cache:
+        try:
+            value = ast.literal_eval(text)
+            cache[text] = list(value) if isinstance(value, (list, tuple)) else [value]
+        except (ValueError, SyntaxError):
+            cache[text] = [item.strip().strip("'\"") for item in text.strip("[]").split(",") if item.strip()]
+    return cache[text]
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _strings(df, name):
+    """컬럼을 문자열 리스트로 (없는 컬럼 / 빈 칸은 None)."""
+    if name not in df:
+        return [None] * len(df)
+    return [v if isinstance(v, str) else None for v in df[name]]
+
+
+def file_table(path, keys):
+    """CSV 하나를 통일된 SCHEMA 의 Arrow 테이블로 바꿉니다."""
+    df = read_results(path)
+    df = df[[c for c in df.columns if not c.lower().startswith("unnamed")]]
+    df.columns = [canonical_column(c) for c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()]
+    n = len(df)
+
+    columns = {"row": pa.array(range(n), pa.int32())}
+    for name in TEXT_COLUMNS:
+        columns[name] = pa.array(_strings(df, name), pa.string())
+    cache = {}
+    for name, item in LIST_COLUMNS.items():
+        values = [parse_list(v, cache) for v in _strings(df, name)]
+        if item == pa.int8():
+            values = [None if v is None else [_as_int(x) for x in v] for v in values]
+        else:
+            values = [None if v is None else [str(x) for x in v] for v in values]
+        columns[name] = pa.array(values, pa.list_(item))
+    for name in LABEL_COLUMNS:
+        columns[name] = pa.array(_strings(df, name), pa.string()).dictionary_encode()
+    columns["source_file"] = pa.array([os.path.relpath(path, DATASET_DIR)] * n, pa.string()).dictionary_encode()
+    for name in PARTITIONS:
+        columns[name] = pa.array([keys[name]] * n, pa.string())
+    return pa.table(columns, schema=SCHEMA)
+
+
+def scan(dataset_dir=DATASET_DIR):
+    """저장 대상 CSV {경로: 파티션 키}."""
+    files = {}
+    for path in sorted(glob.glob(os.path.join(dataset_dir, "*", "*_dataset", "*.csv"))):
+        keys = partition_of(path)
+        if keys is None:
+            print(f"⚠️ 파티션을 정할 수 없어 건너뜀: {os.path.relpath(path, dataset_dir)}")
+            continue
+        files[path] = keys
+    return files
+
+
+# ============================================================
+#   2. 저장 / 읽기
+# ============================================================
+
+def build(root=STORE_PATH, dataset_dir=DATASET_DIR):
+    """모든 CSV 를 읽어 root 에 hive 파티션 Parquet 데이터셋을 새로 씁니다. 쓴 행 수를 돌려줍니다."""
+    files = scan(dataset_dir)
+    tables = [file_table(path, keys) for path, keys in files.items()]
+    if not tables:
+        print("저장할 결과 파일이 없습니다.")
+        return 0
+    table = pa.concat_tables(tables).unify_dictionaries()
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    partitioning = ds.partitioning(pa.schema([(name, pa.string()) for name in PARTITIONS]), flavor="hive")
+    ds.write_dataset(table, root, format="parquet", partitioning=partitioning,
+                     basename_template="part-{i}.parquet", existing_data_behavior="overwrite_or_ignore")
+    print(f"✔ {len(files)}개 파일, {table.num_rows}행 → {root}")
+    return table.num_rows
+
+
+def load_table(root=STORE_PATH, columns=None, **filters):
+    """저장된 데이터셋을 Arrow 테이블로 읽습니다. filters 는 파티션 키 (예: dataset="mednli", region="jeju")."""
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"{root} 가 없습니다. 먼저 `python dataset/results_store.py build` 를 실행하세요.")
+    unknown = set(filters) - set(PARTITIONS)
+    if unknown:
+        raise ValueError(f"파티션 키가 아닌 필터: {sorted(unknown)} (가능: {PARTITIONS})")
+    expression = [(name, "==", value) for name, value in filters.items()] or None
+    return pq.read_table(root, columns=columns, filters=expression, partitioning="hive", memory_map=True)
+
+
+def load(root=STORE_PATH, columns=None, **filters):
+    """load_table() 결과를 pandas DataFrame 으로 (리스트 컬럼은 numpy 배열, 라벨은 category)."""
+    return load_table(root, columns, **filters).to_pandas()
+
+
+def info(root=STORE_PATH):
+    start = time.perf_counter()
+    table = load_table(root)
+    elapsed = time.perf_counter() - start
+    counts = table.group_by(PARTITIONS).aggregate([("row", "count")]).to_pandas()
+    print(counts.sort_values(PARTITIONS).to_string(index=False))
+    print(f"\n총 {table.num_rows}행, {table.nbytes / 1024 / 1024:.1f}MB (메모리), 로드 {elapsed * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="번역/평가 결과 CSV ↔ 파티션된 Parquet 데이터셋")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--root", default=STORE_PATH, help="Parquet 데이터셋 폴더")
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args.root)
+    else:
+        info(args.root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""평가 스크립트가 함께 쓰는 행 단위 저널 (append-only JSONL).
+
+출력 CSV 옆에 <출력파일>.journal.jsonl 을 두고, 한 행을 처리할 때마다
+(행 번호, 입력 해시, 모델 응답, 파싱한 라벨) 한 줄을 추가합니다.
+스크립트가 중간에 죽었다가 다시 실행되면
+
+- 입력 해시가 같은 성공 행은 저널의 라벨을 그대로 쓰고 (API 호출 없음)
+- 저널에 없거나 실패(ok=false)로 기록된 행만 다시 호출합니다.
+
+출력 CSV 는 매번 처음부터 같은 순서로 다시 쓰므로, 한 번에 끝까지 돈 것과
+바이트 단위로 같은 결과가 나옵니다.
+
+호출에 실패한 행은 fail() 로 기록하면 저널(ok=false)과 <출력파일>.deadletter.jsonl 에 함께 남고,
+나중에 성공하면 dead-letter 에서 해결된 것으로 표시됩니다 (dead_letter.py 참고).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from dead_letter import DeadLetter, dead_letter_path
+
+
+def input_hash(*parts):
+    """프롬프트 등 행의 입력을 해시합니다. 입력이 바뀐 행은 저널에 있어도 다시 평가합니다."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def journal_path(output_file):
+    return output_file + ".journal.jsonl"
+
+
+class RowJournal:
+    """행 번호 → 마지막 기록을 메모리에 들고, 새 기록은 파일 끝에 바로 추가합니다."""
+
+    def __init__(self, path, dead_letter=None):
+        self.path = path
+        self.resumed = 0
+        self.recorded = 0
+        self.dead_letter = DeadLetter(dead_letter) if dead_letter else None
+        self._entries = {}
+        self._lock = threading.Lock()
+        needs_newline = False
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            needs_newline = bool(data) and not data.endswith(b"\n")
+            for line in data.decode("utf-8", errors="replace").splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 크래시로 잘린 마지막 줄
+                self._entries[str(entry["row"])] = entry
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has(self, row_id, key):
+        """get() 과 같은 조건의 성공 기록이 있는지만 봅니다 (resumed 에 세지 않음, 작업 큐에 넣을 행 고르기용)."""
+        entry = self._entries.get(str(row_id))
+        return entry is not None and bool(entry.get("ok")) and entry.get("hash") == key
+
+    def get(self, row_id, key):
+        """입력 해시가 같은 성공 기록이 있으면 돌려주고, 없으면 None."""
+        entry = self._entries.get(str(row_id))
+        if entry is None or not entry.get("ok") or entry.get("hash") != key:
+            return None
+        self.resumed += 1
+        return entry
+
+    def record(self, row_id, key, response, label, ok=True):
+        """행 하나의 결과를 기록합니다. ok=False 인 행은 다음 실행에서 다시 호출됩니다."""
+        entry = {"row": str(row_id), "hash": key, "response": response, "label": label,
+                 "ok": ok, "time": time.time()}
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            previous = self._entries.get(entry["row"])
+            self._entries[entry["row"]] = entry
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+        if ok and previous is not None and not previous.get("ok") and self.dead_letter is not None:
+            self.dead_letter.resolve(row_id)
+
+    def fail(self, row_id, key, error, request=None):
+        """호출에 실패한 행을 저널 (ok=false) 과 dead-letter 에 기록합니다. request 는 dead_letter.request_of() 결과."""
+        self.record(row_id, key, None, None, ok=False)
+        if self.dead_letter is not None:
+            self.dead_letter.add(row_id, error, request, key)
+
+    def failed_rows(self):
+        return sorted((k for k, v in self._entries.items() if not v.get("ok")), key=_row_sort_key)
+
+    def summary(self):
+        text = f"📒 저널: 이어받음 {self.resumed}행 / 새로 기록 {self.recorded}행 ({self.path})"
+        dead = self.dead_letter.summary() if self.dead_letter is not None else None
+        return f"{text}\n{dead}" if dead else text
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        if self.dead_letter is not None:
+            self.dead_letter.close()
+
+
+def _row_sort_key(row_id):
+    return (0, int(row_id), "") if row_id.isdigit() else (1, 0, row_id)
+
+
+def open_journal(output_file):
+    return RowJournal(journal_path(output_file), dead_letter_path(output_file))
@@ -0,0 +1,101 @@
+"""여러 파일의 행을 하나의 작업 큐로 처리하는 multiprocessing 도우미 (Gemini 스크립트 공용).
+
+방언 파일마다 프로세스 하나를 두면 가장 긴 파일이 끝날 때까지 나머지 워커가 놀게 됩니다.
+여기서는 (작업, 행) 단위를 하나의 공유 큐에 넣고 비어 있는 워커가 다음 단위를 가져가므로
+(work stealing) 전체 시간이 "가장 긴 파일" 이 아니라 "전체 행 수 / 전체 QPS" 에 가까워집니다.
+
+- 워커는 spawn 으로 만들고, SDK 클라이언트는 워커마다 llm_client 가 처음 호출할 때 한 번만 만듭니다.
+- 호출 속도는 부모가 만든 SharedRateLimiter 하나를 모든 워커가 나눠 씁니다.
+- 결과는 끝난 순서대로 부모에게 돌아오며, in_order() 로 파일별 행 순서를 되찾아 바로 쓸 수 있습니다.
+- 워커에 넘겨 둔 단위는 최대 window 개라, units 에 생성기를 넘기면 입력을 다 읽어 두지 않고 흘려보냅니다.
+
+환경 변수
+- LLM_WORKERS : 워커 프로세스 수 (기본 4)
+"""
+import multiprocessing
+import os
+import queue
+from itertools import count
+
+from tqdm import tqdm
+
+from rate_limiter import SharedRateLimiter, set_shared_limiter
+
+WORKERS = int(os.environ.get("LLM_WORKERS", "4"))
+
+
+def shared_limiters(*providers):
+    """provider 별로 프로세스 간 공유 limiter 를 만듭니다 (시작 rate 는 LLM_RATE_<PROVIDER> / LLM_RATE)."""
+    limiters = {}
+    for provider in providers:
+        rate = os.environ.get(f"LLM_RATE_{provider.upper()}")
+        limiters[provider] = SharedRateLimiter(**({"rate": float(rate)} if rate else {}))
+    return limiters
+
+
+def _init_worker(limiters):
+    for provider, limiter in limiters.items():
+        set_shared_limiter(provider, limiter)
+
+
+def _run_unit(unit):
+    func, job, index, payload = unit
+    try:
+        return job, index, func(payload), None
+    except Exception as e:  # 한 행의 실패가 전체 큐를 멈추지 않도록 부모에게 넘김
+        return job, index, None, f"{type(e).__name__}: {e}"
+
+
+def run_units(func, units, processes=WORKERS, limiters=None, desc=None, total=None, window=None):
+    """[(job, index, payload), ...] 를 워커들이 하나씩 가져가 func(payload) 를 실행합니다.
+
+    func 는 워커에서 import 할 수 있는 모듈 최상위 함수여야 합니다.
+    끝난 순서대로 (job, index, 결과, 오류 메시지) 를 내보내며, 실패한 단위는 결과가 None 입니다.
+    units 는 리스트나 생성기이며, 생성기는 워커에 넘겨 둔 단위가 window 개 (기본 워커 수 × 4) 보다
+    적을 때만 다음 단위를 꺼냅니다. total 은 진행률 표시용 단위 수입니다 (생성기면 추정치).
+    """
+    if isinstance(units, (list, tuple)):
+        if not units:
+            return
+        total = len(units)
+        processes = min(processes, total)
+    processes = max(1, processes)
+    window = window or processes * 4
+    done = queue.Queue()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, initializer=_init_worker, initargs=(limiters or {},)) as pool, \
+         tqdm(total=total, desc=desc) as bar:
+        in_flight = 0
+        for job, index, payload in units:
+            pool.apply_async(_run_unit, ((func, job, index, payload),), callback=done.put,
+                             error_callback=lambda e, job=job, index=index:
+                             done.put((job, index, None, f"{type(e).__name__}: {e}")))
+            in_flight += 1
+            # 창이 찼으면 하나가 끝날 때까지 기다리고, 이미 끝난 결과는 바로 내보냄
+            while in_flight >= window or not done.empty():
+                in_flight -= 1
+                bar.update()
+                yield done.get()
+        while in_flight:
+            in_flight -= 1
+            bar.update()
+            yield done.get()
+
+
+def in_order(results, expected):
+    """run_units 결과를 job 별 index 순서로 다시 내보냅니다.
+
+    expected 는 {job: [index, ...]} 이며, 앞 단위가 끝나는 대로 이어진 단위들을 바로 내보내므로
+    출력 파일을 전체가 끝나기 전에 순서대로 써 나갈 수 있습니다.
+    index 목록 대신 None 을 주면 0, 1, 2, ... 순서로 봅니다 (단위 수를 미리 모르는 생성기 입력).
+    """
+    waiting = {job: {} for job in expected}
+    order = {job: iter(count() if indices is None else indices) for job, indices in expected.items()}
+    upcoming = {job: next(indices, None) for job, indices in order.items()}
+    for job, index, result, error in results:
+        waiting[job][index] = (result, error)
+        while upcoming[job] is not None and upcoming[job] in waiting[job]:
+            next_index = upcoming[job]
+            result, error = waiting[job].pop(next_index)
+            upcoming[job] = next(order[job], None)
+            yield job, next_index, result, error
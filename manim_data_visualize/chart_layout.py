@@ -0,0 +1,138 @@
+"""버블 / 레이더 / 산점도 차트의 배치와 스케일 계산 (manim 없이 쓸 수 있음).
+
+visualize_hallucination.py 의 씬과 preview.py 의 정적 미리보기가 같은 함수를 쓰므로
+미리보기에서 확인한 버블 크기, 레이더 꼭짓점, 산점도 좌표가 영상과 그대로 맞습니다.
+좌표는 manim 의 장면 좌표 (가운데가 원점, 세로 8 단위, y 가 위쪽) 입니다.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from results_model import min_span, model_index
+
+ORIGIN = np.array((0.0, 0.0, 0.0))
+UP = np.array((0.0, 1.0, 0.0))
+DOWN = -UP
+RIGHT = np.array((1.0, 0.0, 0.0))
+LEFT = -RIGHT
+
+FRAME_HEIGHT = 8.0
+FRAME_WIDTH = FRAME_HEIGHT * 16 / 9
+
+# Province coordinates
+PROVINCE_POSITIONS = {
+    "표준": UP * 1.2 + LEFT * 0.5,
+    "충청도": UP * 0.2 + LEFT * 0.5,
+    "경상도": DOWN * 0.8 + RIGHT * 0.8,
+    "전라도": DOWN * 1.2 + LEFT * 0.8,
+    "제주도": DOWN * 2.5 + LEFT * 0.5,
+}
+
+MAP_HEIGHT = 6
+
+# ============================================================
+#   버블 맵
+# ============================================================
+
+BUBBLE_REGIONS = ("표준", "충청도", "전라도", "경상도", "제주도")
+
+Bubble = namedtuple("Bubble", "region value radius position")
+
+
+def bubble_radius(value, lo, span):
+    """Min-Max 스케일링: [lo, lo + span] → 반지름 [0.4, 0.95] (차이가 작아도 크기 대비가 보이도록)."""
+    return 0.4 + (value - lo) / span * 0.55
+
+
+def bubbles(table, regions=BUBBLE_REGIONS):
+    """지역별 모델 평균으로 버블 (값이 없는 지역은 건너뜀)."""
+    out = []
+    for region in regions:
+        value = table.region_mean(region)
+        if np.isnan(value):
+            continue
+        out.append(Bubble(region, value, bubble_radius(value, table.mean_lo, table.mean_span),
+                          PROVINCE_POSITIONS[region]))
+    return out
+
+
+# ============================================================
+#   레이더 차트
+# ============================================================
+
+RADAR_REGIONS = ("표준", "충청도", "제주도", "전라도", "경상도")
+RADAR_MODELS = ("GPT 5.1", "Claude 4.5 sonnet", "Gemini 3")
+RADAR_RADIUS = 3.0
+RADAR_CENTER = DOWN * 0.5
+RADAR_GRID = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def radar_angles(n=len(RADAR_REGIONS)):
+    """축 각도 (라디안): 위쪽에서 시작해 시계 방향."""
+    return np.radians(np.linspace(90, 90 - 360, n, endpoint=False))
+
+
+def radar_point(fraction, angle, radius=RADAR_RADIUS, center=RADAR_CENTER):
+    return center + np.array([np.cos(angle), np.sin(angle), 0]) * radius * fraction
+
+
+# 겹치지 않도록 수동으로 옮긴 축 이름
+RADAR_LABEL_NUDGE = {"충청도": RIGHT * 0.25, "경상도": LEFT * 0.25}
+
+
+def radar_label_position(region, angle):
+    return radar_point(1.0, angle) * 1.1 + RADAR_LABEL_NUDGE.get(region, ORIGIN)
+
+
+def radar_polygon(table, model, regions=RADAR_REGIONS):
+    """모델 하나의 꼭짓점. 전체 최솟값이 중심, 최댓값이 바깥 테두리 (Min-Max)."""
+    return [radar_point((table.value(region, model) - table.lo) / table.span, angle)
+            for region, angle in zip(regions, radar_angles(len(regions)))]
+
+
+def radar_grid_values(table):
+    """격자 눈금 값: 중심 (최솟값) 과 RADAR_GRID 의 각 비율."""
+    return [table.lo] + [table.lo + table.span * r for r in RADAR_GRID]
+
+
+# ============================================================
+#   산점도 (Capability vs Attitude)
+# ============================================================
+
+# 지역 순서와 개념적 오프셋 (y = x + 총 문항 수 × offset_factor)
+SCATTER_REGIONS = (
+    {"name": "표준", "label": "표준어", "offset_factor": 0.05},
+    {"name": "충청도", "label": "충청도", "offset_factor": -0.05},
+    {"name": "전라도", "label": "전라도", "offset_factor": -0.08},
+    {"name": "경상도", "label": "경상도", "offset_factor": -0.10},
+    {"name": "제주도", "label": "제주도", "offset_factor": -0.20},
+)
+
+ScatterLayout = namedtuple("ScatterLayout", "x y x_min x_span y_min y_span")
+
+
+def scatter_layout(table, total, regions=SCATTER_REGIONS):
+    """지역 × 모델 점을 데이터 범위로 Min-Max 정규화한 좌표 ([0, 1]). 값이 없는 점은 (0, 0)."""
+    xs = np.array([table.row(r["name"]) for r in regions])
+    offsets = np.array([[r["offset_factor"]] for r in regions])
+    ys = xs + total * offsets
+    x_min, x_span = min_span(xs)
+    y_min, y_span = min_span(ys)
+    missing = np.isnan(xs)
+    x = np.where(missing, 0.0, (xs - x_min) / x_span)
+    y = np.where(missing, 0.0, (ys - y_min) / y_span)
+    return ScatterLayout(x, y, x_min, x_span, y_min, y_span)
+
+
+def scatter_point(layout, region_index, model):
+    j = model_index(model)
+    return float(layout.x[region_index, j]), float(layout.y[region_index, j])
+
+
+SCATTER_TICKS = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def scatter_tick_values(layout):
+    """축 눈금 (정규화 값 → 원래 값)."""
+    return ([layout.x_min + layout.x_span * t for t in SCATTER_TICKS],
+            [layout.y_min + layout.y_span * t for t in SCATTER_TICKS])
@@ -0,0 +1,302 @@
+"""버블 맵 / 레이더 차트 / 산점도의 정적 미리보기 (manim 없이 matplotlib 로 PNG / SVG).
+
+CSV 숫자나 배치를 고친 뒤 결과를 보려고 manim 으로 씬을 렌더링하면 씬마다 수십 초가 걸립니다.
+이 스크립트는 같은 차트의 마지막 장면을 그림 한 장으로 그립니다 (차트당 1초 안쪽).
+
+- 데이터는 씬과 같은 results_model, 버블 크기 / 레이더 꼭짓점 / 산점도 좌표는 chart_layout 의
+  함수를 그대로 쓰므로 씬과 값이 어긋나지 않습니다.
+- 좌표계도 manim 장면 좌표 (16:9, 세로 8 단위) 를 그대로 써서 배치가 영상과 같습니다.
+- 지도는 south_korea.svg (potrace 경로) 를 직접 읽어 그립니다 (cairo / manim 필요 없음).
+
+애니메이션, 폰트 렌더링 방식, 글자 위치의 세부 (next_to 등) 는 영상과 조금 다를 수 있습니다.
+
+사용 예 (manim_data_visualize 폴더에서)
+    python preview.py                              # 차트 6개 → media/preview/*.png
+    python preview.py --format svg
+    python preview.py --charts radar --datasets MedNLI
+"""
+import argparse
+import os
+import re
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib import font_manager
+from matplotlib.patches import Circle, PathPatch, Polygon
+from matplotlib.path import Path
+
+from chart_layout import (
+    FRAME_HEIGHT, FRAME_WIDTH, MAP_HEIGHT, RADAR_CENTER, RADAR_GRID, RADAR_MODELS, RADAR_RADIUS, RADAR_REGIONS,
+    SCATTER_REGIONS, SCATTER_TICKS, bubbles, radar_angles, radar_grid_values, radar_label_position, radar_point,
+    radar_polygon, scatter_layout, scatter_point, scatter_tick_values,
+)
+from results_model import DATASETS, MODELS, SOURCES, TOTALS, get_results
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(HERE, "media", "preview")
+FONT_FILE = os.path.join(HERE, "NanumMyeongjo-Regular.ttf")
+MAP_FILE = os.path.join(HERE, "south_korea.svg")
+
+CHARTS = ("bubble", "radar", "scatter")
+
+# 720p 영상과 같은 크기 (1 장면 단위 = 90px)
+DPI = 100
+PIXEL_WIDTH, PIXEL_HEIGHT = 1280, 720
+UNIT_PX = PIXEL_HEIGHT / FRAME_HEIGHT
+
+# manim 기본 색 (manim.utils.color)
+WHITE = "#FFFFFF"
+GRAY = "#888888"
+GRAY_A = "#DDDDDD"
+GREEN = "#83C167"
+ORANGE = "#FF862F"
+BLUE = "#58C4DD"
+RED = "#FC6255"
+YELLOW = "#FFFF00"
+TEAL = "#5CD0B3"
+
+BUBBLE_COLORS = {"TruthfulQA": RED, "MedNLI": BLUE}
+MODEL_COLORS = [GREEN, ORANGE, BLUE]
+REGION_COLORS = [WHITE, YELLOW, TEAL, ORANGE, RED]
+
+# 산점도 축: Axes(x_range=[0, 1.05], x_length=6.0) 를 LEFT * 0.5 로 옮긴 것과 같은 배치
+SCATTER_AXIS_RANGE = 1.05
+SCATTER_AXIS_LENGTH = 6.0
+SCATTER_ORIGIN = np.array([-0.5 - SCATTER_AXIS_LENGTH / 2, -SCATTER_AXIS_LENGTH / 2])
+
+
+def _font():
+    """폰트 파일을 matplotlib 에 한 번 등록하고 FontProperties 를 돌려줍니다 (없으면 기본 폰트)."""
+    if os.path.exists(FONT_FILE):
+        font_manager.fontManager.addfont(FONT_FILE)
+        return font_manager.FontProperties(fname=FONT_FILE)
+    print(f"⚠️ 폰트 파일이 없어 기본 폰트를 씁니다: {FONT_FILE}")
+    return font_manager.FontProperties()
+
+
+FONT = _font()
+
+
+def _pt(font_size):
+    """manim Text 의 font_size → matplotlib 포인트 (font_size 48 ≈ 0.5 장면 단위)."""
+    return font_size / 48 * 0.5 * UNIT_PX * 72 / DPI
+
+
+def _text(ax, pos, s, font_size, color=WHITE, **kwargs):
+    kwargs.setdefault("ha", "center")
+    kwargs.setdefault("va", "center")
+    ax.text(pos[0], pos[1], s, fontproperties=FONT, fontsize=_pt(font_size), color=color,
+            linespacing=1.2, **kwargs)
+
+
+def _title(ax, s, font_size):
+    # to_edge(UP): 위쪽 가장자리에서 0.5 단위 안쪽
+    _text(ax, (0, FRAME_HEIGHT / 2 - 0.5), s, font_size, va="top")
+
+
+def _corner_text(ax, s, font_size, shift_x=0.5):
+    # to_corner(DL).shift(UP * 0.5 + RIGHT * shift_x)
+    _text(ax, (-FRAME_WIDTH / 2 + 0.5 + shift_x, -FRAME_HEIGHT / 2 + 1.0), s, font_size,
+          color=GRAY_A, ha="left", va="bottom")
+
+
+def _figure():
+    fig = plt.figure(figsize=(PIXEL_WIDTH / DPI, PIXEL_HEIGHT / DPI), dpi=DPI, facecolor="black")
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_facecolor("black")
+    ax.set_xlim(-FRAME_WIDTH / 2, FRAME_WIDTH / 2)
+    ax.set_ylim(-FRAME_HEIGHT / 2, FRAME_HEIGHT / 2)
+    ax.set_aspect("equal")
+    ax.axis("off")
+    return fig, ax
+
+
+# ============================================================
+#   지도 (potrace SVG)
+# ============================================================
+
+_TOKEN = re.compile(r"[MmLlCcZz]|-?\d*\.?\d+(?:[eE][-+]?\d+)?")
+
+
+def _parse_path(d):
+    """potrace 가 쓰는 M / L / C / Z (상대 좌표 포함) 만 해석해 (정점, 코드) 를 돌려줍니다."""
+    vertices, codes = [], []
+    pos = start = np.zeros(2)
+    cmd = None
+    tokens = _TOKEN.findall(d)
+    i = 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+            if cmd in "Zz":
+                vertices.append(start)
+                codes.append(Path.CLOSEPOLY)
+                pos = start
+                continue
+        n = 6 if cmd in "Cc" else 2
+        nums = np.array(tokens[i:i + n], dtype=float).reshape(-1, 2)
+        i += n
+        points = nums + pos if cmd.islower() else nums
+        if cmd in "Mm":
+            start = points[0]
+            codes.append(Path.MOVETO)
+            cmd = "l" if cmd == "m" else "L"  # M 뒤에 이어지는 좌표는 L
+        elif cmd in "Ll":
+            codes.append(Path.LINETO)
+        else:
+            codes.extend([Path.CURVE4] * 3)
+        vertices.extend(points)
+        pos = points[-1]
+    return vertices, codes
+
+
+def map_path():
+    """south_korea.svg 를 SVGMobject 처럼 가운데 (ORIGIN) 에 높이 MAP_HEIGHT 로 맞춘 Path 하나로."""
+    with open(MAP_FILE, encoding="utf-8") as f:
+        svg = f.read()
+    vertices, codes = [], []
+    for d in re.findall(r'<path[^>]*\sd="([^"]+)"', svg):
+        v, c = _parse_path(d)
+        vertices.extend(v)
+        codes.extend(c)
+    # potrace 는 scale(0.1, -0.1) 로 y 를 뒤집으므로 원래 좌표가 이미 y 가 위쪽
+    vertices = np.array(vertices)
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    vertices = (vertices - (lo + hi) / 2) * (MAP_HEIGHT / (hi - lo)[1])
+    return Path(vertices, codes)
+
+
+# ============================================================
+#   차트
+# ============================================================
+
+def draw_bubble(ax, dataset):
+    """BubbleMapScene 의 마지막 장면: 지도 + 지역별 버블 + 값."""
+    table = get_results().table(dataset, "hallucination")
+    color = BUBBLE_COLORS[dataset]
+
+    ax.add_patch(PathPatch(map_path(), facecolor="#222222", edgecolor=GRAY, linewidth=1))
+    _title(ax, f"{dataset} Hallucination Bubble Chart", 36)
+    _text(ax, (-FRAME_WIDTH / 2 + 1.0, 0.5),
+          f"{TOTALS[dataset]}개 문제 중\n정답(+1) + 모름(0) + 오답(-1)\n점수 합산\n(총점 - 점수 = 환각 수)",
+          24, color=GRAY_A, ha="left")
+    _corner_text(ax, "Bubble Size Scaled by Min-Max", 16)
+
+    for region, value, radius, pos in bubbles(table):
+        ax.add_patch(Circle(pos[:2], radius, facecolor=color, edgecolor=color, alpha=0.4, linewidth=0))
+        ax.add_patch(Circle(pos[:2], radius, fill=False, edgecolor=color, linewidth=4))
+        _text(ax, pos, f"{region}\n{value:.0f}", 20)
+
+
+def draw_radar(ax, dataset):
+    """RadarChartScene 의 마지막 장면: 격자 + 축 + 모델별 다각형 + 범례."""
+    table = get_results().table(dataset, "hallucination")
+    angles = radar_angles(len(RADAR_REGIONS))
+    center = RADAR_CENTER
+
+    for r in RADAR_GRID:
+        web = [radar_point(r, a)[:2] for a in angles]
+        ax.add_patch(Polygon(web, closed=True, fill=False, edgecolor=GRAY, alpha=0.5, linewidth=2))
+    for region, angle in zip(RADAR_REGIONS, angles):
+        end = radar_point(1.0, angle)
+        ax.plot([center[0], end[0]], [center[1], end[1]], color=GRAY, linewidth=2)
+        _text(ax, radar_label_position(region, angle), region, 24)
+
+    center_val, *ring_vals = radar_grid_values(table)
+    box = dict(boxstyle="square,pad=0.1", facecolor="black", edgecolor="none", alpha=0.6)
+    _text(ax, center + np.array([-0.2, -0.2, 0]), f"{int(center_val)}", 16, color=GRAY, bbox=box)
+    for r, val in zip(RADAR_GRID, ring_vals):
+        _text(ax, center + np.array([0.2, RADAR_RADIUS * r, 0]), f"{int(val)}", 16, color=GRAY, bbox=box)
+
+    _title(ax, f"{dataset} Hallucination Radar Chart", 36)
+    _corner_text(ax, f"Min-Max Scaled\nCenter: {int(table.lo)} (Min)\nEdge: {int(table.hi)} (Max)", 16)
+
+    for i, (model, color) in enumerate(zip(RADAR_MODELS, MODEL_COLORS)):
+        points = [p[:2] for p in radar_polygon(table, model)]
+        ax.add_patch(Polygon(points, closed=True, fill=False, edgecolor=color, linewidth=4))
+        y = 1.0 - i * 0.5
+        ax.add_patch(Circle((-6.0, y), 0.08, color=color))
+        _text(ax, (-5.8, y), model, 20, color=color, ha="left")
+
+
+def _c2p(x, y):
+    return SCATTER_ORIGIN + np.array([x, y]) * (SCATTER_AXIS_LENGTH / SCATTER_AXIS_RANGE)
+
+
+def draw_scatter(ax, dataset):
+    """ScatterScene 의 마지막 장면: 구간 + 지역별 평균 점 (모델별 점은 흐리게 함께)."""
+    table = get_results().table(dataset, "accuracy")
+    layout = scatter_layout(table, TOTALS[dataset])
+
+    ax.add_patch(Polygon([_c2p(0, 0), _c2p(0, 1), _c2p(1, 1)], facecolor=GREEN, alpha=0.1, linewidth=0))
+    ax.add_patch(Polygon([_c2p(0, 0), _c2p(1, 0), _c2p(1, 1)], facecolor=RED, alpha=0.1, linewidth=0))
+    ax.plot(*zip(_c2p(0, 0), _c2p(1, 1)), color=GRAY, linestyle=(0, (4, 4)), linewidth=2)
+    for end in (_c2p(SCATTER_AXIS_RANGE, 0), _c2p(0, SCATTER_AXIS_RANGE)):
+        ax.annotate("", xy=end, xytext=_c2p(0, 0),
+                    arrowprops=dict(arrowstyle="-|>", color=WHITE, linewidth=2, mutation_scale=15))
+
+    for t, val_x, val_y in zip(SCATTER_TICKS, *scatter_tick_values(layout)):
+        _text(ax, _c2p(t, 0) + (0, -0.3), f"{int(val_x)}", 14, color=GRAY, va="top")
+        _text(ax, _c2p(0, t) + (-0.3, 0), f"{int(val_y)}", 14, color=GRAY, ha="right")
+
+    _text(ax, _c2p(0.5, 0) + (0, -0.8), "Accuracy Score (정확도)", 18, va="top")
+    _text(ax, _c2p(0, 0.5) + (-1.2, 0), "Hallucination Score (신뢰성)", 18, rotation=90, ha="right")
+    _text(ax, _c2p(0.25, 0.75), "신뢰 구간\n(높은 신뢰도)", 16, color=GREEN)
+    _text(ax, _c2p(0.75, 0.25), "과신 구간\n(낮은 신뢰도)", 16, color=RED)
+    _title(ax, f"{dataset} Capability vs Attitude", 32)
+    _text(ax, (0, FRAME_HEIGHT / 2 - 1.5), "지역별 평균", 24, va="top")
+    _corner_text(ax, "데이터 범위 기반\nMin-Max 스케일링", 16, shift_x=0.2)
+
+    legend_x, legend_y = _c2p(SCATTER_AXIS_RANGE, 0)[0] + 0.8, 1.0
+    for i, (region, color) in enumerate(zip(SCATTER_REGIONS, REGION_COLORS)):
+        points = np.array([_c2p(*scatter_point(layout, i, model)) for model in MODELS])
+        for point, model_color in zip(points, MODEL_COLORS):
+            ax.add_patch(Circle(point, 0.08, color=model_color, alpha=0.35))
+        ax.add_patch(Circle(points.mean(axis=0), 0.15, color=color))
+        y = legend_y - i * 0.45
+        ax.add_patch(Circle((legend_x, y), 0.08, color=color))
+        _text(ax, (legend_x + 0.2, y), region["name"], 18, ha="left")
+
+
+DRAW = {"bubble": draw_bubble, "radar": draw_radar, "scatter": draw_scatter}
+
+
+def render(chart, dataset, fmt="png", output_dir=OUTPUT_DIR):
+    fig, ax = _figure()
+    try:
+        DRAW[chart](ax, dataset)
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{dataset}_{chart}.{fmt}")
+        fig.savefig(path, dpi=DPI, facecolor=fig.get_facecolor())
+    finally:
+        plt.close(fig)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="버블 / 레이더 / 산점도 정적 미리보기 (matplotlib)")
+    parser.add_argument("--charts", nargs="+", choices=CHARTS, default=list(CHARTS), help="그릴 차트 (기본: 모두)")
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=list(DATASETS),
+                        help="데이터셋 (기본: 모두)")
+    parser.add_argument("--format", choices=["png", "svg"], default="png", help="출력 형식 (기본 png)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="출력 폴더 (기본 media/preview)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    get_results()  # CSV 읽기는 한 번만 (차트별 시간에서 빼고 따로 표시)
+    print(f"📄 결과 CSV {len(SOURCES)}개 읽기: {time.perf_counter() - start:.2f}s")
+    for dataset in args.datasets:
+        for chart in args.charts:
+            t0 = time.perf_counter()
+            path = render(chart, dataset, args.format, args.output_dir)
+            print(f"  🖼️ {os.path.relpath(path, HERE)}: {time.perf_counter() - t0:.2f}s")
+    print(f"🎉 완료 ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""FullPresentation 을 씬별로 병렬 렌더링한 뒤 ffmpeg 로 이어 붙입니다.
+
+`manim -qh visualize_hallucination.py FullPresentation` 은 버블 / 레이더 / 산점도 씬 6개를 한 프로세스에서
+차례로 그리므로 코어 하나만 씁니다. 각 씬은 서로 독립적이라 (앞 씬의 객체는 FadeOut 으로 모두 지워짐)
+
+- PRESENTATION_SCENES 의 씬을 워커 프로세스마다 하나씩 렌더링하고 (씬 뒤의 SEGMENT_PAUSE 정지까지 포함)
+- 끝난 구간들을 ffmpeg concat 으로 재인코딩 없이 (-c copy) 이어 붙여
+
+manim 으로 FullPresentation 을 렌더링한 것과 같은 경로에 FullPresentation.mp4 를 만듭니다.
+전체 렌더링 시간은 가장 긴 씬 하나 + 이어 붙이기 정도로 줄어듭니다 (코어가 씬 수보다 적으면 그만큼 늘어남).
+
+렌더링한 구간은 media/render_cache/<키>.mp4 에 보관합니다. 키는 씬의 입력 전체의 해시라
+(씬 클래스와 부모 클래스의 소스, 모듈의 나머지 소스 (상수 / 폰트 등록), results_model 등 불러 쓰는 모듈의 소스, 씬 소스가 가리키는 파일
+(csv_data/*.csv, south_korea.svg, 폰트) 의 내용, 품질, manim 버전) CSV 숫자 하나를 고치면 그 CSV 를 읽는 씬만 다시 렌더링하고
+나머지는 캐시에서 그대로 이어 붙입니다. manim 의 partial_movie_files 캐시는 CSV 를 모르므로 쓰지 않고,
+구간을 캐시에 넣은 뒤 지웁니다. 캐시가 RENDER_CACHE_MAX_MB (기본 512) 를 넘으면 오래 안 쓴 구간부터 지웁니다.
+
+사용 예 (manim_data_visualize 폴더에서)
+    python render_presentation.py                 # -qh, 워커 = 코어 수
+    python render_presentation.py -q l -j 3       # 빠른 미리보기
+    python render_presentation.py --scenes Scene3_TruthfulQA_Radar Scene4_MedNLI_Radar
+    python render_presentation.py --no-cache      # 캐시를 무시하고 모두 다시 렌더링
+"""
+import argparse
+import ast
+import hashlib
+import inspect
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCENE_FILE = "visualize_hallucination.py"
+OUTPUT_NAME = "FullPresentation"
+CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", os.path.join(HERE, "media", "render_cache"))
+CACHE_MAX_MB = float(os.environ.get("RENDER_CACHE_MAX_MB", "512"))
+
+# manim CLI 의 -q 플래그 → config.quality
+QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+
+def _resolution_dir(quality):
+    """manim 이 동영상을 쓰는 폴더 이름 (1080p60 등)."""
+    from manim import constants
+
+    q = constants.QUALITIES[QUALITIES[quality]]
+    return f"{q['pixel_height']}p{q['frame_rate']}"
+
+
+def render_segment(scene_name, quality):
+    """워커에서 실행: 씬 하나 + 씬 사이 정지를 렌더링하고 (씬 이름, 동영상 경로, 걸린 시간) 을 돌려줍니다."""
+    os.chdir(HERE)  # 씬이 csv_data/, south_korea.svg, 폰트를 상대 경로로 읽음
+    sys.path.insert(0, HERE)
+    from manim import tempconfig
+    import visualize_hallucination as vh
+
+    scene_cls = getattr(vh, scene_name)
+
+    # FullPresentation 과 같은 구간: 씬 내용 뒤에 SEGMENT_PAUSE 만큼 정지
+    class Segment(scene_cls):
+        def construct(self):
+            scene_cls.construct(self)
+            self.wait(vh.SEGMENT_PAUSE)
+
+    Segment.__name__ = Segment.__qualname__ = scene_name  # partial_movie_files/<씬 이름> 을 씬마다 따로 씀
+
+    start = time.perf_counter()
+    with tempconfig({"quality": QUALITIES[quality], "input_file": os.path.join(HERE, SCENE_FILE),
+                     "output_file": f"{scene_name}_segment", "progress_bar": "none"}):
+        scene = Segment()
+        scene.render()
+        path = str(scene.renderer.file_writer.movie_file_path)
+    return scene_name, path, time.perf_counter() - start
+
+
+# ============================================================
+#   구간 캐시
+# ============================================================
+
+def _file_hash(path, _memo={}):
+    if path not in _memo:
+        with open(path, "rb") as f:
+            _memo[path] = hashlib.sha256(f.read()).hexdigest()
+    return _memo[path]
+
+
+def _referenced_files(source):
+    """소스의 문자열 상수 중 이 폴더의 실제 파일을 가리키는 것 (csv_data/..., south_korea.svg, 폰트 파일)."""
+    files = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and "\n" not in node.value:
+            if os.path.isfile(os.path.join(HERE, node.value)):
+                files.add(node.value)
+    return sorted(files)
+
+
+def _module_source_without_classes(module):
+    """클래스 정의를 뺀 모듈 소스 (import, 상수, 데이터 로딩 함수, 폰트 등록). 바뀌면 모든 씬이 다시 렌더링됩니다."""
+    source = inspect.getsource(module)
+    tree = ast.parse(source)
+    return "\n".join(ast.get_source_segment(source, node) for node in tree.body
+                     if not isinstance(node, ast.ClassDef))
+
+
+def _local_module_sources(module):
+    """씬 모듈이 불러 쓰는 이 폴더의 다른 모듈 (results_model 등) 의 소스.
+
+    이 소스가 가리키는 CSV 는 키에 넣지 않습니다. 씬은 자기가 읽는 CSV 경로를 소스에 적고 있으므로
+    그 파일만 씬의 키에 들어가고, 다른 CSV 를 고쳐도 이 씬은 다시 렌더링되지 않습니다.
+    """
+    sources = {}
+    for value in vars(module).values():
+        owner = inspect.getmodule(value)
+        path = getattr(owner, "__file__", None)
+        if owner is not module and path and os.path.dirname(os.path.abspath(path)) == HERE:
+            sources[owner.__name__] = inspect.getsource(owner)
+    return [sources[name] for name in sorted(sources)]
+
+
+def segment_key(module, scene_name, quality):
+    """씬 하나의 렌더링 결과를 결정하는 입력 전체의 해시."""
+    import manim
+
+    scene_cls = getattr(module, scene_name)
+    sources = [_module_source_without_classes(module)]
+    sources += [inspect.getsource(cls) for cls in scene_cls.__mro__ if cls.__module__ == module.__name__]
+    h = hashlib.sha256()
+    for part in ("render-segment-v1", manim.__version__, QUALITIES[quality], scene_name, *sources,
+                 *_local_module_sources(module)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    for name in sorted({f for src in sources for f in _referenced_files(src)}):
+        h.update(f"{name}={_file_hash(os.path.join(HERE, name))}".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.mp4")
+
+
+def cache_get(key):
+    path = _cache_path(key)
+    if not os.path.isfile(path):
+        return None
+    os.utime(path)  # 최근 사용 표시 (LRU)
+    return path
+
+
+def cache_put(key, segment_path):
+    """렌더링한 구간을 캐시로 옮기고, 같은 씬의 partial_movie_files 를 지웁니다."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(key)
+    shutil.move(segment_path, path)
+    scene_name = os.path.basename(segment_path)[:-len("_segment.mp4")]
+    shutil.rmtree(os.path.join(os.path.dirname(segment_path), "partial_movie_files", scene_name), ignore_errors=True)
+    return path
+
+
+def evict(keep=(), max_mb=CACHE_MAX_MB):
+    """캐시가 max_mb 를 넘으면 오래 안 쓴 구간부터 지웁니다 (이번 실행에 쓴 구간은 남김). 지운 파일 수를 돌려줍니다."""
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    keep = {_cache_path(key) for key in keep}
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name.endswith(".mp4") and os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_mb * 1024 * 1024:
+            break
+        if path in keep:
+            continue
+        os.remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+# ============================================================
+#   이어 붙이기
+# ============================================================
+
+def concat(paths, output_path):
+    """같은 설정으로 인코딩된 구간들을 재인코딩 없이 이어 붙입니다."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg 를 찾을 수 없습니다. 구간 동영상은 렌더링됐으니 ffmpeg 설치 후 다시 실행하세요.")
+    list_path = output_path + ".segments.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in paths:
+            f.write("file '{}'\n".format(os.path.abspath(path).replace("'", "'\\''")))
+    try:
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", list_path, "-c", "copy", output_path], check=True)
+    finally:
+        os.remove(list_path)
+    return output_path
+
+
+def render_presentation(scene_names, quality="h", workers=None, output_name=OUTPUT_NAME, use_cache=True):
+    import visualize_hallucination as vh
+
+    start = time.perf_counter()
+    keys = {name: segment_key(vh, name, quality) for name in scene_names}
+    paths = {}
+    if use_cache:
+        for name in scene_names:
+            cached = cache_get(keys[name])
+            if cached is not None:
+                paths[name] = cached
+                print(f"  ♻️ {name}: 입력이 그대로라 캐시 사용")
+    todo = [name for name in scene_names if name not in paths]
+
+    if todo:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        print(f"🎬 씬 {len(todo)}개를 워커 {workers}개로 렌더링합니다 (-q{quality}, 캐시 {len(paths)}개)")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_segment, name, quality) for name in todo]
+            for future in as_completed(futures):
+                name, path, elapsed = future.result()
+                paths[name] = cache_put(keys[name], path)
+                print(f"  ✔ {name}: {elapsed:.1f}s")
+
+    ordered = [paths[name] for name in scene_names]
+    video_dir = os.path.join(HERE, "media", "videos", os.path.splitext(SCENE_FILE)[0], _resolution_dir(quality))
+    os.makedirs(video_dir, exist_ok=True)
+    output_path = os.path.join(video_dir, f"{output_name}.mp4")
+    concat(ordered, output_path)
+    removed = evict(keep=keys.values())
+    if removed:
+        print(f"🧹 오래 안 쓴 캐시 구간 {removed}개 삭제 (RENDER_CACHE_MAX_MB={CACHE_MAX_MB:g})")
+    print(f"🎉 {os.path.relpath(output_path, HERE)} ({time.perf_counter() - start:.1f}s)")
+    return output_path
+
+
+def main():
+    sys.path.insert(0, HERE)
+    parser = argparse.ArgumentParser(description="FullPresentation 씬별 병렬 렌더링 + ffmpeg 이어 붙이기")
+    parser.add_argument("-q", "--quality", choices=sorted(QUALITIES), default="h", help="manim -q 와 같은 품질 (기본 h)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="워커 프로세스 수 (기본: 코어 수)")
+    parser.add_argument("--scenes", nargs="+", default=None,
+                        help="렌더링할 씬 (기본: PRESENTATION_SCENES 전체, 주어진 순서대로 이어 붙임)")
+    parser.add_argument("--output", default=OUTPUT_NAME, help=f"이어 붙인 동영상 이름 (기본 {OUTPUT_NAME})")
+    parser.add_argument("--no-cache", action="store_true", help="캐시를 무시하고 모든 씬을 다시 렌더링")
+    args = parser.parse_args()
+
+    os.chdir(HERE)
+    from visualize_hallucination import PRESENTATION_SCENES
+
+    scene_names = args.scenes or [cls.__name__ for cls in PRESENTATION_SCENES]
+    render_presentation(scene_names, quality=args.quality, workers=args.workers, output_name=args.output,
+                        use_cache=not args.no_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""씬들이 함께 쓰는 결과 데이터 모델 (렌더링 프로세스마다 한 번만 읽음).
+
+버블 / 레이더 씬이 씬마다 load_hallucination_data() 로 CSV 를 다시 읽고 iterrows 로 훑고,
+산점도 씬이 범위 계산과 get_data_point() 에서 같은 CSV 를 두 번 훑던 것을
+
+- csv_data/ 의 요약 CSV 4개를 처음 쓸 때 한 번 읽어
+- 값 전체를 (데이터셋 × 지표 × 지역 × 모델) NumPy 배열 하나로 들고 (읽기 전용)
+- 표마다 min / max / 범위, 지역별 모델 평균과 그 min / max 를 미리 계산해 둡니다.
+
+지표
+- hallucination : *_Hallucination.csv 의 점수를 환각 수로 바꾼 값 (총 문항 수 - 점수)
+- accuracy      : *_Accuracy.csv 의 점수 그대로
+
+모델 이름은 CSV 마다 표기가 달라 ("GPT 5" / "GPT 5.1", "Claude 4.5 sonnet" / "Claude 4.5 Sonnet")
+대소문자를 무시하고 MODELS 의 이름으로 맞춥니다. 값이 없는 칸은 NaN 입니다.
+
+사용 예
+    table = get_results().table_for("csv_data/TruthfulQA_Hallucination.csv")
+    table.value("제주도", "GPT 5.1"), table.lo, table.hi, table.span, table.mean
+"""
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+REGIONS = ("표준", "충청도", "전라도", "경상도", "제주도")
+MODELS = ("GPT 5.1", "Claude 4.5 sonnet", "Gemini 3")
+DATASETS = ("TruthfulQA", "MedNLI")
+METRICS = ("hallucination", "accuracy")
+
+TOTALS = {"TruthfulQA": 603, "MedNLI": 1372}
+
+SOURCES = {
+    ("TruthfulQA", "hallucination"): "csv_data/TruthfulQA_Hallucination.csv",
+    ("MedNLI", "hallucination"): "csv_data/Mednli_Hallucination.csv",
+    ("TruthfulQA", "accuracy"): "csv_data/TruthfulQA_Accuracy.csv",
+    ("MedNLI", "accuracy"): "csv_data/Mednli_Accuracy.csv",
+}
+
+# CSV 컬럼 표기 (소문자) → MODELS 이름
+MODEL_ALIASES = {
+    "gpt 5": "GPT 5.1",
+    "gpt 5.1": "GPT 5.1",
+    "claude 4.5 sonnet": "Claude 4.5 sonnet",
+    "gemini 3": "Gemini 3",
+}
+
+
+def model_index(name):
+    return MODELS.index(MODEL_ALIASES.get(name.strip().lower(), name))
+
+
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+
+def min_span(values):
+    """(최솟값, 최댓값 - 최솟값). 값이 없거나 모두 같으면 범위는 1.0 (0 으로 나누지 않도록)."""
+    if np.all(np.isnan(values)):
+        return 0.0, 1.0
+    lo, hi = float(np.nanmin(values)), float(np.nanmax(values))
+    return lo, (hi - lo) or 1.0
+
+
+@dataclass(frozen=True)
+class Table:
+    """한 (데이터셋, 지표) 의 지역 × 모델 값과 미리 계산한 스케일."""
+    dataset: str
+    metric: str
+    values: np.ndarray      # (지역, 모델), REGIONS / MODELS 순서
+    lo: float               # 전체 값의 최솟값
+    hi: float               # 전체 값의 최댓값
+    span: float             # 스케일링에 쓰는 범위 (hi - lo, 0 이면 1.0)
+    mean: np.ndarray        # 지역별 모델 평균
+    mean_lo: float
+    mean_span: float
+
+    def value(self, region, model):
+        return float(self.values[REGIONS.index(region), model_index(model)])
+
+    def row(self, region):
+        return self.values[REGIONS.index(region)]
+
+    def region_mean(self, region):
+        return float(self.mean[REGIONS.index(region)])
+
+
+@dataclass(frozen=True)
+class Results:
+    values: np.ndarray      # (데이터셋, 지표, 지역, 모델)
+    tables: dict            # {(데이터셋, 지표): Table}
+
+    def table(self, dataset, metric):
+        return self.tables[(dataset, metric)]
+
+    def table_for(self, csv_path):
+        """씬이 넘기는 CSV 경로 (csv_data/...) 로 표를 찾습니다."""
+        path = os.path.normpath(csv_path)
+        for key, source in SOURCES.items():
+            if os.path.normpath(source) == path:
+                return self.tables[key]
+        raise KeyError(f"결과 모델에 없는 CSV: {csv_path}")
+
+
+def _read_table(path, total=None):
+    """요약 CSV → (지역, 모델) 배열. total 을 주면 환각 수 (total - 점수) 로 바꿉니다."""
+    df = pd.read_csv(path, thousands=",")
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.set_index(df.columns[0])
+
+    values = np.full((len(REGIONS), len(MODELS)), np.nan)
+    rows = [REGIONS.index(r) if r in REGIONS else -1 for r in df.index]
+    for col in df.columns:
+        name = MODEL_ALIASES.get(col.lower())
+        if name is None:
+            continue  # 평균 등 모델이 아닌 컬럼
+        column = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        for row, value in zip(rows, column):
+            if row >= 0:
+                values[row, MODELS.index(name)] = value
+    return total - values if total is not None else values
+
+
+def load_results(base_dir=HERE):
+    values = np.full((len(DATASETS), len(METRICS), len(REGIONS), len(MODELS)), np.nan)
+    for (dataset, metric), source in SOURCES.items():
+        total = TOTALS[dataset] if metric == "hallucination" else None
+        values[DATASETS.index(dataset), METRICS.index(metric)] = _read_table(os.path.join(base_dir, source), total)
+    _readonly(values)
+
+    tables = {}
+    for dataset in DATASETS:
+        for metric in METRICS:
+            table = values[DATASETS.index(dataset), METRICS.index(metric)]
+            with np.errstate(all="ignore"):
+                mean = np.array([np.nanmean(row) if not np.all(np.isnan(row)) else np.nan for row in table])
+            lo, span = min_span(table)
+            hi = lo if np.all(np.isnan(table)) else float(np.nanmax(table))
+            mean_lo, mean_span = min_span(mean)
+            tables[(dataset, metric)] = Table(dataset, metric, table, lo, hi, span, _readonly(mean), mean_lo, mean_span)
+    return Results(values, tables)
+
+
+@lru_cache(maxsize=None)
+def get_results():
+    """프로세스마다 한 번만 읽는 공유 결과 모델."""
+    return load_results()
@@ -1,25 +1,16 @@
 from manim import *
-import pandas as pd
 import numpy as np
 import os
-import manimpango
+from results_model import TOTALS, get_results
+from text_cache import cached_text, register_font
 
 # --- Font Registration ---
-try:
-    is_registered = manimpango.register_font("NanumMyeongjo-Regular.ttf")
-    if is_registered:
-         FONT_FAMILY = "NanumMyeongjo" 
-    else:
-         FONT_FAMILY = "sans-serif"
-except Exception as e:
-    print(f"Font registration warning: {e}")
-    FONT_FAMILY = "sans-serif"
+FONT_FAMILY = register_font("NanumMyeongjo-Regular.ttf", "NanumMyeongjo")
 
 class ScatterScene(Scene):
     def construct_scene(self, dataset_name, max_val, accuracy_csv):
-        # 1. Setup Data
-        df = pd.read_csv(accuracy_csv)
-        df.columns = [c.strip() for c in df.columns]
+        # 1. Setup Data (accuracy scores from the shared results model, parsed once per process)
+        table = get_results().table_for(accuracy_csv)
         
         models = [
             {"name": "GPT 5.1", "col": "GPT 5.1", "color": GREEN},
@@ -39,13 +30,10 @@ class ScatterScene(Scene):
         ]
 
         def get_data_point(region_name, model_col, offset_factor):
-            row = df[df["Region"] == region_name]
-            if row.empty:
+            x_val = table.value(region_name, model_col)
+            if np.isnan(x_val):
                 return 0, 0
             
-            val_str = str(row[model_col].values[0]).replace(",", "")
-            x_val = float(val_str)
-            
             # Y = X + Offset
             offset = max_val * offset_factor
             y_val = x_val + offset
@@ -66,8 +54,8 @@ class ScatterScene(Scene):
             axis_config={"include_numbers": False, "tip_shape": StealthTip},
         ).move_to(ORIGIN).shift(LEFT * 0.8) # Shifted more left since it's smaller
         
-        x_label = Text("Accuracy Score (Capability)", font=FONT_FAMILY, font_size=18).next_to(ax.x_axis, DOWN)
-        y_label = Text("Hallucination Score (Reliability)", font=FONT_FAMILY, font_size=18).rotate(90 * DEGREES).next_to(ax.y_axis, LEFT)
+        x_label = cached_text("Accuracy Score (Capability)", font=FONT_FAMILY, font_size=18).next_to(ax.x_axis, DOWN)
+        y_label = cached_text("Hallucination Score (Reliability)", font=FONT_FAMILY, font_size=18).rotate(90 * DEGREES).next_to(ax.y_axis, LEFT)
         
         # Diagonal
         diag_line = DashedLine(
@@ -87,14 +75,14 @@ class ScatterScene(Scene):
         )
         
         # Zone Labels (Adjusted size)
-        reliable_text = Text("Reliable Zone\n(Unknown 사용)", font=FONT_FAMILY, font_size=16, color=GREEN).move_to(
+        reliable_text = cached_text("Reliable Zone\n(Unknown 사용)", font=FONT_FAMILY, font_size=16, color=GREEN).move_to(
             ax.c2p(max_val * 0.2, max_val * 0.85)
         )
-        overconfident_text = Text("Overconfident Zone\n(모르는데 아는 척)", font=FONT_FAMILY, font_size=16, color=RED).move_to(
+        overconfident_text = cached_text("Overconfident Zone\n(모르는데 아는 척)", font=FONT_FAMILY, font_size=16, color=RED).move_to(
             ax.c2p(max_val * 0.8, max_val * 0.15)
         )
 
-        title = Text(f"{dataset_name} Capability vs Attitude", font=FONT_FAMILY, font_size=32).to_edge(UP)
+        title = cached_text(f"{dataset_name} Capability vs Attitude", font=FONT_FAMILY, font_size=32).to_edge(UP)
 
         # Setup Animation
         self.play(Write(title))
@@ -106,7 +94,7 @@ class ScatterScene(Scene):
         legend = VGroup()
         for m in models:
             leg_dot = Dot(color=m["color"])
-            leg_txt = Text(m["name"], font=FONT_FAMILY, font_size=18)
+            leg_txt = cached_text(m["name"], font=FONT_FAMILY, font_size=18)
             item = VGroup(leg_dot, leg_txt).arrange(RIGHT)
             legend.add(item)
         legend.arrange(DOWN, aligned_edge=LEFT).next_to(ax, RIGHT, buff=1.0).shift(UP * 0.5)
@@ -123,7 +111,7 @@ class ScatterScene(Scene):
             active_dots.add(d)
         
         # State Label (Dynamic)
-        state_label = Text("Initializing...", font=FONT_FAMILY, font_size=24, color=WHITE)
+        state_label = cached_text("Initializing...", font=FONT_FAMILY, font_size=24, color=WHITE)
         
         # Store for final avg scene
         final_avg_dots = VGroup()
@@ -156,12 +144,12 @@ class ScatterScene(Scene):
             
             # Legend Item for Final Scene
             l_dot = Dot(color=r_color)
-            l_txt = Text(r_name, font=FONT_FAMILY, font_size=18)
+            l_txt = cached_text(r_name, font=FONT_FAMILY, font_size=18)
             l_item = VGroup(l_dot, l_txt).arrange(RIGHT)
             final_region_labels.add(l_item)
 
             # Create/Update Label
-            new_label = Text(r_label_txt, font=FONT_FAMILY, font_size=24).move_to(avg_pos + UP * 0.6)
+            new_label = cached_text(r_label_txt, font=FONT_FAMILY, font_size=24).move_to(avg_pos + UP * 0.6)
             # Ensure label stays inside screen ? 
             # If too close to top edge, shift down?
             # Basic constraint:
@@ -192,7 +180,7 @@ class ScatterScene(Scene):
         # Arrange Final Legend
         final_region_labels.arrange(DOWN, aligned_edge=LEFT).move_to(legend.get_center())
         
-        summary = Text("Average by Dialect (지역별 평균)", font=FONT_FAMILY, font_size=24).to_edge(UP).shift(DOWN * 1.0)
+        summary = cached_text("Average by Dialect (지역별 평균)", font=FONT_FAMILY, font_size=24).to_edge(UP).shift(DOWN * 1.0)
         
         self.play(FadeIn(final_avg_dots), FadeIn(final_region_labels), Write(summary))
         
@@ -203,9 +191,9 @@ class ScatterScene(Scene):
 class TruthfulQAScatter(ScatterScene):
     def construct(self):
         # TruthfulQA Range: 0-603
-        self.construct_scene("TruthfulQA", 603, "csv_data/TruthfulQA_Accuracy.csv")
+        self.construct_scene("TruthfulQA", TOTALS["TruthfulQA"], "csv_data/TruthfulQA_Accuracy.csv")
 
 class MedNLIScatter(ScatterScene):
     def construct(self):
         # MedNLI Range: 0-1372
-        self.construct_scene("MedNLI", 1372, "csv_data/Mednli_Accuracy.csv")
+        self.construct_scene("MedNLI", TOTALS["MedNLI"], "csv_data/Mednli_Accuracy.csv")
@@ -0,0 +1,51 @@
+"""씬들이 함께 쓰는 Text mobject 캐시와 폰트 등록.
+
+Text(...) 하나를 만들 때마다 Pango 로 SVG 를 만들고 (media/texts/) 그 SVG 를 다시 읽어 경로로 바꿉니다.
+지역 이름, 모델 이름, 눈금 값처럼 같은 글자가 씬마다 (FullPresentation 에서는 한 프로세스 안에서 여러 번)
+다시 만들어지므로
+
+- (글자, Text 인자) 마다 처음 한 번만 Text 를 만들어 템플릿으로 두고
+- 이후에는 템플릿의 복사본 (copy, deepcopy) 을 돌려줍니다. 복사본을 옮기거나 Transform 해도 템플릿은 그대로입니다.
+
+폰트 등록도 프로세스마다 한 번만 합니다 (visualize_hallucination / scatterplot 을 함께 불러와도 한 번).
+
+사용 예
+    FONT_FAMILY = register_font("NanumMyeongjo-Regular.ttf", "NanumMyeongjo")
+    label = cached_text("충청도", font=FONT_FAMILY, font_size=24).move_to(pos)
+"""
+from functools import lru_cache
+
+import manimpango
+from manim import Text
+
+FALLBACK_FONT = "sans-serif"
+
+_TEXT_CACHE = {}
+
+
+@lru_cache(maxsize=None)
+def register_font(path, family):
+    """폰트 파일을 한 번 등록하고 쓸 family 이름을 돌려줍니다 (실패하면 FALLBACK_FONT)."""
+    try:
+        # manimpango.register_font returns a boolean (True/False) indicating success
+        if manimpango.register_font(path):
+            print(f"Font registered successfully. Using: {family}")
+            return family
+        print("Font registration returned False.")
+    except Exception as e:
+        print(f"Font registration warning: {e}")
+    return FALLBACK_FONT
+
+
+def _cache_key(text, kwargs):
+    # 색 (ManimColor) 등 해시가 안 되는 값도 있으므로 repr 로 비교
+    return text, tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+
+
+def cached_text(text, **kwargs):
+    """Text(text, **kwargs) 와 같은 mobject. 같은 인자로 두 번째부터는 Pango 렌더링 없이 복사합니다."""
+    key = _cache_key(text, kwargs)
+    template = _TEXT_CACHE.get(key)
+    if template is None:
+        template = _TEXT_CACHE[key] = Text(text, **kwargs)
+    return template.copy()
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import types
+import urllib.request
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "dataset"), os.path.join(ROOT, "bench")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import llm_client  # noqa: E402  (위에서 sys.path 를 잡은 뒤에 import)
+import mock_server  # noqa: E402
+import rate_limiter  # noqa: E402
+import response_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def server():
+    httpd, base_url = mock_server.serve_in_background()
+    yield base_url
+    httpd.shutdown()
+
+
+@pytest.fixture
+def client(server, tmp_path, monkeypatch):
+    """mock 서버를 가리키는 openai 설정과 임시 응답 캐시. 재시도 backoff 는 실제로 기다리지 않고 기록만 합니다."""
+    mock_server.configure()
+    urllib.request.urlopen(urllib.request.Request(f"{server}/stats/reset", method="POST")).read()
+    llm_client.configure("openai", api_key="test", base_url=f"{server}/v1")
+    llm_client.reset_stats()
+    # 테스트마다 새 limiter (앞 테스트의 429 로 줄어든 속도를 물려받지 않도록), 시작 속도는 넉넉하게
+    monkeypatch.setenv("LLM_RATE_OPENAI", "50")
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(str(tmp_path / "cache.sqlite")))
+    monkeypatch.setattr(response_cache, "_cache_pid", os.getpid())
+    sleeps = []
+    monkeypatch.setattr(llm_client, "time", types.SimpleNamespace(
+        monotonic=time.monotonic, perf_counter=time.perf_counter, sleep=sleeps.append))
+    yield sleeps
+    response_cache._cache.close()
@@ -0,0 +1,107 @@
+"""dataset/chatgpt/translation.py 를 mock 서버에 붙여 MedNLI / TruthfulQA 출력 파일의 행 순서와 컬럼 배치를 확인합니다.
+
+mock 서버는 번역 프롬프트에 "(방언) {마지막 user 줄}" 로 답하므로, 출력 셀을 원문에서 그대로 예측할 수 있습니다.
+응답 지연에 jitter 를 줘서 요청이 보낸 순서와 다르게 끝나도 행 순서가 유지되는지 봅니다.
+"""
+import ast
+import csv
+import importlib.util
+import json
+import os
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import mock_server
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "dataset", "chatgpt", "translation.py")
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/stats") as response:
+        return json.loads(response.read())
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+@pytest.fixture
+def translation(server, client, monkeypatch):
+    """mock 서버를 가리키도록 환경변수를 잡고 번역 스크립트를 새로 불러옵니다. 행 묶음은 2행으로 작게."""
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{server}/v1")
+    monkeypatch.setenv("TRANSLATE_RPM", "6000")
+    monkeypatch.setenv("TRANSLATE_ROW_CHUNK", "2")
+    spec = importlib.util.spec_from_file_location("chatgpt_translation", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    mock_server.configure(latency=0.02, jitter=1.0)
+    return module
+
+
+def test_mednli_rows_keep_order(server, translation, tmp_path):
+    source = tmp_path / "mednli_kor.csv"
+    pd.DataFrame({
+        "gold_label": ["entailment", "neutral", "contradiction", "neutral", "entailment"],
+        "sentence1_ko": ["환자는 열이 있다.", "혈압이 높다.", "환자는 열이 있다.", "기침을 한다.", "숨이 차다."],
+        "sentence2_ko": ["가설 1", "가설 2", "가설 3", "가설 4", "가설 5"],
+    }).to_csv(source, index=False)
+
+    df = translation.load_mednli(str(source))
+    output = translation.translate_mednli_region(df, "제주", "jeju", output_dir=str(tmp_path))
+
+    assert os.path.basename(output) == "mednli_jeju_(GPT-5).csv"
+    fieldnames, rows = read_rows(output)
+    assert fieldnames == ["gold_label", "sentence1_jeju", "sentence2_jeju", "ai_answer", "result"]
+    assert [row["gold_label"] for row in rows] == df["gold_label"].tolist()
+    assert [row["sentence1_jeju"] for row in rows] == [f"(방언) {s}" for s in df["sentence1_ko"]]
+    # sentence2 자리에도 sentence1 번역이 들어감 (기존 스크립트와 같은 배치)
+    assert [row["sentence2_jeju"] for row in rows] == [row["sentence1_jeju"] for row in rows]
+    assert all(row["ai_answer"] == "" and row["result"] == "" for row in rows)
+    # 중복 문장은 묶음을 넘어서도 한 번만 요청
+    assert server_stats(server)["requests"] == 4
+
+
+def test_truthfulqa_choices_return_to_their_rows(server, translation, tmp_path):
+    questions = ["하늘은 왜 파란가?", "물은 몇 도에서 끓는가?", "지구는 둥근가?"]
+    mc1 = [["빛의 산란 때문이다.", "바다를 비추기 때문이다."],
+           ["100도", "50도", "0도"],
+           ["그렇다.", "아니다."]]
+    mc2 = [["빛의 산란 때문이다.", "공기 때문이다.", "바다를 비추기 때문이다."],
+           ["100도", "해수면 기준 100도"],
+           ["그렇다."]]
+    source = tmp_path / "TruthfulQA_kor.csv"
+    pd.DataFrame({
+        "question": questions,
+        "mc1_choice": [str(c) for c in mc1],
+        "mc1_label": ["[1, 0]", "[1, 0, 0]", "[1, 0]"],
+        "mc2_choice": [str(c) for c in mc2],
+        "mc2_label": ["[1, 1, 0]", "[1, 1]", "[1]"],
+        "ai_answer_mc1": ["A", "B", "A"],
+        "mc1_result": [True, False, True],
+        "ai_answer_mc2": ["['A']", "['A', 'B']", "['A']"],
+        "mc2_result": [False, True, True],
+    }).to_csv(source, index=False)
+
+    df = translation.load_truthfulqa(str(source))
+    output = translation.translate_truthfulqa_region(df, "경상", "kyungsang", output_dir=str(tmp_path))
+
+    assert os.path.basename(output) == "truthfulqa_kyungsang_(GPT-5).csv"
+    fieldnames, rows = read_rows(output)
+    assert fieldnames == ["question_kyungsang", "mc1_choice_kyungsang", "mc1_label",
+                          "mc2_choice_kyungsang", "mc2_label",
+                          "ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"]
+    assert [row["question_kyungsang"] for row in rows] == [f"(방언) {q}" for q in questions]
+    # 펼쳐서 번역한 선택지가 원래 행, 원래 순서, 원래 개수로 돌아와야 함
+    for row, choices1, choices2 in zip(rows, mc1, mc2):
+        assert ast.literal_eval(row["mc1_choice_kyungsang"]) == [f"(방언) {c}" for c in choices1]
+        assert ast.literal_eval(row["mc2_choice_kyungsang"]) == [f"(방언) {c}" for c in choices2]
+    for column in ("mc1_label", "mc2_label", "ai_answer_mc1", "mc1_result", "ai_answer_mc2", "mc2_result"):
+        assert [row[column] for row in rows] == df[column].astype(str).tolist()
+    # mc1 / mc2 에 겹치는 선택지는 한 번만 요청
+    unique = set(questions) | {c for choices in mc1 + mc2 for c in choices}
+    assert server_stats(server)["requests"] == len(unique)
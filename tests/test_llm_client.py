@@ -0,0 +1,69 @@
+"""bench/mock_server 를 스레드로 띄워 llm_client 의 재시도 / Retry-After / 응답 캐시 동작을 확인합니다.
+
+    python -m pytest -q tests
+"""
+import asyncio
+import json
+import time
+import urllib.request
+
+import pytest
+
+import llm_client
+import mock_server
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/stats") as response:
+        return json.loads(response.read())
+
+
+def test_retries_server_error(server, client):
+    mock_server.fail_next(500, 503)
+    result = llm_client.complete("sys", "retry me", model="mock-retry")
+    assert result.attempts == 3
+    assert len(client) == 2  # 5xx 마다 한 번씩 backoff
+    stats = llm_client.call_stats()
+    assert stats["retries"] == 2 and stats["failed"] == 0
+    assert server_stats(server)["requests"] == 3
+
+
+def test_gives_up_after_max_retries(server, client):
+    mock_server.fail_next(500, 500)
+    with pytest.raises(llm_client.LLMError) as info:
+        llm_client.complete("sys", "give up", model="mock-give-up", max_retries=1)
+    assert info.value.retryable
+    assert llm_client.call_stats()["failed"] == 1
+    assert server_stats(server)["requests"] == 2
+
+
+def test_waits_for_retry_after(server, client):
+    mock_server.configure(retry_after=0.3)
+    mock_server.fail_next(429)
+    start = time.monotonic()
+    result = llm_client.complete("sys", "rate limited", model="mock-429")
+    assert time.monotonic() - start >= 0.3  # limiter 가 Retry-After 동안 멈춤
+    assert result.attempts == 2
+    assert client == []  # 429 에는 따로 backoff 하지 않음
+    assert llm_client.call_stats()["rate_limited"] == 1
+    assert server_stats(server)["rate_limited"] == 1
+
+
+def test_second_call_is_cache_hit(server, client):
+    first = llm_client.complete("sys", "cache me", model="mock-cache", temperature=0)
+    second = llm_client.complete("sys", "cache me", model="mock-cache", temperature=0)
+    assert not first.cached and second.cached
+    assert second.text == first.text and second.attempts == 0
+    assert llm_client.call_stats()["cached"] == 1
+    assert server_stats(server)["requests"] == 1
+    # 파라미터가 다르면 다른 키
+    llm_client.complete("sys", "cache me", model="mock-cache", temperature=0.5)
+    assert server_stats(server)["requests"] == 2
+
+
+def test_acomplete_retries_and_caches(server, client):
+    mock_server.fail_next(500)
+    first = asyncio.run(llm_client.acomplete("sys", "async", model="mock-async"))
+    second = asyncio.run(llm_client.acomplete("sys", "async", model="mock-async"))
+    assert first.attempts == 2 and second.cached
+    assert server_stats(server)["requests"] == 2